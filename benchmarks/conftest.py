@@ -0,0 +1,103 @@
+"""conftest.py
+
+fixtures measuring elapsed time and peak memory of benchmark cases
+
+Environment variables:
+    DSPY_BENCH_SCALE: multiplies the size of the synthetic trees (default 1).
+    DSPY_BENCH_REPEAT: the number of timed runs of each case (default 3).
+    DSPY_BENCH_REPORT: a JSON path to write the measurements to.
+    DSPY_BENCH_BASELINE: a JSON report of a previous run; a case fails if it is
+        slower than its baseline by more than DSPY_BENCH_TOLERANCE (default 0.5, i.e., 50%).
+"""
+
+import json
+import os
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+from synthetic import GENERATORS  # noqa: E402  # pylint: disable=wrong-import-position
+
+REPEAT: int = int(os.environ.get("DSPY_BENCH_REPEAT", "3"))
+TOLERANCE: float = float(os.environ.get("DSPY_BENCH_TOLERANCE", "0.5"))
+
+_results: List[Dict[str, Any]] = []
+
+
+def _load_baseline() -> Dict[str, Dict[str, Any]]:
+    path: str = os.environ.get("DSPY_BENCH_BASELINE", "")
+    if not path:
+        return {}
+    with open(path, "r", encoding="utf-8") as ff:
+        return {r["name"]: r for r in json.load(ff)}
+
+
+_baseline: Dict[str, Dict[str, Any]] = _load_baseline()
+
+
+@pytest.fixture(name="tree", scope="session", params=list(GENERATORS.keys()))
+def fixture_tree(request, tmp_path_factory) -> Path:
+    """generates each synthetic tree once per session"""
+    dst: Path = tmp_path_factory.mktemp("bench") / request.param
+    return GENERATORS[request.param](dst)
+
+
+@pytest.fixture(name="bench")
+def fixture_bench(request) -> Callable:
+    """returns a function running a case, recording its best time and peak memory
+
+    `bench(func, setup)` calls `setup()` before each run (outside the measurement)
+    and passes its result, a tuple of arguments, to `func`.
+    """
+
+    def _bench(func: Callable, setup: Callable[[], tuple] = tuple) -> Any:
+        seconds: List[float] = []
+        result: Any = None
+        for _ in range(REPEAT):
+            args: tuple = setup()
+            st = time.perf_counter()
+            result = func(*args)
+            seconds.append(time.perf_counter() - st)
+        args = setup()
+        tracemalloc.start()
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        record: Dict[str, Any] = {
+            "name": request.node.name,
+            "seconds": min(seconds),
+            "peakMemory": peak,
+        }
+        _results.append(record)
+        baseline: Dict[str, Any] | None = _baseline.get(record["name"])
+        if baseline is not None:
+            assert record["seconds"] <= baseline["seconds"] * (1.0 + TOLERANCE), (
+                f"{record['name']}: {record['seconds']:.4f} sec. is slower than "
+                f"the baseline {baseline['seconds']:.4f} sec."
+            )
+        return result
+
+    return _bench
+
+
+def pytest_terminal_summary(terminalreporter):
+    """prints the measurements and writes them to DSPY_BENCH_REPORT"""
+    if not _results:
+        return
+    terminalreporter.section("benchmarks")
+    width: int = max(len(r["name"]) for r in _results)
+    for record in _results:
+        terminalreporter.write_line(
+            f"{record['name']:<{width}}  {record['seconds'] * 1e3:10.2f} ms"
+            f"  {record['peakMemory'] / 1024 ** 2:10.2f} MiB"
+        )
+    report_path: str = os.environ.get("DSPY_BENCH_REPORT", "")
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as ff:
+            json.dump(_results, ff, indent=4)
@@ -0,0 +1,75 @@
+"""synthetic.py
+
+generators of synthetic directory trees for benchmarks
+"""
+
+import os
+from pathlib import Path
+from typing import Callable, Dict
+
+# multiplies the number of entries of every shape; set DSPY_BENCH_SCALE to enlarge the trees.
+SCALE: int = int(os.environ.get("DSPY_BENCH_SCALE", "1"))
+
+
+def _write(path: Path, size: int) -> None:
+    with open(path, "wb") as ff:
+        ff.write(os.urandom(min(size, 4096)) * (size // 4096) + os.urandom(size % 4096))
+
+
+def generate_wide_tree(dst: Path, n_dirs: int = 50, n_files: int = 20, size: int = 256) -> Path:
+    """Generates a tree of `n_dirs` sibling directories holding `n_files` files each."""
+    for ii in range(n_dirs * SCALE):
+        dir_path = dst / f"dir_{ii:05d}"
+        dir_path.mkdir(parents=True)
+        for jj in range(n_files):
+            _write(dir_path / f"file_{jj:05d}.dat", size)
+    return dst
+
+
+def generate_deep_tree(dst: Path, depth: int = 40, n_files: int = 5, size: int = 256) -> Path:
+    """Generates a chain of `depth` nested directories holding `n_files` files each."""
+    for branch in range(SCALE):
+        dir_path = dst / f"branch_{branch:03d}"
+        for ii in range(depth):
+            dir_path = dir_path / f"level_{ii:03d}"
+            dir_path.mkdir(parents=True)
+            for jj in range(n_files):
+                _write(dir_path / f"file_{jj:03d}.txt", size)
+    return dst
+
+
+def generate_tiny_files_tree(dst: Path, n_dirs: int = 10, n_files: int = 200) -> Path:
+    """Generates a tree with many empty or one-byte files."""
+    for ii in range(n_dirs * SCALE):
+        dir_path = dst / f"dir_{ii:04d}"
+        dir_path.mkdir(parents=True)
+        for jj in range(n_files):
+            _write(dir_path / f"tiny_{jj:05d}.bin", jj % 2)
+    return dst
+
+
+def generate_huge_files_tree(dst: Path, n_files: int = 4, size: int = 16 * 1024 * 1024) -> Path:
+    """Generates a directory with a few large files."""
+    dst.mkdir(parents=True, exist_ok=True)
+    for ii in range(n_files * SCALE):
+        _write(dst / f"huge_{ii:03d}.bin", size)
+    return dst
+
+
+def generate_many_extensions_tree(dst: Path, n_dirs: int = 20, n_extensions: int = 100) -> Path:
+    """Generates a tree whose files have many distinct extensions."""
+    for ii in range(n_dirs * SCALE):
+        dir_path = dst / f"dir_{ii:04d}"
+        dir_path.mkdir(parents=True)
+        for jj in range(n_extensions):
+            _write(dir_path / f"file.ext{jj:04d}", 16)
+    return dst
+
+
+GENERATORS: Dict[str, Callable[[Path], Path]] = {
+    "wide": generate_wide_tree,
+    "deep": generate_deep_tree,
+    "tiny_files": generate_tiny_files_tree,
+    "huge_files": generate_huge_files_tree,
+    "many_extensions": generate_many_extensions_tree,
+}
@@ -0,0 +1,85 @@
+"""test_hot_paths.py
+
+benchmarks of the hot paths on synthetic trees
+"""
+
+import copy
+import io
+from pathlib import Path
+from typing import Callable, Dict
+
+import pytest
+
+from directory_structure_py.conversion import (
+    list2tree,
+    write_list_as_tree,
+    convert_meta_list_json_to_tsv,
+    convert_meta_list_json_to_rocrate
+)
+from directory_structure_py.get_metadata import (
+    get_metadata_of_files_in_list_format,
+    update_statistical_info_to_metadata_list
+)
+from directory_structure_py.rocrate_models import Preview
+
+
+def _scan(tree: Path) -> Dict:
+    return update_statistical_info_to_metadata_list(
+        get_metadata_of_files_in_list_format(tree)
+    )
+
+
+def _for_rocrate(tree: Path) -> Dict:
+    data: Dict = _scan(tree)
+    data["root_path"] = str(tree.absolute().as_posix())
+    return data
+
+
+def test_get_metadata_of_files_in_list_format(tree: Path, bench: Callable):
+    """benchmark of get_metadata_of_files_in_list_format"""
+    dst: Dict = bench(get_metadata_of_files_in_list_format, lambda: (tree,))
+    assert dst["@graph"]
+
+
+def test_update_statistical_info_to_metadata_list(tree: Path, bench: Callable):
+    """benchmark of update_statistical_info_to_metadata_list"""
+    data: Dict = get_metadata_of_files_in_list_format(tree)
+    bench(update_statistical_info_to_metadata_list, lambda: (copy.deepcopy(data),))
+
+
+def test_update_statistical_info_with_columns(tree: Path, bench: Callable):
+    """benchmark of update_statistical_info_with_columns"""
+    columnar = pytest.importorskip("directory_structure_py.columnar")
+    data: Dict = get_metadata_of_files_in_list_format(tree)
+    bench(columnar.update_statistical_info_with_columns, lambda: (copy.deepcopy(data),))
+
+
+def test_list2tree(tree: Path, bench: Callable):
+    """benchmark of list2tree"""
+    data: Dict = _scan(tree)
+    bench(list2tree, lambda: (copy.deepcopy(data),))
+
+
+def test_write_list_as_tree(tree: Path, bench: Callable):
+    """benchmark of write_list_as_tree"""
+    data: Dict = _scan(tree)
+    bench(write_list_as_tree, lambda: (data, io.StringIO()))
+
+
+def test_convert_meta_list_json_to_tsv(tree: Path, bench: Callable):
+    """benchmark of convert_meta_list_json_to_tsv"""
+    data: Dict = _scan(tree)
+    bench(convert_meta_list_json_to_tsv, lambda: (data,))
+
+
+def test_convert_meta_list_json_to_rocrate(tree: Path, bench: Callable):
+    """benchmark of convert_meta_list_json_to_rocrate"""
+    data: Dict = _for_rocrate(tree)
+    bench(convert_meta_list_json_to_rocrate, lambda: (data,))
+
+
+def test_preview_generate_html(tree: Path, bench: Callable):
+    """benchmark of Preview.generate_html"""
+    crate = convert_meta_list_json_to_rocrate(_for_rocrate(tree))
+    preview = crate.add(Preview(crate))
+    bench(preview.generate_html)
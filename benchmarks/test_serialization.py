@@ -0,0 +1,68 @@
+"""test_serialization.py
+
+benchmarks of the JSON encoders on a synthetic `@graph`
+
+The graph holds 50,000 nodes times DSPY_BENCH_SCALE; set DSPY_BENCH_SCALE=20
+for the 1M-node case.
+"""
+
+import io
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+from directory_structure_py.serialization import JSON_BACKENDS, dump_json
+from synthetic import SCALE  # pylint: disable=import-error
+
+N_NODES: int = 50_000 * SCALE
+
+
+def _generate_graph(n_nodes: int) -> Dict[str, Any]:
+    nodes: List[Dict[str, Any]] = []
+    for ii in range(n_nodes):
+        if ii % 20 == 0:
+            nodes.append({
+                "@id": f"root/dir_{ii // 20:06d}/",
+                "type": "Directory",
+                "parent": {"@id": "root/"},
+                "basename": f"dir_{ii // 20:06d}",
+                "hasPart": [{"@id": f"root/dir_{ii // 20:06d}/file_{jj:02d}.txt"} for jj in range(19)],
+                "numberOfFilesPerExtension": {".txt": 19},
+                "numberOfFilesPerMIMEType": {"text/plain": 19},
+                "contentSizeOfAllFiles": 19 * 256,
+                "dateModified": "2024-01-01T00:00:00",
+            })
+            continue
+        nodes.append({
+            "@id": f"root/dir_{ii // 20:06d}/file_{ii % 20:02d}.txt",
+            "type": "File",
+            "parent": {"@id": f"root/dir_{ii // 20:06d}/"},
+            "basename": f"file_{ii % 20:02d}.txt",
+            "extension": ".txt",
+            "mimetype": "text/plain",
+            "contentSize": 256,
+            "sha256": f"{ii:064x}",
+            "dateCreated": "2024-01-01T00:00:00",
+            "dateModified": "2024-01-01T00:00:00",
+        })
+    return {"root_path": "./", "@graph": nodes, "dateCreated": "2024-01-01T00:00:00"}
+
+
+@pytest.fixture(name="graph", scope="module")
+def fixture_graph() -> Dict[str, Any]:
+    """generates the synthetic graph once per module"""
+    return _generate_graph(N_NODES)
+
+
+@pytest.mark.parametrize("backend", JSON_BACKENDS)
+@pytest.mark.parametrize("compact", [False, True])
+def test_dump_json(graph: Dict[str, Any], bench: Callable, backend: str, compact: bool):
+    """benchmark of dump_json"""
+    if backend != "json":
+        pytest.importorskip(backend)
+    if backend == "orjson" and not compact:
+        pytest.skip("orjson only supports the compact output")
+    bench(
+        lambda ff: dump_json(graph, ff, compact=compact, backend=backend),
+        lambda: (io.TextIOWrapper(io.BytesIO(), encoding="utf-8"),)
+    )
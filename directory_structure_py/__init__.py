@@ -2,6 +2,12 @@
 directory_structure_py
 """
 
-from directory_structure_py._version import __version__
-
 __all__ = ['__version__']
+
+
+def __getattr__(name: str):
+    # `importlib.metadata` is slow to import; resolve the version on demand.
+    if name == "__version__":
+        from directory_structure_py._version import __version__  # pylint: disable=import-outside-toplevel
+        return __version__
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,15 +1,272 @@
 """directory_structure_py"""
 
 
+from directory_structure_py.constants import (
+    DEFAULT_OUTPUT_NAME, DEFAULT_PREVIEW_TEMPLATE_PATH
+)
 from directory_structure_py.main import (
-    main, DEFAULT_OUTPUT_NAME, LOG_OUTPUT_PATH, LOG_CONF_PATH,
-    DEFAULT_PREVIEW_TEMPLATE_PATH
+    main, set_logger, save_dict_to_json, LOG_OUTPUT_PATH, LOG_CONF_PATH
+)
+from directory_structure_py.scan_options import (
+    ScanOptions, HARDLINK_POLICIES, READ_ORDERS, LARGE_DIRECTORY_HAS_PART
 )
+from directory_structure_py.estimate import DEFAULT_ESTIMATE_DEPTH, DEFAULT_CONFIDENCE
+from directory_structure_py.checkpoint import DEFAULT_CHECKPOINT_INTERVAL
+
+
+def _serve(argv):
+    """`serve` command: keeps the metadata of the roots in memory and serves queries."""
+    import argparse
+    import os
+    from directory_structure_py.server import (
+        serve, DEFAULT_HOST, DEFAULT_PORT
+    )
+    parser = argparse.ArgumentParser(prog="directory_structure_py serve")
+    parser.add_argument(
+        "roots", type=str, nargs="+",
+        help="source paths to serve, optionally given as NAME=PATH"
+    )
+    parser.add_argument("--host", dest="host", type=str, default=DEFAULT_HOST)
+    parser.add_argument("--port", dest="port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--unix_socket", dest="unix_socket", type=str, default=""
+    )
+    parser.add_argument(
+        "--refresh_interval", dest="refresh_interval", type=float, default=0.0
+    )
+    parser.add_argument(
+        "--watch", dest="watch", type=str, nargs="?", const="auto", default="",
+        choices=["auto", "watchdog", "polling"]
+    )
+    parser.add_argument(
+        "--include_root_path", dest="include_root_path", action="store_true"
+    )
+    parser.add_argument(
+        "--log_config_path", dest="log_config_path", type=str, default=LOG_CONF_PATH
+    )
+    parser.add_argument(
+        "--log_output_path", dest="log_output_path", type=str, default=LOG_OUTPUT_PATH
+    )
+    args = parser.parse_args(argv)
+    roots = {}
+    for root in args.roots:
+        name, sep, path = root.partition("=")
+        if not sep:
+            path = root
+            name = os.path.basename(os.path.abspath(root))
+        roots[name] = path
+    if not os.path.exists(os.path.dirname(args.log_output_path)):
+        os.makedirs(os.path.dirname(args.log_output_path))
+    set_logger(args.log_config_path, args.log_output_path)
+    serve(
+        roots, args.host, args.port, args.unix_socket,
+        args.include_root_path, args.refresh_interval, args.watch
+    )
+
+
+def _diff(argv):
+    """`diff` command: compares two metadata files in a list format."""
+    import argparse
+    import json
+    from directory_structure_py.constants import ENSURE_ASCII, JSON_OUTPUT_INDENT
+    from directory_structure_py.diff import diff_metadata_files
+    parser = argparse.ArgumentParser(prog="directory_structure_py diff")
+    parser.add_argument("old", type=str)
+    parser.add_argument("new", type=str)
+    parser.add_argument(
+        "--dst", dest="dst", type=str, default="",
+        help="output JSON path (standard output if omitted)"
+    )
+    args = parser.parse_args(argv)
+    result = diff_metadata_files(args.old, args.new)
+    if args.dst:
+        save_dict_to_json(result, args.dst)
+    else:
+        print(json.dumps(result, indent=JSON_OUTPUT_INDENT, ensure_ascii=ENSURE_ASCII))
+
+
+def _snapshot(argv):
+    """`snapshot` command: looks up or converts back a binary snapshot."""
+    import argparse
+    import json
+    from directory_structure_py.constants import ENSURE_ASCII, JSON_OUTPUT_INDENT
+    from directory_structure_py.snapshot import SnapshotReader
+    parser = argparse.ArgumentParser(prog="directory_structure_py snapshot")
+    parser.add_argument("src", type=str)
+    parser.add_argument(
+        "--id", dest="node_id", type=str, default="",
+        help="print the metadata and the statistics of this node"
+    )
+    parser.add_argument(
+        "--dst", dest="dst", type=str, default="",
+        help="convert the snapshot back to a JSON file"
+    )
+    parser.add_argument(
+        "--in_tree", "--in-tree", dest="in_tree", action="store_true"
+    )
+    parser.add_argument(
+        "--structure_only", "--structure-only", dest="structure_only", action="store_true"
+    )
+    args = parser.parse_args(argv)
+    with SnapshotReader(args.src) as reader:
+        if args.node_id:
+            node = reader.get(args.node_id)
+            if node is None:
+                raise SystemExit(f"{args.node_id}: not found in {args.src}.")
+            print(json.dumps(
+                {"node": node, "statistics": reader.subtree_stats(args.node_id)},
+                indent=JSON_OUTPUT_INDENT, ensure_ascii=ENSURE_ASCII
+            ))
+        if args.dst:
+            if args.in_tree:
+                save_dict_to_json(reader.to_tree(args.structure_only), args.dst)
+            else:
+                save_dict_to_json(reader.to_list(), args.dst)
+
+
+def _convert(argv):
+    """`convert` command: converts a metadata file in a list format in bounded memory."""
+    import argparse
+    import os
+    from directory_structure_py.compression import (
+        infer_compression, strip_compression_extension, add_compression_extension, open_output
+    )
+    from directory_structure_py.conversion import (
+        iter_meta_list_json_to_tsv_from_file, write_tree_from_file
+    )
+    parser = argparse.ArgumentParser(prog="directory_structure_py convert")
+    parser.add_argument("src", type=str)
+    parser.add_argument(
+        "--to", dest="to", type=str, default="tree", choices=["tree", "tsv"]
+    )
+    parser.add_argument(
+        "--dst", dest="dst", type=str, default="",
+        help="output path (default: `<src>_tree.json` or `<src>.tsv`)"
+    )
+    parser.add_argument(
+        "--structure_only", "--structure-only", dest="structure_only", action="store_true"
+    )
+    parser.add_argument("--compact", dest="compact", action="store_true")
+    parser.add_argument(
+        "--compress", dest="compress", type=str, default="", choices=["gzip", "zstd", "xz"]
+    )
+    args = parser.parse_args(argv)
+    if not args.dst:
+        base: str = os.path.splitext(strip_compression_extension(args.src))[0]
+        args.dst = f"{base}_tree.json" if args.to == "tree" else f"{base}.tsv"
+    compression: str = infer_compression(args.dst, args.compress)
+    dst: str = add_compression_extension(strip_compression_extension(args.dst), compression)
+    with open_output(dst, compression) as ff:
+        if args.to == "tree":
+            write_tree_from_file(args.src, ff, args.structure_only, args.compact)
+        else:
+            ff.writelines(
+                "\t".join(row) + "\n" for row in iter_meta_list_json_to_tsv_from_file(args.src)
+            )
+
+
+def _plan(argv):
+    """`plan` command: divides a directory into shards and saves the manifest."""
+    import argparse
+    from directory_structure_py.sharding import plan_shards
+    parser = argparse.ArgumentParser(prog="directory_structure_py plan")
+    parser.add_argument("src", type=str)
+    parser.add_argument("--shards", dest="shards", type=int, required=True)
+    parser.add_argument(
+        "--dst", dest="dst", type=str, default="manifest.json",
+        help="output path of the manifest"
+    )
+    parser.add_argument(
+        "--max_depth", "--max-depth", dest="max_depth", type=int, default=None
+    )
+    parser.add_argument(
+        "--include", dest="include", type=str, action="append", default=[]
+    )
+    parser.add_argument(
+        "--exclude", dest="exclude", type=str, action="append", default=[]
+    )
+    parser.add_argument(
+        "--ignore_file", "--ignore-file", dest="ignore_file", type=str, default=""
+    )
+    parser.add_argument("--fields", dest="fields", type=str, default=None)
+    parser.add_argument(
+        "--follow_symlinks", "--follow-symlinks", dest="follow_symlinks", action="store_true"
+    )
+    parser.add_argument(
+        "--hardlinks", dest="hardlinks", type=str, default="all", choices=HARDLINK_POLICIES
+    )
+    parser.add_argument(
+        "--read_order", "--read-order", dest="read_order", type=str, default="listing",
+        choices=READ_ORDERS
+    )
+    parser.add_argument(
+        "--max_read_mbps", "--max-read-mbps", dest="max_read_mbps", type=float, default=0.0
+    )
+    parser.add_argument(
+        "--max_iops", "--max-iops", dest="max_iops", type=float, default=0.0
+    )
+    parser.add_argument(
+        "--adaptive_throttle", "--adaptive-throttle", dest="adaptive_throttle",
+        action="store_true"
+    )
+    parser.add_argument(
+        "--large_directory_threshold", "--large-directory-threshold",
+        dest="large_directory_threshold", type=int, default=0
+    )
+    parser.add_argument("--archives", dest="archives", action="store_true")
+    args = parser.parse_args(argv)
+    save_dict_to_json(plan_shards(args.src, args.shards, ScanOptions(
+        args.max_depth, args.include, args.exclude, args.ignore_file,
+        None if args.fields is None else [
+            key.strip() for key in args.fields.split(",") if key.strip()
+        ],
+        args.follow_symlinks, args.hardlinks, args.read_order,
+        args.max_read_mbps, args.max_iops, args.adaptive_throttle,
+        large_directory_threshold=args.large_directory_threshold, archives=args.archives
+    )), args.dst)
+
+
+def _merge(argv):
+    """`merge` command: merges the outputs of the shards of a plan into a single output."""
+    import argparse
+    from directory_structure_py.compression import infer_compression, strip_compression_extension
+    from directory_structure_py.sharding import load_manifest, merge_shards
+    parser = argparse.ArgumentParser(prog="directory_structure_py merge")
+    parser.add_argument("manifest", type=str)
+    parser.add_argument("shards", type=str, nargs="+", help="outputs of all the shards")
+    parser.add_argument("--dst", dest="dst", type=str, required=True)
+    parser.add_argument("--compact", dest="compact", action="store_true")
+    parser.add_argument(
+        "--compress", dest="compress", type=str, default="", choices=["gzip", "zstd", "xz"]
+    )
+    args = parser.parse_args(argv)
+    compression: str = infer_compression(args.dst, args.compress)
+    save_dict_to_json(
+        merge_shards(load_manifest(args.manifest), args.shards),
+        strip_compression_extension(args.dst), compression, args.compact
+    )
+
+
+SUBCOMMANDS = {
+    "serve": _serve,
+    "diff": _diff,
+    "snapshot": _snapshot,
+    "convert": _convert,
+    "plan": _plan,
+    "merge": _merge,
+}
 
 
 if __name__ == "__main__":
     import argparse
     import os
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        SUBCOMMANDS[sys.argv[1]](sys.argv[2:])
+        sys.exit(0)
+    if len(sys.argv) > 1 and sys.argv[1] == "scan":
+        # `scan` is optional, e.g., `scan SRC --shard K --manifest PATH`.
+        del sys.argv[1]
     parser = argparse.ArgumentParser()
     parser.add_argument("src", type=str)
     parser.add_argument(
@@ -40,7 +297,153 @@ if __name__ == "__main__":
         "--preview_template_path", dest="preview_template_path", type=str,
         default=DEFAULT_PREVIEW_TEMPLATE_PATH
     )
+    parser.add_argument(
+        "--find_duplicates", "--find-duplicates", dest="find_duplicates",
+        action="store_true"
+    )
+    parser.add_argument(
+        "--metrics_out", "--metrics-out", dest="metrics_out", type=str, default=""
+    )
+    parser.add_argument(
+        "--progress_interval", dest="progress_interval", type=float, default=0.0
+    )
+    parser.add_argument(
+        "--slow_entry_threshold", "--slow-entry-threshold", dest="slow_entry_threshold",
+        type=float, default=0.0,
+        help="log the entries whose stat or hash takes longer than this in seconds"
+    )
+    parser.add_argument(
+        "--profile", dest="profile", type=str, default="",
+        choices=["cpu", "memory", "both"]
+    )
+    parser.add_argument(
+        "--max_depth", "--max-depth", dest="max_depth", type=int, default=None
+    )
+    parser.add_argument(
+        "--include", dest="include", type=str, action="append", default=[]
+    )
+    parser.add_argument(
+        "--exclude", dest="exclude", type=str, action="append", default=[]
+    )
+    parser.add_argument(
+        "--ignore_file", "--ignore-file", dest="ignore_file", type=str, default=""
+    )
+    parser.add_argument(
+        "--fields", dest="fields", type=str, default=None,
+        help="comma-separated optional keys to compute among "
+        "mimetype, contentSize, dateCreated, dateModified and sha256 "
+        "(\"\" for the structure only)"
+    )
+    parser.add_argument(
+        "--follow_symlinks", "--follow-symlinks", dest="follow_symlinks", action="store_true",
+        help="follow symbolic links, skipping those making a cycle"
+    )
+    parser.add_argument(
+        "--hardlinks", dest="hardlinks", type=str, default="all", choices=HARDLINK_POLICIES,
+        help="count the size of a file with several hard links for all its links or once"
+    )
+    parser.add_argument(
+        "--read_order", "--read-order", dest="read_order", type=str, default="listing",
+        choices=READ_ORDERS,
+        help="hash the files of each directory by inode or physical extent to reduce seeks"
+    )
+    parser.add_argument(
+        "--max_read_mbps", "--max-read-mbps", dest="max_read_mbps", type=float, default=0.0,
+        help="maximum megabytes read per second by the hashing (no limit if 0)"
+    )
+    parser.add_argument(
+        "--max_iops", "--max-iops", dest="max_iops", type=float, default=0.0,
+        help="maximum files opened per second by the hashing (no limit if 0)"
+    )
+    parser.add_argument(
+        "--adaptive_throttle", "--adaptive-throttle", dest="adaptive_throttle",
+        action="store_true", help="lower the limits above while the read latency rises"
+    )
+    parser.add_argument(
+        "--large_directory_threshold", "--large-directory-threshold",
+        dest="large_directory_threshold", type=int, default=0,
+        help="read the directories with more entries than this in batches (never if 0)"
+    )
+    parser.add_argument(
+        "--large_directory_has_part", "--large-directory-has-part",
+        dest="large_directory_has_part", type=str, default="full",
+        choices=LARGE_DIRECTORY_HAS_PART,
+        help="list all the children of a large directory in hasPart or its subdirectories only"
+    )
+    parser.add_argument(
+        "--archives", dest="archives", action="store_true",
+        help="scan zip and tar archives as directories without extracting them"
+    )
+    parser.add_argument(
+        "--estimate", dest="estimate", type=float, default=0.0,
+        help="estimate the statistics by stat'ing this fraction of the files"
+    )
+    parser.add_argument(
+        "--estimate_depth", "--estimate-depth", dest="estimate_depth", type=int,
+        default=DEFAULT_ESTIMATE_DEPTH
+    )
+    parser.add_argument(
+        "--confidence", dest="confidence", type=float, default=DEFAULT_CONFIDENCE
+    )
+    parser.add_argument(
+        "--seed", dest="seed", type=int, default=None
+    )
+    parser.add_argument(
+        "--checkpoint", dest="checkpoint", action="store_true",
+        help="record the progress of the scan to a state file"
+    )
+    parser.add_argument(
+        "--checkpoint_path", "--checkpoint-path", dest="checkpoint_path", type=str,
+        default="", help="the state file (default: `<dst>_checkpoint.jsonl`)"
+    )
+    parser.add_argument(
+        "--checkpoint_interval", "--checkpoint-interval", dest="checkpoint_interval",
+        type=float, default=DEFAULT_CHECKPOINT_INTERVAL
+    )
+    parser.add_argument(
+        "--resume", dest="resume", action="store_true",
+        help="resume the scan from the state file"
+    )
+    parser.add_argument(
+        "--compress", dest="compress", type=str, default="",
+        choices=["gzip", "zstd", "xz"],
+        help="compress the JSON, TSV and tree outputs (inferred from a .gz/.zst/.xz dst)"
+    )
+    parser.add_argument(
+        "--compact", dest="compact", action="store_true",
+        help="write the JSON outputs without indentation"
+    )
+    parser.add_argument(
+        "--json_backend", "--json-backend", dest="json_backend", type=str, default="auto",
+        choices=["auto", "orjson", "msgspec", "json"]
+    )
+    parser.add_argument(
+        "--snapshot", dest="snapshot", type=str, nargs="?", default="",
+        const="alongside", choices=["alongside", "only"],
+        help="write a binary snapshot to `<dst>.snap` alongside or instead of the JSON"
+    )
+    parser.add_argument(
+        "--stats_engine", "--stats-engine", dest="stats_engine", type=str,
+        default="python", choices=["python", "numpy"],
+        help="roll up the statistics with the NumPy columnar engine, adding size distributions"
+    )
+    parser.add_argument(
+        "--percentile_depth", "--percentile-depth", dest="percentile_depth", type=int,
+        default=1, help="depth of the deepest directories with size percentiles (-1 for all)"
+    )
+    parser.add_argument(
+        "--shard", dest="shard", type=int, default=None,
+        help="scan only this shard of the plan given by --manifest"
+    )
+    parser.add_argument(
+        "--manifest", dest="manifest", type=str, default="",
+        help="the manifest saved by the `plan` command"
+    )
     args = parser.parse_args()
+    if args.shard is not None and not args.manifest:
+        parser.error("--shard requires --manifest.")
+    if args.shard is not None and not args.dst:
+        args.dst = f"{os.path.splitext(args.manifest)[0]}_shard{args.shard}.json"
     if not args.dst:
         if os.path.isdir(args.src):
             args.dst = os.path.join(args.src, DEFAULT_OUTPUT_NAME)
@@ -50,10 +453,41 @@ if __name__ == "__main__":
             )
     elif os.path.isdir(args.dst):
         args.dst = os.path.join(args.dst, DEFAULT_OUTPUT_NAME)
+    if (args.checkpoint or args.resume) and not args.checkpoint_path:
+        args.checkpoint_path = f"{os.path.splitext(args.dst)[0]}_checkpoint.jsonl"
     main(
         args.src, args.dst, args.include_root_path,
         args.in_rocrate, args.to_tsv,
         args.in_tree, args.structure_only,
         args.log_config_path, args.log_output_path,
-        args.preview_template_path
+        args.preview_template_path,
+        args.find_duplicates,
+        args.metrics_out,
+        args.progress_interval,
+        args.profile,
+        ScanOptions(
+            args.max_depth, args.include, args.exclude, args.ignore_file,
+            None if args.fields is None else [
+                key.strip() for key in args.fields.split(",") if key.strip()
+            ],
+            args.follow_symlinks, args.hardlinks, args.read_order,
+            args.max_read_mbps, args.max_iops, args.adaptive_throttle,
+            args.large_directory_threshold, args.large_directory_has_part, args.archives
+        ),
+        args.estimate,
+        args.estimate_depth,
+        args.confidence,
+        args.seed,
+        args.checkpoint_path,
+        args.checkpoint_interval,
+        args.resume,
+        args.compress,
+        args.compact,
+        args.json_backend,
+        args.snapshot,
+        args.stats_engine,
+        None if args.percentile_depth < 0 else args.percentile_depth,
+        args.shard,
+        args.manifest,
+        args.slow_entry_threshold
     )
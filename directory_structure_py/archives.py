@@ -0,0 +1,185 @@
+"""archives
+
+members of zip and tar archives read in place, to scan the archives as virtual
+directories without extracting them
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+import re
+import stat
+import time
+from typing import Dict, IO, Iterator, Tuple
+
+# the suffixes of the archives, lowercased, and their formats; the compression of a tar
+# archive is detected from its content.
+ARCHIVE_SUFFIXES: Dict[str, str] = {
+    ".zip": "zip",
+    ".tar": "tar",
+    ".tar.gz": "tar",
+    ".tgz": "tar",
+    ".tar.bz2": "tar",
+    ".tbz2": "tar",
+    ".tar.xz": "tar",
+    ".txz": "tar",
+}
+
+
+def archive_format(name: str) -> str | None:
+    """Returns the format of an archive from its name: "zip", "tar", or None if the
+    name does not end with one of `ARCHIVE_SUFFIXES`."""
+    lowered: str = name.lower()
+    for suffix, format_ in ARCHIVE_SUFFIXES.items():
+        if lowered.endswith(suffix):
+            return format_
+    return None
+
+
+@dataclass
+class ArchiveMember:
+    """
+    A member of an archive.
+
+    Attributes:
+        parts: The names of the member and of the directories holding it in the
+            archive, e.g., ("docs", "index.html").
+        type: "File", "Directory" or "Unknown" (links and special files).
+        size: The size of the content in bytes, uncompressed.
+        mtime: The modification time as a POSIX timestamp.
+        link_target: The target of a symbolic or hard link, "" otherwise.
+        unsafe_name: The name of the member if it is absolute (e.g., "/x" or "C:x") or
+            goes up with "..", i.e., it would be extracted out of the archive's directory,
+            in which case `parts` is empty; "" otherwise.
+    """
+    parts: Tuple[str, ...]
+    type: str
+    size: int
+    mtime: float
+    link_target: str = ""
+    unsafe_name: str = ""
+
+
+def _parts(name: str) -> Tuple[str, ...] | None:
+    """Returns the names of the member and of the directories holding it, or None if
+    the name is absolute or goes up with ".."."""
+    if name.startswith(("/", "\\")) or re.match(r"[A-Za-z]:", name):
+        return None
+    if ".." in re.split(r"[/\\]", name):
+        return None
+    return tuple(part for part in name.split("/") if part not in ["", "."])
+
+
+def _member(
+    name: str, type_: str, size: int, mtime: float, link_target: str = ""
+) -> ArchiveMember:
+    parts: Tuple[str, ...] | None = _parts(name)
+    if parts is None:
+        return ArchiveMember((), type_, size, mtime, link_target, unsafe_name=name)
+    return ArchiveMember(parts, type_, size, mtime, link_target)
+
+
+def _read_errors() -> Tuple[type, ...]:
+    """Returns the exceptions raised by the reads of a damaged or unsupported archive."""
+    import tarfile  # pylint: disable=import-outside-toplevel
+    import zipfile  # pylint: disable=import-outside-toplevel
+    import zlib  # pylint: disable=import-outside-toplevel
+    return (
+        OSError, EOFError, RuntimeError, NotImplementedError,
+        zipfile.BadZipFile, tarfile.TarError, zlib.error
+    )
+
+
+class _MemberContent:
+    """The content of a file in an archive, whose read errors are raised as ValueError."""
+
+    def __init__(self, path: Path, ff: IO[bytes]):
+        self.path: Path = path
+        self._ff: IO[bytes] = ff
+
+    def read(self, size: int = -1) -> bytes:
+        """Reads up to `size` bytes, or to the end if `size` is negative."""
+        try:
+            return self._ff.read(size)
+        except _read_errors() as exc:
+            raise ValueError(f"{self.path}: the archive cannot be read ({exc}).") from exc
+
+
+def _zip_members(
+    path: Path, read_content: bool
+) -> Iterator[Tuple[ArchiveMember, IO[bytes] | None]]:
+    import zipfile  # pylint: disable=import-outside-toplevel
+    with zipfile.ZipFile(path) as archive:
+        # in the order of the local headers, to read the archive forward.
+        for info in sorted(archive.infolist(), key=lambda info_: info_.header_offset):
+            try:
+                mtime: float = time.mktime(info.date_time + (0, 0, -1))
+            except (OverflowError, ValueError):
+                mtime = 0.0
+            if info.is_dir():
+                yield _member(info.filename, "Directory", 0, mtime), None
+            elif stat.S_ISLNK(info.external_attr >> 16):
+                yield _member(
+                    info.filename, "Unknown", info.file_size, mtime,
+                    archive.read(info).decode("utf-8", "replace")
+                ), None
+            elif not read_content:
+                yield _member(info.filename, "File", info.file_size, mtime), None
+            else:
+                with archive.open(info) as ff:
+                    yield _member(
+                        info.filename, "File", info.file_size, mtime
+                    ), _MemberContent(path, ff)
+
+
+def _tar_members(
+    path: Path, read_content: bool
+) -> Iterator[Tuple[ArchiveMember, IO[bytes] | None]]:
+    import tarfile  # pylint: disable=import-outside-toplevel
+    # a stream, so that a compressed archive is decompressed once, front to back;
+    # without the contents, the headers of an uncompressed one are read with seeks.
+    with tarfile.open(path, mode="r|*" if read_content else "r:*") as archive:
+        for info in archive:
+            if info.isfile():
+                yield _member(
+                    info.name, "File", info.size, info.mtime
+                ), _MemberContent(path, archive.extractfile(info)) if read_content else None
+            elif info.isdir():
+                yield _member(info.name, "Directory", 0, info.mtime), None
+            else:
+                yield _member(
+                    info.name, "Unknown", info.size, info.mtime,
+                    info.linkname if info.issym() or info.islnk() else ""
+                ), None
+
+
+def iter_archive_members(
+    path: Path | str, format_: str, read_content: bool = True
+) -> Iterator[Tuple[ArchiveMember, IO[bytes] | None]]:
+    """Reads the members of an archive in the order in which they are stored.
+
+    Args:
+        path (Path | str): The path to the archive.
+        format_ (str): "zip" or "tar" (see `archive_format`).
+        read_content (bool, optional): Whether to provide the contents of the files.
+            Defaults to True.
+
+    Yields:
+        Tuple[ArchiveMember, IO[bytes] | None]: Each member with a stream of its content
+            if it is a file and `read_content` is set, which is valid until the next
+            member is read. A member with an absolute name or a name going up with ".."
+            has its name in `unsafe_name` instead of `parts`.
+
+    Raises:
+        ValueError: If `format_` is unknown, or the archive cannot be read (e.g., it is
+            truncated or corrupted, or a member is encrypted), including by the reads
+            of the streams.
+    """
+    if format_ not in ["zip", "tar"]:
+        raise ValueError(f"{format_}: 'format_' must be 'zip' or 'tar'.")
+    try:
+        if format_ == "zip":
+            yield from _zip_members(Path(path), read_content)
+        else:
+            yield from _tar_members(Path(path), read_content)
+    except _read_errors() as exc:
+        raise ValueError(f"{path}: the archive cannot be read ({exc}).") from exc
@@ -0,0 +1,110 @@
+"""checkpoint
+
+checkpoints of the directory walk to resume long scans
+"""
+
+import json
+from logging import getLogger, Logger
+import os
+import time
+from typing import Dict, Any, List, TextIO
+
+from directory_structure_py.constants import ENSURE_ASCII
+
+DEFAULT_CHECKPOINT_INTERVAL: float = 60.0
+
+
+class ScanCheckpoint:
+    """
+    A journal of the directories whose metadata is complete.
+
+    Each line of the state file is a JSON record of a directory: its metadata
+    and that of its files (and other non-directory children). The first line
+    is a header identifying the scan. A directory is recorded once its own
+    children are processed, before descending into its subdirectories, so that
+    a resumed scan reuses every recorded directory and only lists and hashes
+    the others. The records are flushed to the disk every `interval` seconds;
+    a record truncated by a crash is ignored when resuming.
+    """
+
+    def __init__(
+        self, path: str, header: Dict[str, Any],
+        resume: bool = False, interval: float = DEFAULT_CHECKPOINT_INTERVAL,
+        logger: Logger | None = None
+    ):
+        """
+        Args:
+            path (str): The path to the state file.
+            header (Dict[str, Any]): Identifies the scan, e.g., the source path and
+                the scan options. A state file with another header is not resumed.
+            resume (bool, optional): Whether to load the records of an existing state file
+                and append to it. The file is overwritten otherwise. Defaults to False.
+            interval (float, optional): The interval in seconds between flushes.
+                Defaults to `DEFAULT_CHECKPOINT_INTERVAL`.
+            logger (Logger | None, optional): Defaults to the "main" logger.
+
+        Raises:
+            ValueError: If `resume` is set and the state file belongs to another scan.
+        """
+        self.path: str = path
+        self.header: Dict[str, Any] = header
+        self.interval: float = interval
+        self.logger: Logger = logger or getLogger("main")
+        self.records: Dict[str, List[Dict[str, Any]]] = {}
+        if resume and os.path.isfile(path):
+            self._load()
+            self._file: TextIO = open(path, "a", encoding="utf-8")
+        else:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._file = open(path, "w", encoding="utf-8")
+            self._write(header)
+            self.flush()
+        self._last_flush: float = time.perf_counter()
+
+    def _load(self) -> None:
+        """Loads the records of the state file."""
+        with open(self.path, "r", encoding="utf-8") as ff:
+            lines: List[str] = ff.readlines()
+        if not lines or json.loads(lines[0]) != self.header:
+            raise ValueError(f"{self.path}: the checkpoint belongs to another scan.")
+        for line in lines[1:]:
+            try:
+                record: Dict[str, Any] = json.loads(line)
+            except json.JSONDecodeError:
+                # the last record may be truncated by a crash.
+                break
+            self.records[record["@id"]] = record["nodes"]
+        self.logger.info(
+            "resume from %d directories in the checkpoint '%s'.", len(self.records), self.path
+        )
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=ENSURE_ASCII) + "\n")
+
+    def get(self, directory_id: str) -> List[Dict[str, Any]] | None:
+        """Returns the recorded metadata of a directory and its non-directory children."""
+        return self.records.get(directory_id)
+
+    def add(self, nodes: List[Dict[str, Any]]) -> None:
+        """Records the metadata of a directory (first) and its non-directory children,
+        and flushes the records if the interval has elapsed."""
+        self._write({"@id": nodes[0]["@id"], "nodes": nodes})
+        now: float = time.perf_counter()
+        if now - self._last_flush >= self.interval:
+            self.flush()
+            self._last_flush = now
+
+    def flush(self) -> None:
+        """Writes the records to the disk."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self, remove: bool = False) -> None:
+        """Closes the state file, and removes it if `remove` is set (e.g., the scan completed)."""
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+        if remove:
+            os.remove(self.path)
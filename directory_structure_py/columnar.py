@@ -0,0 +1,374 @@
+"""columnar
+
+NumPy-backed columnar engine of the statistical information of a metadata in a list format
+
+The nodes are decoded once into arrays (parent indices, depths, sizes, modification
+times and extension/MIME codes), and the `*OfAllFiles` roll-ups are computed with
+scatter-adds from the deepest directories up to the root, one level at a time.
+The per-directory counters are carried as sparse (directory, code) pairs so that
+the memory use does not depend on the number of distinct extensions.
+"""
+
+import warnings
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+
+from directory_structure_py.constants import OUTPUT_ROOT_KEY
+
+SIZE_PERCENTILES: List[float] = [50.0, 90.0, 99.0]
+DEFAULT_PERCENTILE_DEPTH: int = 1
+# keys added to the directories in addition to those of `update_statistical_info_to_metadata_list`
+DISTRIBUTION_KEYS: List[str] = [
+    "contentSizeOfAllFilesPerExtension",
+    "contentSizeHistogramOfAllFiles",
+    "contentSizePercentilesOfAllFiles",
+    "latestDateModifiedOfAllFiles",
+]
+_SCALAR_KEYS: List[str] = ["contentSizeOfAllFiles", "numberOfAllContents", "numberOfAllFiles"]
+_NAT: int = np.iinfo(np.int64).min
+_MAX_RANK: int = np.iinfo(np.int64).max
+
+Pairs = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def _factorize(values: List[Any]) -> Tuple[np.ndarray, List[Any]]:
+    """Returns the codes of values, numbered in the order of first appearance, and the values."""
+    codes_of: Dict[Any, int] = {}
+    codes: np.ndarray = np.fromiter(
+        (codes_of.setdefault(value, len(codes_of)) for value in values),
+        dtype=np.int64, count=len(values)
+    )
+    return codes, list(codes_of)
+
+
+def _histogram_label(bucket: int) -> str:
+    """Returns the lower bound in bytes of a bucket of `size_buckets`."""
+    return "0" if bucket == 0 else str(2 ** (bucket - 1))
+
+
+def size_buckets(sizes: np.ndarray) -> np.ndarray:
+    """Returns the power-of-2 buckets of sizes: 0 for empty files, and k for [2^(k-1), 2^k)."""
+    buckets: np.ndarray = np.zeros(sizes.shape, dtype=np.int64)
+    positive: np.ndarray = sizes > 0
+    # frexp returns the exponent e such that size = m * 2^e with 0.5 <= m < 1.
+    buckets[positive] = np.frexp(sizes[positive].astype(np.float64))[1]
+    return buckets
+
+
+class ColumnarStats:
+    """
+    Columns of a metadata in a list format for vectorized roll-ups.
+
+    Only the nodes under the root, i.e., the first node without a parent, are
+    updated, as in `update_statistical_info_to_metadata_list`. The statistics of a
+    directory start from the values of its own children set by the scan, and those of
+    its subdirectories are added to them, so that both engines give the same values
+    (and the same order of the keys if the list is in the scan order).
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        """
+        Args:
+            data (Dict[str, Any]): A metadata in a list format, i.e., the output of
+                `get_metadata_of_files_in_list_format`.
+        """
+        self.nodes: List[Dict[str, Any]] = data.get(OUTPUT_ROOT_KEY, [])
+        n_nodes: int = len(self.nodes)
+        index_of: Dict[str, int] = {node["@id"]: ii for ii, node in enumerate(self.nodes)}
+        self.parent: np.ndarray = np.fromiter(
+            (index_of.get(node.get("parent", {}).get("@id"), -1) for node in self.nodes),
+            dtype=np.int64, count=n_nodes
+        )
+        self.is_directory: np.ndarray = np.fromiter(
+            (node.get("type") == "Directory" for node in self.nodes),
+            dtype=bool, count=n_nodes
+        )
+        self.root: int = next(
+            (ii for ii, node in enumerate(self.nodes) if not node.get("parent", {})), -1
+        )
+        self.depth, self.top = self._depths()
+        self.directories: np.ndarray = np.flatnonzero(
+            self.is_directory & (self.top == self.root)
+        )
+        self.files: np.ndarray = np.flatnonzero(
+            ~self.is_directory & (self.top == self.root) & (self.parent >= 0)
+        )
+        file_nodes: List[Dict[str, Any]] = [self.nodes[ii] for ii in self.files.tolist()]
+        self.size: np.ndarray = np.fromiter(
+            (node.get("contentSize", -1) for node in file_nodes),
+            dtype=np.int64, count=len(file_nodes)
+        )
+        self.date_modified: np.ndarray = np.array(
+            [node.get("dateModified", "NaT") for node in file_nodes], dtype="datetime64[s]"
+        ).view(np.int64)
+        self.extension, self.extensions = _factorize(
+            [node.get("extension", "") for node in file_nodes]
+        )
+        self.mimetype, self.mimetypes = _factorize(
+            [node.get("mimetype") for node in file_nodes]
+        )
+        self.max_depth: int = int(self.depth.max()) if n_nodes else 0
+
+    def _depths(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the depth and the topmost ancestor of each node by pointer jumping."""
+        n_nodes: int = len(self.parent)
+        depth: np.ndarray = np.zeros(n_nodes, dtype=np.int64)
+        top: np.ndarray = np.arange(n_nodes, dtype=np.int64)
+        ancestor: np.ndarray = self.parent.copy()
+        for _ in range(n_nodes):
+            moving: np.ndarray = np.flatnonzero(ancestor >= 0)
+            if not moving.size:
+                break
+            depth[moving] += 1
+            top[moving] = ancestor[moving]
+            ancestor[moving] = self.parent[ancestor[moving]]
+        return depth, top
+
+    def _levels(self, owners: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the indices of `owners` sorted by depth and the bounds of each depth."""
+        order: np.ndarray = np.argsort(self.depth[owners], kind="stable")
+        bounds: np.ndarray = np.searchsorted(
+            self.depth[owners][order], np.arange(self.max_depth + 2)
+        )
+        return order, bounds
+
+    def roll_up_scalar(self, own: np.ndarray, reduce: np.ufunc = np.add) -> np.ndarray:
+        """Aggregates a value of each node over its subtree.
+
+        Args:
+            own (np.ndarray): The value of each node itself.
+            reduce (np.ufunc, optional): `np.add` for sums or `np.maximum` for maxima.
+                Defaults to `np.add`.
+
+        Returns:
+            np.ndarray: The aggregated value of each node.
+        """
+        total: np.ndarray = own.copy()
+        order, bounds = self._levels(self.directories)
+        for level in range(self.max_depth, 0, -1):
+            children: np.ndarray = self.directories[order[bounds[level]:bounds[level + 1]]]
+            reduce.at(total, self.parent[children], total[children])
+        return total
+
+    def roll_up_pairs(
+        self, owners: np.ndarray, codes: np.ndarray, weights: np.ndarray, ranks: np.ndarray
+    ) -> Pairs:
+        """Sums weights per directory and code over the subtrees.
+
+        Args:
+            owners (np.ndarray): The directory of each entry.
+            codes (np.ndarray): The code (e.g., of an extension) of each entry.
+            weights (np.ndarray): The weight of each entry (e.g., a number of files).
+            ranks (np.ndarray): The rank of each entry; the codes of a directory are sorted
+                by the smallest rank among its subtree.
+
+        Returns:
+            Pairs: The directories, the codes and the sums, sorted by directory and rank.
+        """
+        n_codes: int = int(codes.max()) + 1 if codes.size else 1
+        order, bounds = self._levels(owners)
+        results: List[Tuple[np.ndarray, ...]] = []
+        carried: Tuple[np.ndarray, ...] = (np.empty(0, np.int64),) * 3
+        for level in range(self.max_depth, -1, -1):
+            selected: np.ndarray = order[bounds[level]:bounds[level + 1]]
+            keys: np.ndarray = np.concatenate(
+                [owners[selected] * n_codes + codes[selected], carried[0]]
+            )
+            unique_keys, inverse = np.unique(keys, return_inverse=True)
+            sums: np.ndarray = np.zeros(len(unique_keys), dtype=np.int64)
+            np.add.at(sums, inverse, np.concatenate([weights[selected], carried[1]]))
+            min_ranks: np.ndarray = np.full(len(unique_keys), _MAX_RANK, dtype=np.int64)
+            np.minimum.at(min_ranks, inverse, np.concatenate([ranks[selected], carried[2]]))
+            level_owners: np.ndarray = unique_keys // n_codes
+            level_codes: np.ndarray = unique_keys % n_codes
+            results.append((level_owners, level_codes, sums, min_ranks))
+            parents: np.ndarray = self.parent[level_owners]
+            attached: np.ndarray = parents >= 0
+            carried = (
+                parents[attached] * n_codes + level_codes[attached],
+                sums[attached], min_ranks[attached]
+            )
+        all_owners, all_codes, all_sums, all_ranks = (
+            np.concatenate([result[ii] for result in results]) for ii in range(4)
+        )
+        order = np.lexsort((all_ranks, all_owners))
+        return all_owners[order], all_codes[order], all_sums[order]
+
+    def _own_counters(self, key: str) -> Tuple[Pairs, np.ndarray, List[Any]]:
+        """Returns the entries of a counter of the directories set by the scan.
+
+        Returns:
+            Tuple[Pairs, np.ndarray, List[Any]]: The directories, the codes and the counts,
+                the ranks in the scan order, and the counted values.
+        """
+        owners: List[int] = []
+        values: List[Any] = []
+        counts: List[int] = []
+        positions: List[int] = []
+        for ii in self.directories.tolist():
+            for position, (value, count) in enumerate(self.nodes[ii].get(key, {}).items()):
+                owners.append(ii)
+                values.append(value)
+                counts.append(count)
+                positions.append(position)
+        codes, labels = _factorize(values)
+        owners_: np.ndarray = np.array(owners, dtype=np.int64)
+        width: int = max(positions, default=0) + 1
+        ranks: np.ndarray = owners_ * width + np.array(positions, dtype=np.int64)
+        return (owners_, codes, np.array(counts, dtype=np.int64)), ranks, labels
+
+    def _sized_files(self) -> np.ndarray:
+        """Returns the positions in `files` of the files with a size."""
+        return np.flatnonzero(self.size >= 0)
+
+    def size_percentiles(
+        self, percentiles: List[float] | None = None,
+        max_depth: int | None = DEFAULT_PERCENTILE_DEPTH
+    ) -> Dict[int, Dict[str, float]]:
+        """Returns the percentiles of the sizes of all the files under the directories.
+
+        The percentiles are interpolated linearly as `numpy.percentile` does. The files
+        are sorted once per depth, so the cost grows with `max_depth`.
+
+        Args:
+            percentiles (List[float] | None, optional): The percentiles in [0, 100].
+                Defaults to `SIZE_PERCENTILES`.
+            max_depth (int | None, optional): The depth of the deepest directories, the
+                root being at depth 0, or None for all the directories. Defaults to
+                `DEFAULT_PERCENTILE_DEPTH`.
+
+        Returns:
+            Dict[int, Dict[str, float]]: The percentiles of each directory containing
+                files with a size, keyed by its index in the list, e.g., {"p50": 10.0}.
+        """
+        percentiles = SIZE_PERCENTILES if percentiles is None else percentiles
+        sized: np.ndarray = self._sized_files()
+        sizes: np.ndarray = self.size[sized]
+        ancestor: np.ndarray = self.parent[self.files[sized]]
+        dst: Dict[int, Dict[str, float]] = {}
+        for level in range(self.max_depth, -1, -1):
+            moving: np.ndarray = self.depth[ancestor] > level
+            ancestor[moving] = self.parent[ancestor[moving]]
+            if max_depth is not None and level > max_depth:
+                continue
+            selected: np.ndarray = self.depth[ancestor] == level
+            order: np.ndarray = np.lexsort((sizes[selected], ancestor[selected]))
+            sorted_sizes: np.ndarray = sizes[selected][order].astype(np.float64)
+            owners, starts, counts = np.unique(
+                ancestor[selected][order], return_index=True, return_counts=True
+            )
+            values: List[List[float]] = []
+            for percentile in percentiles:
+                position: np.ndarray = (counts - 1) * (percentile / 100.0)
+                lower: np.ndarray = np.floor(position).astype(np.int64)
+                upper: np.ndarray = np.ceil(position).astype(np.int64)
+                low: np.ndarray = sorted_sizes[starts + lower]
+                values.append(
+                    (low + (sorted_sizes[starts + upper] - low) * (position - lower)).tolist()
+                )
+            labels: List[str] = [f"p{percentile:g}" for percentile in percentiles]
+            for jj, owner in enumerate(owners.tolist()):
+                dst[owner] = {label: value[jj] for label, value in zip(labels, values)}
+        return dst
+
+    def update(self, percentile_depth: int | None = DEFAULT_PERCENTILE_DEPTH) -> None:
+        """Writes the roll-ups and the distributions (see `DISTRIBUTION_KEYS`) to the nodes.
+
+        Args:
+            percentile_depth (int | None, optional): See `size_percentiles`.
+                Defaults to `DEFAULT_PERCENTILE_DEPTH`.
+        """
+        n_nodes: int = len(self.nodes)
+        directories: List[int] = self.directories.tolist()
+        for key in _SCALAR_KEYS:
+            own: np.ndarray = np.zeros(n_nodes, dtype=np.int64)
+            own[self.directories] = np.fromiter(
+                (self.nodes[ii].get(key, 0) for ii in directories),
+                dtype=np.int64, count=len(directories)
+            )
+            total: List[int] = self.roll_up_scalar(own).tolist()
+            for ii in directories:
+                if key in self.nodes[ii]:
+                    self.nodes[ii][key] = total[ii]
+
+        for key, list_key in [
+            ("numberOfAllFilesPerExtension", "extensionsOfAllFiles"),
+            ("numberOfAllFilesPerMIMEType", "mimetypesOfAllFiles"),
+        ]:
+            pairs, ranks, labels = self._own_counters(key)
+            counters: Dict[int, Dict[Any, int]] = self._to_dicts(
+                self.roll_up_pairs(*pairs, ranks), labels
+            )
+            for ii in directories:
+                if key in self.nodes[ii]:
+                    self.nodes[ii][key] = counters.get(ii, {})
+                    self.nodes[ii][list_key] = list(self.nodes[ii][key].keys())
+
+        sized: np.ndarray = self._sized_files()
+        owners: np.ndarray = self.parent[self.files[sized]]
+        sizes: np.ndarray = self.size[sized]
+        per_extension: Dict[int, Dict[Any, int]] = self._to_dicts(self.roll_up_pairs(
+            owners, self.extension[sized], sizes, self.files[sized]
+        ), self.extensions)
+        buckets: np.ndarray = size_buckets(sizes)
+        histograms: Dict[int, Dict[Any, int]] = self._to_dicts(self.roll_up_pairs(
+            owners, buckets, np.ones(len(sizes), dtype=np.int64), buckets
+        ), [_histogram_label(bucket) for bucket in range(int(buckets.max(initial=0)) + 1)])
+        percentiles: Dict[int, Dict[str, float]] = self.size_percentiles(
+            max_depth=percentile_depth
+        )
+        for ii in directories:
+            if "contentSizeOfAllFiles" not in self.nodes[ii]:
+                continue
+            self.nodes[ii]["contentSizeOfAllFilesPerExtension"] = per_extension.get(ii, {})
+            self.nodes[ii]["contentSizeHistogramOfAllFiles"] = histograms.get(ii, {})
+            if percentile_depth is None or self.depth[ii] <= percentile_depth:
+                self.nodes[ii]["contentSizePercentilesOfAllFiles"] = percentiles.get(ii, {})
+
+        own_dates: np.ndarray = np.full(n_nodes, _NAT, dtype=np.int64)
+        np.maximum.at(own_dates, self.parent[self.files], self.date_modified)
+        latest: np.ndarray = self.roll_up_scalar(own_dates, np.maximum)
+        formatted: np.ndarray = np.datetime_as_string(latest.view("datetime64[s]"))
+        for ii in directories:
+            if latest[ii] != _NAT:
+                self.nodes[ii]["latestDateModifiedOfAllFiles"] = str(formatted[ii])
+
+    @staticmethod
+    def _to_dicts(pairs: Pairs, labels: List[Any]) -> Dict[int, Dict[Any, int]]:
+        """Converts the output of `roll_up_pairs` to a dictionary per directory."""
+        dst: Dict[int, Dict[Any, int]] = {}
+        for owner, code, value in zip(*(column.tolist() for column in pairs)):
+            if owner not in dst:
+                dst[owner] = {}
+            dst[owner][labels[code]] = value
+        return dst
+
+
+def update_statistical_info_with_columns(
+    src: Dict[str, Any], percentile_depth: int | None = DEFAULT_PERCENTILE_DEPTH
+) -> Dict[str, Any]:
+    """Updates the statistical information in a metadata list with `ColumnarStats`.
+
+    The `*OfAllFiles` values are those of `update_statistical_info_to_metadata_list`,
+    and the directories with sizes also get the keys of `DISTRIBUTION_KEYS`:
+    the total size per extension, a histogram of the sizes with power-of-2 buckets
+    keyed by their lower bound, the percentiles of the sizes (down to
+    `percentile_depth`), and the latest modification date of the files.
+
+    Args:
+        src (Dict[str, Any]): A dictionary containing a list of metadata under the key
+            specified by `OUTPUT_ROOT_KEY`.
+        percentile_depth (int | None, optional): The depth of the deepest directories
+            with percentiles, or None for all. Defaults to `DEFAULT_PERCENTILE_DEPTH`.
+
+    Returns:
+        Dict[str, Any]: The input dictionary with updated statistical information for
+            directories. Returns the original dictionary if no root directory is found.
+    """
+    stats = ColumnarStats(src)
+    if stats.root < 0 or not stats.is_directory[stats.root]:
+        warnings.warn("No root metadata found. exit.")
+        return src
+    stats.update(percentile_depth)
+    return src
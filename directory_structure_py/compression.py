@@ -0,0 +1,187 @@
+"""compression
+
+transparent compression of the outputs and decompression of the inputs
+"""
+
+import gzip
+import io
+import lzma
+import os
+import queue
+import threading
+from typing import BinaryIO, Dict, List, TextIO
+
+COMPRESSIONS: List[str] = ["gzip", "zstd", "xz"]
+COMPRESSION_EXTENSIONS: Dict[str, str] = {"gzip": ".gz", "zstd": ".zst", "xz": ".xz"}
+COMPRESSION_MAGIC_NUMBERS: Dict[str, bytes] = {
+    "gzip": b"\x1f\x8b",
+    "zstd": b"\x28\xb5\x2f\xfd",
+    "xz": b"\xfd7zXZ\x00",
+}
+COMPRESSION_CHUNK_SIZE: int = 1024 * 1024
+COMPRESSION_QUEUE_SIZE: int = 8
+
+
+def infer_compression(path: str, compression: str = "") -> str:
+    """Returns `compression` if set, or the compression inferred from the extension of `path`.
+
+    Raises:
+        ValueError: If `compression` is not supported.
+    """
+    if compression:
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"{compression}: 'compression' must be one of {COMPRESSIONS}.")
+        return compression
+    for name, extension in COMPRESSION_EXTENSIONS.items():
+        if str(path).endswith(extension):
+            return name
+    return ""
+
+
+def strip_compression_extension(path: str) -> str:
+    """Returns `path` without the extension of a compression if any."""
+    for extension in COMPRESSION_EXTENSIONS.values():
+        if str(path).endswith(extension):
+            return str(path)[:-len(extension)]
+    return str(path)
+
+
+def add_compression_extension(path: str, compression: str) -> str:
+    """Returns `path` ending with the extension of `compression` ("" for none)."""
+    if not compression or str(path).endswith(COMPRESSION_EXTENSIONS[compression]):
+        return str(path)
+    return f"{path}{COMPRESSION_EXTENSIONS[compression]}"
+
+
+def _open_compressor(fileobj: BinaryIO, compression: str) -> BinaryIO:
+    """Returns a binary stream compressing the data written to `fileobj`.
+
+    Raises:
+        ImportError: If `compression` is "zstd" and `zstandard` is not installed.
+    """
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=fileobj, mode="wb")
+    if compression == "xz":
+        return lzma.LZMAFile(fileobj, "wb")
+    import zstandard  # pylint: disable=import-outside-toplevel
+    return zstandard.ZstdCompressor().stream_writer(fileobj, closefd=False)
+
+
+class _ThreadedCompressedWriter(io.RawIOBase):
+    """
+    A raw binary stream compressing and writing its data on a background thread.
+
+    `write` only queues the chunks, so that the compression (which releases
+    the GIL in zlib, lzma and zstandard) overlaps with the producer, e.g.,
+    the JSON encoder. At most `COMPRESSION_QUEUE_SIZE` chunks are queued.
+    """
+
+    def __init__(self, path: str, compression: str):
+        super().__init__()
+        self._file: BinaryIO = open(path, "wb")
+        try:
+            self._stream: BinaryIO = _open_compressor(self._file, compression)
+        except BaseException:
+            self._file.close()
+            raise
+        self._queue: queue.Queue = queue.Queue(maxsize=COMPRESSION_QUEUE_SIZE)
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            chunk: bytes | None = self._queue.get()
+            if chunk is None:
+                return
+            if self._error is not None:
+                continue
+            try:
+                self._stream.write(chunk)
+            except BaseException as ex:  # pylint: disable=broad-exception-caught
+                # keep consuming so that `write` never blocks on a full queue.
+                self._error = ex
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        if self._error is not None:
+            raise self._error
+        self._queue.put(bytes(b))
+        return len(b)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        try:
+            self._stream.close()
+        finally:
+            self._file.close()
+            super().close()
+        if self._error is not None:
+            raise self._error
+
+
+def open_output(path: str, compression: str = "") -> TextIO:
+    """Opens a text file to write, compressed with `compression` if set.
+
+    The compressed data is produced on a background thread in a streaming
+    manner, so that the whole output is never held in memory.
+
+    Args:
+        path (str): The path to the file.
+        compression (str, optional): One of `COMPRESSIONS`, or "" for no compression.
+            Defaults to "".
+
+    Returns:
+        TextIO: A UTF-8 text stream.
+
+    Raises:
+        ValueError: If `compression` is not supported.
+        ImportError: If `compression` is "zstd" and `zstandard` is not installed.
+    """
+    if not compression:
+        return open(path, "w", encoding="utf-8")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"{compression}: 'compression' must be one of {COMPRESSIONS}.")
+    raw = _ThreadedCompressedWriter(path, compression)
+    return io.TextIOWrapper(
+        io.BufferedWriter(raw, buffer_size=COMPRESSION_CHUNK_SIZE), encoding="utf-8"
+    )
+
+
+def detect_compression(path: str) -> str:
+    """Returns the compression of a file detected from its magic number ("" for none)."""
+    length: int = max(len(magic) for magic in COMPRESSION_MAGIC_NUMBERS.values())
+    with open(path, "rb") as ff:
+        head: bytes = ff.read(length)
+    for name, magic in COMPRESSION_MAGIC_NUMBERS.items():
+        if head.startswith(magic):
+            return name
+    return ""
+
+
+def open_input(path: str | os.PathLike) -> TextIO:
+    """Opens a text file to read, decompressing it transparently if it is compressed.
+
+    The compression is detected from the content, not the extension.
+
+    Raises:
+        FileNotFoundError: If the specified file does not exist.
+        ImportError: If the file is compressed with zstd and `zstandard` is not installed.
+    """
+    compression: str = detect_compression(path)
+    if compression == "gzip":
+        return gzip.open(path, "rt", encoding="utf-8")
+    if compression == "xz":
+        return lzma.open(path, "rt", encoding="utf-8")
+    if compression == "zstd":
+        import zstandard  # pylint: disable=import-outside-toplevel
+        return io.TextIOWrapper(
+            zstandard.ZstdDecompressor().stream_reader(open(path, "rb")),
+            encoding="utf-8"
+        )
+    return open(path, "r", encoding="utf-8")
@@ -1,13 +1,20 @@
 """conversion
 """
 
+from dataclasses import dataclass
 import datetime
+import itertools
 import json
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Iterator, TextIO, Tuple, TYPE_CHECKING
 import warnings
-from rocrate.rocrate import ROCrate
-from directory_structure_py.constants import OUTPUT_ROOT_KEY, DATETIME_FMT
+from directory_structure_py.constants import (
+    OUTPUT_ROOT_KEY, DATETIME_FMT, ENSURE_ASCII, JSON_OUTPUT_INDENT
+)
+from directory_structure_py.reader import iter_graph_nodes
+
+if TYPE_CHECKING:
+    from rocrate.rocrate import ROCrate
 
 
 def convert_meta_list_json_to_tsv(src: Dict[str, Any]) -> List[List[str]]:
@@ -50,29 +57,48 @@ def convert_meta_list_json_to_tsv(src: Dict[str, Any]) -> List[List[str]]:
     return dst
 
 
+def iter_meta_list_json_to_tsv_from_file(src: Path | str) -> Iterator[List[str]]:
+    """Yields the rows of `convert_meta_list_json_to_tsv_from_file` one by one.
+
+    The file is read twice with `iter_graph_nodes`, first for the columns and then
+    for the rows, so that only one node is held in memory at a time.
+
+    Args:
+        src: The path to the JSON file.
+
+    Yields:
+        List[str]: The column headers, then a row per node with values as strings.
+
+    Raises:
+        FileNotFoundError: If the specified file does not exist.
+        json.JSONDecodeError: If the file contains invalid JSON.
+    """
+    columns: List[str] = sorted({key for node in iter_graph_nodes(src) for key in node})
+    yield columns
+    for node in iter_graph_nodes(src):
+        yield [str(node.get(key, "")) for key in columns]
+
+
 def convert_meta_list_json_to_tsv_from_file(src: str) -> List[List[str]]:
     """Converts a JSON file containing a list of dictionaries into a TSV-compatible list of lists.
 
-    This function reads a JSON file from the specified path, parses it, and then uses 
-    `convert_meta_list_json_to_tsv` to convert the JSON data into a TSV-compatible format.
+    This function reads a JSON file from the specified path incrementally (see
+    `iter_meta_list_json_to_tsv_from_file`) and returns the same rows as
+    `convert_meta_list_json_to_tsv` without loading the whole JSON data.
+    A file compressed with gzip, zstd or xz is decompressed transparently.
 
     Args:
         src: The path to the JSON file.
 
     Returns:
         A list of lists representing the data in TSV format. The first list contains the column headers.
-        Each subsequent list represents a row, with values as strings. Returns an empty list if there's an error 
-        reading the file or if the JSON is invalid or doesn't match the expected structure.
+        Each subsequent list represents a row, with values as strings.
 
     Raises:
         FileNotFoundError: If the specified file does not exist.
         json.JSONDecodeError: If the file contains invalid JSON.
     """
-    output: List[str] = []
-    with open(src, "r", encoding="utf-8") as ff:
-        data: Dict[str, Any] = json.load(ff)
-        output = convert_meta_list_json_to_tsv(data)
-    return output
+    return list(iter_meta_list_json_to_tsv_from_file(src))
 
 
 def _construct_tree_from_list(
@@ -176,9 +202,11 @@ def list2tree_from_file(src: Path | str, structure_only: bool = False) -> Dict[s
     """
     Constructs a hierarchical tree structure from a JSON metadata file.
 
-    This function reads a JSON file from the provided path (`src`), 
-    loads its content, and passes it to the `list2tree` function to generate 
-    a hierarchical tree structure based on the metadata.
+    This function reads the nodes of a JSON file from the provided path (`src`)
+    incrementally with `iter_graph_nodes`, and passes them to the `list2tree` function
+    to generate a hierarchical tree structure based on the metadata.
+    A file compressed with gzip, zstd or xz is decompressed transparently.
+    See `write_tree_from_file` to convert a file without holding the tree in memory.
 
     Args:
         src (Path | str): The path to the JSON file containing the metadata. 
@@ -197,13 +225,299 @@ def list2tree_from_file(src: Path | str, structure_only: bool = False) -> Dict[s
         JSONDecodeError: If the file is not a valid JSON.
         OSError: If an error occurs while reading the file.
     """
-    with open(src, "r", encoding="utf-8") as ff:
-        return list2tree(json.load(ff), structure_only)
+    src_: Dict[str, Any] = {}
+    nodes: List[Dict[str, Any]] = list(iter_graph_nodes(src, src_))
+    src_[OUTPUT_ROOT_KEY] = nodes
+    return list2tree(src_, structure_only)
+
+
+# the number of chunks joined into a single write by `write_list_as_tree`
+TREE_WRITE_BATCH: int = 4096
+
+
+@dataclass
+class _TreeFrame:
+    """A directory being written by `write_list_as_tree`."""
+    children: Iterator[Dict[str, Any]]
+    level: int
+    close: str
+    suffix: str
+    first: bool = True
+
+
+class _TreeEncoder:
+    """Encodes the parts of the tree format with the layout of `json.dump`."""
+
+    def __init__(self, structure_only: bool, compact: bool):
+        self.structure_only: bool = structure_only
+        self.compact: bool = compact
+        self.key_separator: str = ":" if compact else ": "
+
+    def newline(self, level: int) -> str:
+        return "" if self.compact else "\n" + " " * (JSON_OUTPUT_INDENT * level)
+
+    def encode(self, value: Any, level: int) -> str:
+        """Encodes a value starting at the indentation level `level`."""
+        if self.compact:
+            return json.dumps(value, separators=(",", ":"), ensure_ascii=ENSURE_ASCII)
+        # newlines in strings are escaped, so those of the output are the indentation.
+        return json.dumps(
+            value, indent=JSON_OUTPUT_INDENT, ensure_ascii=ENSURE_ASCII
+        ).replace("\n", self.newline(level))
+
+    def encode_item(self, key: str, value: Any, level: int) -> str:
+        return f"{self.encode(key, level)}{self.key_separator}{self.encode(value, level)}"
+
+    def open_directory(
+        self, node: Dict[str, Any], level: int, children: Iterator[Dict[str, Any]]
+    ) -> Tuple[str, _TreeFrame]:
+        """Returns the text preceding the children of a directory and its frame."""
+        head: str = "{" + self.newline(level + 1) + self.encode(node["@id"], level + 1)
+        head += self.key_separator
+        if self.structure_only:
+            return head, _TreeFrame(
+                children, level + 2, self.newline(level + 1) + "]",
+                self.newline(level) + "}"
+            )
+        # `list2tree` replaces `hasPart` in place, or appends it if missing.
+        keys: List[str] = list(node.keys())
+        if "hasPart" not in keys:
+            keys.append("hasPart")
+        position: int = keys.index("hasPart")
+        items: List[str] = [
+            self.newline(level + 2) + self.encode_item(key, node[key], level + 2)
+            for key in keys[:position]
+        ]
+        head += "{" + ",".join(items) + ("," if items else "")
+        head += self.newline(level + 2) + self.encode("hasPart", level + 2) + self.key_separator
+        suffix: str = "".join(
+            "," + self.newline(level + 2) + self.encode_item(key, node[key], level + 2)
+            for key in keys[position + 1:]
+        )
+        suffix += self.newline(level + 1) + "}" + self.newline(level) + "}"
+        return head, _TreeFrame(children, level + 3, self.newline(level + 2) + "]", suffix)
+
+    def encode_leaf(self, node: Dict[str, Any], level: int) -> str:
+        if self.structure_only:
+            return self.encode(node.get("@id", "no id"), level)
+        return self.encode(node, level)
+
+
+def _iter_tree_chunks(
+    root: Dict[str, Any], nodes: Dict[str, List[Dict[str, Any]]],
+    encoder: _TreeEncoder, level: int
+) -> Iterator[str]:
+    """Yields the text of the subtree of `root` in depth-first order.
+
+    Only the directories from the root to the current node are held, so that
+    the memory use grows with the depth of the tree, not with its size.
+    """
+
+    def _children(node: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        for part in node.get("hasPart", []):
+            for child in nodes.get(part["@id"], []):
+                if child.get("parent", {}).get("@id") == node["@id"]:
+                    yield child
+
+    if root.get("type", "Unknown") != "Directory":
+        yield encoder.encode_leaf(root, level)
+        return
+    head, frame = encoder.open_directory(root, level, _children(root))
+    yield head
+    stack: List[_TreeFrame] = [frame]
+    while stack:
+        frame = stack[-1]
+        child: Dict[str, Any] | None = next(frame.children, None)
+        if child is None:
+            stack.pop()
+            yield ("[]" if frame.first else frame.close) + frame.suffix
+            continue
+        separator: str = ("[" if frame.first else ",") + encoder.newline(frame.level)
+        frame.first = False
+        if child.get("type", "Unknown") != "Directory":
+            yield separator + encoder.encode_leaf(child, frame.level)
+            continue
+        head, child_frame = encoder.open_directory(child, frame.level, _children(child))
+        yield separator + head
+        stack.append(child_frame)
+
+
+def write_list_as_tree(
+    src: Dict[str, Any], ff: TextIO, structure_only: bool = False, compact: bool = False
+) -> None:
+    """Writes a metadata in a list format to a text stream in the tree format.
+
+    The output is that of `json.dump(list2tree(src, structure_only), ff, ...)` with
+    the indentation of `JSON_OUTPUT_INDENT` (or none if `compact`), but the nested
+    structure is never built: the nodes are written in depth-first order through
+    an index of `@id`, and `src` is left unchanged.
+
+    Args:
+        src (Dict[str, Any]): A metadata dictionary with a OUTPUT_ROOT_KEY key.
+        ff (TextIO): The text stream to write to.
+        structure_only (bool, optional): Whether to output the structure only.
+            Defaults to False.
+        compact (bool, optional): Whether to omit the indentation. Defaults to False.
+
+    Raises:
+        KeyError: If the OUTPUT_ROOT_KEY key is missing in the source dictionary.
+    """
+    contents: List[Dict[str, Any]] = src[OUTPUT_ROOT_KEY]
+    encoder = _TreeEncoder(structure_only, compact)
+    root: Dict[str, Any] = {}
+    for node in contents:
+        if not node.get("parent", {}):
+            root = node
+            break
+    if not root:
+        warnings.warn("No root metadata found. exit.")
+        ff.write(encoder.encode(src, 0))
+        return
+    nodes: Dict[str, List[Dict[str, Any]]] = {}
+    for node in contents:
+        nodes.setdefault(node["@id"], []).append(node)
+    chunks: List[str] = [
+        "{" + encoder.newline(1) + encoder.encode_item("root_path", src["root_path"], 1),
+        "," + encoder.newline(1) + encoder.encode(OUTPUT_ROOT_KEY, 1) + encoder.key_separator,
+    ]
+    for chunk in _iter_tree_chunks(root, nodes, encoder, 1):
+        chunks.append(chunk)
+        if len(chunks) >= TREE_WRITE_BATCH:
+            ff.write("".join(chunks))
+            chunks.clear()
+    chunks.append(
+        "," + encoder.newline(1) + encoder.encode_item("dateCreated", src["dateCreated"], 1)
+    )
+    chunks.append(encoder.newline(0) + "}")
+    ff.write("".join(chunks))
+
+
+@dataclass
+class _StreamFrame:
+    """A directory being written by `write_tree_from_file`."""
+    node_id: str
+    parts: List[str]
+    # None for the directories that `list2tree` drops, i.e., missing from `hasPart`
+    frame: _TreeFrame | None
+    position: int = 0
+
+
+def _iter_tree_chunks_from_stream(
+    nodes: Iterator[Dict[str, Any]], encoder: _TreeEncoder, level: int
+) -> Iterator[str]:
+    """Yields the text of the tree of nodes given in the scan order.
+
+    In the scan order, a directory is followed by its children in the order of its
+    `hasPart`, each child directory being followed by its own subtree, so that the
+    directories to close are known as soon as the next node is read.
+
+    Raises:
+        ValueError: If the nodes are not in the scan order.
+    """
+    stack: List[_StreamFrame] = []
+
+    def _close(frame: _StreamFrame) -> str:
+        if frame.frame is None:
+            return ""
+        return ("[]" if frame.frame.first else frame.frame.close) + frame.frame.suffix
+
+    def _open(node: Dict[str, Any], level_: int) -> Tuple[str, _StreamFrame | None]:
+        if node.get("type", "Unknown") != "Directory":
+            return encoder.encode_leaf(node, level_), None
+        head, frame = encoder.open_directory(node, level_, iter(()))
+        parts: List[str] = [part["@id"] for part in node.get("hasPart", [])]
+        return head, _StreamFrame(node["@id"], parts, frame)
+
+    for node in nodes:
+        if not stack:
+            if node.get("parent", {}):
+                raise ValueError(f"{node['@id']}: the first node must be the root.")
+            text, root = _open(node, level)
+            yield text
+            if root is None:
+                return
+            stack.append(root)
+            continue
+        parent_id: str | None = node.get("parent", {}).get("@id")
+        while stack and stack[-1].node_id != parent_id:
+            yield _close(stack.pop())
+        if not stack:
+            raise ValueError(f"{node['@id']}: not in the scan order.")
+        parent: _StreamFrame = stack[-1]
+        try:
+            parent.position = parent.parts.index(node["@id"], parent.position) + 1
+        except ValueError as ex:
+            if node["@id"] in parent.parts:
+                raise ValueError(f"{node['@id']}: not in the scan order.") from ex
+            if node.get("type", "Unknown") == "Directory":
+                stack.append(_StreamFrame(node["@id"], [], None))
+            continue
+        if parent.frame is None:
+            continue
+        separator: str = ("[" if parent.frame.first else ",") + encoder.newline(
+            parent.frame.level
+        )
+        parent.frame.first = False
+        text, child = _open(node, parent.frame.level)
+        yield separator + text
+        if child is not None:
+            stack.append(child)
+    while stack:
+        yield _close(stack.pop())
+
+
+def write_tree_from_file(
+    src: Path | str, ff: TextIO, structure_only: bool = False, compact: bool = False
+) -> None:
+    """Converts a metadata file in a list format to the tree format in bounded memory.
+
+    The nodes are read incrementally with `iter_graph_nodes` and written as soon as
+    they are read, so that only the directories from the root to the current node
+    are held. The output is that of `write_list_as_tree` on the loaded file, provided
+    the nodes are in the scan order of `get_metadata_of_files_in_list_format` and
+    `root_path` precedes `@graph`, as in the outputs of this package; use
+    `list2tree_from_file` otherwise.
+
+    Args:
+        src (Path | str): The path to the JSON file containing the metadata.
+        ff (TextIO): The text stream to write to.
+        structure_only (bool, optional): Whether to output the structure only.
+            Defaults to False.
+        compact (bool, optional): Whether to omit the indentation. Defaults to False.
+
+    Raises:
+        FileNotFoundError: If the specified file does not exist.
+        json.JSONDecodeError: If the file contains invalid JSON.
+        ValueError: If the nodes are not in the scan order.
+        KeyError: If `root_path` does not precede `@graph`, or `dateCreated` is missing.
+    """
+    encoder = _TreeEncoder(structure_only, compact)
+    header: Dict[str, Any] = {}
+    nodes: Iterator[Dict[str, Any]] = iter_graph_nodes(src, header)
+    first: Dict[str, Any] | None = next(nodes, None)
+    if first is None:
+        warnings.warn("No root metadata found. exit.")
+        ff.write(encoder.encode({**header, OUTPUT_ROOT_KEY: []}, 0))
+        return
+    chunks: List[str] = [
+        "{" + encoder.newline(1) + encoder.encode_item("root_path", header["root_path"], 1),
+        "," + encoder.newline(1) + encoder.encode(OUTPUT_ROOT_KEY, 1) + encoder.key_separator,
+    ]
+    for chunk in _iter_tree_chunks_from_stream(itertools.chain([first], nodes), encoder, 1):
+        chunks.append(chunk)
+        if len(chunks) >= TREE_WRITE_BATCH:
+            ff.write("".join(chunks))
+            chunks.clear()
+    chunks.append(
+        "," + encoder.newline(1) + encoder.encode_item("dateCreated", header["dateCreated"], 1)
+    )
+    chunks.append(encoder.newline(0) + "}")
+    ff.write("".join(chunks))
 
 
 def convert_meta_list_json_to_rocrate(
     src: Dict[str, str | int | List[Dict[str, Any]]]
-) -> ROCrate:
+) -> "ROCrate":
     """Converts a metadata list JSON structure into a Research Object Crate (ROCrate).
 
     This function takes a dictionary representing a metadata list in JSON format and creates a ROCrate object.
@@ -221,7 +535,12 @@ def convert_meta_list_json_to_rocrate(
         KeyError: If the input dictionary does not contain the required keys ("@graph", "root_path").
         TypeError: If the input data is not in the expected format.
 
+    Notes:
+        `rocrate` is imported on the first call so that importing this module
+        stays cheap for the JSON, TSV and tree conversions.
     """
+    from rocrate.rocrate import ROCrate  # pylint: disable=import-outside-toplevel
+
     def _get_dictionary_props(meta_: Dict[str, Any]) -> Dict[str, Any]:
         properties = {}
         for k, v in meta_.items():
@@ -0,0 +1,137 @@
+"""diff
+
+differences between two metadata snapshots in a list format
+"""
+
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Any, List, Tuple, Iterable
+
+from directory_structure_py.reader import iter_graph_nodes
+
+COMPARED_KEYS: List[str] = ["type", "contentSize", "sha256", "dateModified"]
+SIZE_KEY: str = "contentSizeOfAllFiles"
+
+
+def _summarize(node: Dict[str, Any]) -> Tuple:
+    """Returns the compact summary of a node kept in memory during a diff."""
+    return tuple(node.get(key) for key in COMPARED_KEYS) + (node.get(SIZE_KEY),)
+
+
+def _size_delta(node_id: str, old_size: int | None, new_size: int | None) -> Dict[str, Any]:
+    """Returns a change of `contentSizeOfAllFiles` of a directory."""
+    return {
+        "@id": node_id,
+        SIZE_KEY: [old_size, new_size],
+        "delta": (new_size or 0) - (old_size or 0),
+    }
+
+
+def diff_metadata(
+    old: Iterable[Dict[str, Any]], new: Iterable[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Compares two sequences of `@graph` nodes.
+
+    Only a compact summary of each node of `old` is kept in memory, and `new` is
+    consumed one node at a time, so the comparison runs in O(n) time and
+    neither snapshot needs to be loaded fully.
+    A removed file and an added file with the same `sha256` and `contentSize`
+    are reported as a move.
+
+    Args:
+        old (Iterable[Dict[str, Any]]): The nodes of the older snapshot.
+        new (Iterable[Dict[str, Any]]): The nodes of the newer snapshot.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - `added`: A list of the `@id` of the added nodes.
+            - `removed`: A list of the `@id` of the removed nodes.
+            - `modified`: A list of dictionaries with the `@id` of a node and
+              its `changes`, which map each changed key of `COMPARED_KEYS` to
+              a pair of the old and new values.
+            - `moved`: A list of dictionaries with the old (`from`) and new (`to`) `@id`.
+            - `sizeDeltas`: A list of dictionaries with the `@id` of a directory,
+              its old and new `contentSizeOfAllFiles` and their `delta`,
+              for directories whose size changed.
+            - `numberOf*`: The number of entries of each category above.
+    """
+    old_summaries: Dict[str, Tuple] = {
+        node["@id"]: _summarize(node) for node in old
+    }
+    type_index: int = COMPARED_KEYS.index("type")
+    size_index: int = COMPARED_KEYS.index("contentSize")
+    sha_index: int = COMPARED_KEYS.index("sha256")
+
+    added: List[Tuple[str, Tuple]] = []
+    modified: List[Dict[str, Any]] = []
+    size_deltas: List[Dict[str, Any]] = []
+    for node in new:
+        node_id: str = node["@id"]
+        new_summary: Tuple = _summarize(node)
+        old_summary: Tuple | None = old_summaries.pop(node_id, None)
+        if old_summary is None:
+            added.append((node_id, new_summary))
+            if new_summary[type_index] == "Directory":
+                size_deltas.append(_size_delta(node_id, None, new_summary[-1]))
+            continue
+        changes: Dict[str, List] = {
+            key: [old_summary[ii], new_summary[ii]]
+            for ii, key in enumerate(COMPARED_KEYS)
+            if old_summary[ii] != new_summary[ii]
+        }
+        if new_summary[type_index] == "Directory":
+            changes.pop("dateModified", None)
+            if old_summary[-1] != new_summary[-1]:
+                size_deltas.append(_size_delta(node_id, old_summary[-1], new_summary[-1]))
+        if changes:
+            modified.append({"@id": node_id, "changes": changes})
+
+    removed_by_content: Dict[Tuple, List[str]] = defaultdict(list)
+    for node_id, summary in old_summaries.items():
+        if summary[type_index] == "File" and summary[sha_index]:
+            removed_by_content[(summary[sha_index], summary[size_index])].append(node_id)
+        elif summary[type_index] == "Directory":
+            size_deltas.append(_size_delta(node_id, summary[-1], None))
+
+    moved: List[Dict[str, str]] = []
+    added_ids: List[str] = []
+    for node_id, summary in added:
+        candidates: List[str] = removed_by_content.get(
+            (summary[sha_index], summary[size_index]), []
+        )
+        if summary[type_index] == "File" and summary[sha_index] and candidates:
+            old_id: str = candidates.pop(0)
+            old_summaries.pop(old_id)
+            moved.append({"from": old_id, "to": node_id})
+        else:
+            added_ids.append(node_id)
+    removed_ids: List[str] = list(old_summaries.keys())
+
+    return {
+        "added": added_ids,
+        "removed": removed_ids,
+        "modified": modified,
+        "moved": moved,
+        "sizeDeltas": [d for d in size_deltas if d["delta"] != 0],
+        "numberOfAdded": len(added_ids),
+        "numberOfRemoved": len(removed_ids),
+        "numberOfModified": len(modified),
+        "numberOfMoved": len(moved),
+    }
+
+
+def diff_metadata_files(old: Path | str, new: Path | str) -> Dict[str, Any]:
+    """Compares two metadata files in a list format (.json) or JSON Lines (.jsonl).
+
+    Args:
+        old (Path | str): The path to the older metadata file.
+        new (Path | str): The path to the newer metadata file.
+
+    Returns:
+        Dict[str, Any]: The differences. See `diff_metadata`.
+
+    Raises:
+        FileNotFoundError: If a specified file does not exist.
+        json.JSONDecodeError: If a file contains invalid JSON.
+    """
+    return diff_metadata(iter_graph_nodes(old), iter_graph_nodes(new))
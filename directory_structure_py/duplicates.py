@@ -0,0 +1,161 @@
+"""duplicates
+
+detection of duplicate files in a metadata in a list format
+"""
+
+from collections import defaultdict
+import hashlib
+import os
+from pathlib import Path
+import time
+from typing import Dict, Any, IO, List
+
+from directory_structure_py.constants import OUTPUT_ROOT_KEY
+from directory_structure_py.get_metadata import calculate_sha256
+from directory_structure_py.throttle import ReadThrottle
+
+PARTIAL_HASH_SIZE: int = 4 * 1024
+
+
+def _read(ff: IO[bytes], size: int, throttle: ReadThrottle | None) -> bytes:
+    start: float = time.perf_counter()
+    chunk: bytes = ff.read(size)
+    if throttle is not None:
+        throttle.read(len(chunk), time.perf_counter() - start)
+    return chunk
+
+
+def calculate_partial_hash(
+    path: Path | str, size: int, partial_hash_size: int = PARTIAL_HASH_SIZE,
+    throttle: ReadThrottle | None = None
+) -> str:
+    """Calculates the SHA-256 hash value of the first and the last bytes of a file.
+
+    Args:
+        path (Path | str): The path to the file.
+        size (int): The size of the file in bytes.
+        partial_hash_size (int, optional): The number of bytes read from each end.
+            Defaults to `PARTIAL_HASH_SIZE`.
+        throttle (ReadThrottle | None, optional): Limits the files opened and the bytes
+            read per second. Defaults to None.
+
+    Returns:
+        str: The hexadecimal hash value. It equals the hash value of the whole
+            content if the file is not larger than `2 * partial_hash_size` bytes.
+    """
+    hash_ = hashlib.sha256()
+    if throttle is not None:
+        throttle.open_file()
+    with open(path, "rb") as ff:
+        if size <= 2 * partial_hash_size:
+            hash_.update(_read(ff, -1, throttle))
+        else:
+            hash_.update(_read(ff, partial_hash_size, throttle))
+            ff.seek(size - partial_hash_size)
+            hash_.update(_read(ff, partial_hash_size, throttle))
+    return hash_.hexdigest()
+
+
+def _file_key(path: Path, node: Dict[str, Any]) -> Any:
+    """Returns the (device, inode) of a file with several hard links, to count each
+    file once; its `@id` otherwise."""
+    if node.get("numberOfLinks", 1) > 1:
+        try:
+            stat: os.stat_result = os.stat(path)
+            return stat.st_dev, stat.st_ino
+        except OSError:
+            pass
+    return node["@id"]
+
+
+def find_duplicates(
+    src: Dict[str, Any], root_path: Path | str,
+    min_size: int = 1,
+    partial_hash_size: int = PARTIAL_HASH_SIZE,
+    throttle: ReadThrottle | None = None
+) -> List[Dict[str, Any]]:
+    """Finds groups of files with the same content in a metadata in a list format.
+
+    Files are first grouped by `contentSize`. Files in a group with more than one
+    member and without a `sha256` are then grouped by a hash value of their first
+    and last `partial_hash_size` bytes, and only files still colliding are fully
+    hashed. An existing `sha256` is used as is, so that the files which cannot be
+    opened (e.g., archive members) are compared too. `src` is not modified.
+
+    Hard links to the same file are not copies: the files referring to another link
+    (`sameFileAs`) are skipped, and the links listed separately are counted once in
+    the number of copies.
+
+    Args:
+        src (Dict[str, Any]): A metadata in a list format.
+        root_path (Path | str): The source path from which `src` was generated.
+            It is used to locate the files from their `@id`.
+        min_size (int, optional): The minimum size in bytes of the files to check.
+            Defaults to 1, i.e., empty files are ignored.
+        partial_hash_size (int, optional): The number of bytes read from each end
+            of a file for the partial hash value. Defaults to `PARTIAL_HASH_SIZE`.
+        throttle (ReadThrottle | None, optional): Limits the files opened and the bytes
+            read per second by both hashes, e.g., `ScanOptions.read_throttle()`.
+            Defaults to None.
+
+    Returns:
+        List[Dict[str, Any]]: A list of the groups of duplicate files
+            in descending order of the wasted size. Each group includes:
+            - `sha256`: The SHA-256 hash value of the content.
+            - `contentSize`: The size of each file in bytes.
+            - `numberOfFiles`: The number of files in the group.
+            - `wastedSize`: The size in bytes occupied by the redundant copies.
+            - `hasPart`: A list of dictionaries, each containing the `@id` of a file.
+    """
+    base_path: Path = Path(os.path.abspath(root_path)).parent
+
+    buckets: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    for node in src[OUTPUT_ROOT_KEY]:
+        if node.get("type") != "File" or node.get("contentSize", -1) < min_size:
+            continue
+        if "sameFileAs" in node:
+            continue
+        buckets[node["contentSize"]].append(node)
+
+    dst: List[Dict[str, Any]] = []
+    for size, nodes in buckets.items():
+        if len(nodes) < 2:
+            continue
+        full_buckets: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        partial_buckets: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for node in nodes:
+            if node.get("sha256"):
+                full_buckets[node["sha256"]].append(node)
+                continue
+            try:
+                key: str = calculate_partial_hash(
+                    base_path / node["@id"], size, partial_hash_size, throttle
+                )
+            except OSError:
+                continue
+            partial_buckets[key].append(node)
+        for candidates in partial_buckets.values():
+            # a single candidate may still equal a file whose sha256 is known.
+            if len(candidates) < 2 and not full_buckets:
+                continue
+            for node in candidates:
+                try:
+                    sha256: str = calculate_sha256(base_path / node["@id"], throttle)
+                except OSError:
+                    continue
+                full_buckets[sha256].append(node)
+        for sha256, group in full_buckets.items():
+            number_of_copies: int = len({
+                _file_key(base_path / node["@id"], node) for node in group
+            })
+            if number_of_copies < 2:
+                continue
+            dst.append({
+                "sha256": sha256,
+                "contentSize": size,
+                "numberOfFiles": len(group),
+                "wastedSize": size * (number_of_copies - 1),
+                "hasPart": [{"@id": node["@id"]} for node in group],
+            })
+    dst.sort(key=lambda group: (-group["wastedSize"], group["sha256"]))
+    return dst
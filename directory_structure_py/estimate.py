@@ -0,0 +1,226 @@
+"""estimate
+
+sampling-based estimation of the statistical information of huge trees
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field, replace
+import datetime
+import math
+import mimetypes
+import os
+from pathlib import Path
+import random
+from typing import Dict, Any, List, Tuple
+
+from directory_structure_py.constants import DATETIME_FMT, OUTPUT_ROOT_KEY
+from directory_structure_py.get_metadata import (
+    generate_id,
+    _filter_children,
+    _list_entry_types
+)
+from directory_structure_py.links import LinkTracker
+from directory_structure_py.metrics import ScanMetrics
+from directory_structure_py.scan_options import ScanOptions, IgnoreRule
+
+DEFAULT_CONFIDENCE: float = 0.95
+DEFAULT_ESTIMATE_DEPTH: int = 1
+
+
+@dataclass
+class _SubtreeEstimate:
+    """Accumulates the exact counts and the sampled file sizes of a subtree."""
+    number_of_contents: int = 0
+    number_of_files: int = 0
+    per_extension: Counter = field(default_factory=Counter)
+    per_mimetype: Counter = field(default_factory=Counter)
+    number_of_samples: int = 0
+    sum_of_sizes: int = 0
+    sum_of_squared_sizes: int = 0
+
+    def add_file(self, extension: str, mimetype: str | None, size: int | None) -> None:
+        """Counts a file, and its size if it is sampled (`size` is not None)."""
+        self.number_of_files += 1
+        self.per_extension[extension] += 1
+        self.per_mimetype[mimetype] += 1
+        if size is not None:
+            self.number_of_samples += 1
+            self.sum_of_sizes += size
+            self.sum_of_squared_sizes += size * size
+
+    def estimate_size(self, z: float) -> Dict[str, Any]:
+        """Estimates the total size of the files from the sampled sizes.
+
+        The total is the number of files times the mean of the sampled sizes, with
+        the normal confidence interval of a simple random sample without replacement.
+        The interval is None if less than 2 files were sampled out of more files.
+        """
+        nn: int = self.number_of_samples
+        total: int = self.number_of_files
+        if nn == 0:
+            return {"value": 0, "interval": [0, 0] if total == 0 else None}
+        mean: float = self.sum_of_sizes / nn
+        value: float = total * mean
+        if nn == total:
+            return {"value": self.sum_of_sizes, "interval": [self.sum_of_sizes] * 2}
+        if nn < 2:
+            return {"value": round(value), "interval": None}
+        variance: float = max(
+            (self.sum_of_squared_sizes - nn * mean * mean) / (nn - 1), 0.0
+        )
+        margin: float = z * total * math.sqrt(variance / nn * (1 - nn / total))
+        return {
+            "value": round(value),
+            "interval": [max(round(value - margin), self.sum_of_sizes), round(value + margin)],
+        }
+
+
+def _walk(
+    src: Path, root_path: Path, depth: int,
+    estimates: List[_SubtreeEstimate],
+    nodes: List[Tuple[Dict[str, Any], _SubtreeEstimate]],
+    sample_rate: float, max_depth: int, rng: random.Random,
+    options: ScanOptions | None, ignore_rules: List[IgnoreRule],
+    metrics: ScanMetrics | None, links: LinkTracker
+) -> None:
+    """Walks a directory, adding its contents to the estimates of its reported ancestors.
+
+    Directories down to `max_depth` are appended to `nodes` with their own estimate.
+    """
+    child_types: Dict[Path, str] = _list_entry_types(src, options, links)
+    children: List[Path] = list(child_types.keys())
+    if options is not None:
+        children, ignore_rules = _filter_children(
+            src, children, child_types, root_path, options, depth, ignore_rules
+        )
+    if metrics is not None:
+        metrics.count("readdirCalls")
+        metrics.node_done("Directory")
+    node: Dict[str, Any] | None = None
+    if depth <= max_depth:
+        node = {
+            "@id": generate_id(src, root_path),
+            "type": "Directory",
+            "parent": {} if src == root_path else {"@id": generate_id(src.parent, root_path)},
+            "basename": src.name,
+            "name": src.name,
+            "hasPart": [],
+            "numberOfContents": len(children),
+            "numberOfFiles": len([p_ for p_ in children if child_types[p_] == "File"]),
+        }
+        if nodes:
+            parent_id: str = node["parent"]["@id"]
+            for parent, _ in reversed(nodes):
+                if parent["@id"] == parent_id:
+                    parent["hasPart"].append({"@id": node["@id"]})
+                    break
+        estimates = estimates + [_SubtreeEstimate()]
+        nodes.append((node, estimates[-1]))
+    for estimate in estimates:
+        estimate.number_of_contents += len(children)
+    for path_ in children:
+        if child_types[path_] == "Directory":
+            _walk(
+                path_, root_path, depth + 1, estimates, nodes,
+                sample_rate, max_depth, rng, options, ignore_rules, metrics, links
+            )
+            continue
+        if child_types[path_] != "File":
+            continue
+        size: int | None = None
+        if rng.random() < sample_rate:
+            try:
+                size = path_.stat().st_size
+            except OSError:
+                size = None
+            if metrics is not None:
+                metrics.count("statCalls")
+        extension: str = os.path.splitext(path_.name)[1]
+        mimetype: str | None = mimetypes.guess_type(str(path_))[0]
+        for estimate in estimates:
+            estimate.add_file(extension, mimetype, size)
+        if metrics is not None:
+            metrics.node_done("File")
+
+
+def estimate_metadata(
+    src: Path | str, sample_rate: float,
+    include_root_path: bool = False,
+    max_depth: int = DEFAULT_ESTIMATE_DEPTH,
+    confidence: float = DEFAULT_CONFIDENCE,
+    seed: int | None = None,
+    options: ScanOptions | None = None,
+    metrics: ScanMetrics | None = None
+) -> Dict[str, Any]:
+    """Estimates the statistical information of the directories of a huge tree.
+
+    The whole tree is walked, but only a random sample of the files is stat'ed
+    and no file is read. The numbers of files and contents and the distributions
+    of the extensions and MIME types, which only depend on the names, are exact;
+    `contentSizeOfAllFiles` is estimated from the sampled sizes, with its
+    confidence interval in `contentSizeOfAllFilesConfidenceInterval`
+    (None if too few files were sampled).
+
+    Args:
+        src (Path | str): The path to the directory to process.
+        sample_rate (float): The probability for a file to be sampled, in (0, 1].
+        include_root_path (bool, optional): Whether to include the absolute path of
+            the source directory in the output. Defaults to False.
+        max_depth (int, optional): The depth of the deepest directories reported,
+            the source directory being at depth 0. Defaults to `DEFAULT_ESTIMATE_DEPTH`.
+        confidence (float, optional): The confidence level of the intervals.
+            Defaults to `DEFAULT_CONFIDENCE`.
+        seed (int | None, optional): The seed of the sampling. Defaults to None.
+        options (ScanOptions | None, optional): Options pruning the walk. Defaults to None.
+        metrics (ScanMetrics | None, optional): Collects counters of the walk. Defaults to None.
+
+    Returns:
+        Dict[str, Any]: The metadata of the reported directories in the list format
+            with the keys of `update_statistical_info_to_metadata_list`.
+
+    Raises:
+        ValueError: If `sample_rate` or `confidence` is out of range.
+        TypeError: If 'src' is not a directory path.
+    """
+    if not 0 < sample_rate <= 1:
+        raise ValueError(f"{sample_rate}: 'sample_rate' must be in (0, 1].")
+    if not 0 < confidence < 1:
+        raise ValueError(f"{confidence}: 'confidence' must be in (0, 1).")
+    if isinstance(src, str):
+        src = Path(src)
+    if not src.is_dir():
+        raise TypeError(f"{str(src)}: 'src' must be a directory path.")
+    # statistics is slow to import; load it only in the estimate mode.
+    from statistics import NormalDist  # pylint: disable=import-outside-toplevel
+    z: float = NormalDist().inv_cdf((1 + confidence) / 2)
+    if options is not None and options.archives:
+        # no file is opened: the archives are sampled as files.
+        options = replace(options, archives=False)
+    nodes: List[Tuple[Dict[str, Any], _SubtreeEstimate]] = []
+    _walk(
+        src, src, 0, [], nodes, sample_rate, max_depth,
+        random.Random(seed), options, [], metrics,
+        LinkTracker(src, follow_symlinks=options is not None and options.follow_symlinks)
+    )
+    for node, estimate in nodes:
+        size: Dict[str, Any] = estimate.estimate_size(z)
+        node["contentSizeOfAllFiles"] = size["value"]
+        node["contentSizeOfAllFilesConfidenceInterval"] = size["interval"]
+        node["confidenceLevel"] = confidence
+        node["numberOfSampledFiles"] = estimate.number_of_samples
+        node["numberOfAllContents"] = estimate.number_of_contents
+        node["numberOfAllFiles"] = estimate.number_of_files
+        node["numberOfAllFilesPerExtension"] = dict(estimate.per_extension)
+        node["extensionsOfAllFiles"] = list(node["numberOfAllFilesPerExtension"].keys())
+        node["numberOfAllFilesPerMIMEType"] = dict(estimate.per_mimetype)
+        node["mimetypesOfAllFiles"] = list(node["numberOfAllFilesPerMIMEType"].keys())
+
+    dst: Dict[str, Any] = {}
+    if include_root_path:
+        dst["root_path"] = f"{str(src.as_posix())}/"
+    else:
+        dst["root_path"] = "./"
+    dst["sampleRate"] = sample_rate
+    dst[OUTPUT_ROOT_KEY] = [node for node, _ in nodes]
+    dst["dateCreated"] = datetime.datetime.now().strftime(DATETIME_FMT)
+    return dst
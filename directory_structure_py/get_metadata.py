@@ -2,15 +2,36 @@
 """
 
 from collections import Counter
-import copy
+from contextlib import nullcontext
 import datetime
+import functools
+import itertools
+import math
 import mimetypes
 import os
 from pathlib import Path
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, IO, Iterable, Iterator, List, Tuple
 import warnings
 import hashlib
+from directory_structure_py.archives import (
+    ArchiveMember, archive_format, iter_archive_members
+)
 from directory_structure_py.constants import DATETIME_FMT, OUTPUT_ROOT_KEY
+from directory_structure_py.checkpoint import ScanCheckpoint
+from directory_structure_py.links import LinkTracker
+from directory_structure_py.locality import sort_for_reading
+from directory_structure_py.metrics import ScanMetrics
+from directory_structure_py.throttle import ReadThrottle
+from directory_structure_py.scan_options import (
+    ScanOptions, IgnoreRule, parse_ignore_file,
+    has_field, OPTIONAL_FIELDS, DATE_FIELDS, STAT_FIELDS
+)
+
+HASH_CHUNK_SIZE: int = 1024 * 1024
+# the entries of a large directory (see `ScanOptions.large_directory_threshold`) read at once
+LARGE_DIRECTORY_BATCH: int = 10000
+TIMESTAMP_CACHE_SIZE: int = 65536
 
 
 def generate_id(path: Path | str, root_path: Path | str = "") -> str:
@@ -46,14 +67,77 @@ def generate_id(path: Path | str, root_path: Path | str = "") -> str:
     return f"{root_path.name}/{str(path.relative_to(root_path).as_posix())}"
 
 
+@functools.lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def _format_timestamp_in_seconds(seconds: int) -> str:
+    return time.strftime(DATETIME_FMT, time.localtime(seconds))
+
+
+def format_timestamp(timestamp: float) -> str:
+    """Formats a POSIX timestamp with `DATETIME_FMT` in the local time.
+
+    Equivalent to `datetime.datetime.fromtimestamp(timestamp).strftime(DATETIME_FMT)`,
+    but cached per second since the files of a tree often share their timestamps.
+    """
+    return _format_timestamp_in_seconds(math.floor(timestamp))
+
+
+def _timer(metrics: ScanMetrics | None, name: str, path: Path | None = None):
+    """Returns `metrics.timer(name, path)`, or a no-op context if `metrics` is None."""
+    if metrics is None:
+        return nullcontext()
+    return metrics.timer(name, path)
+
+
+def calculate_sha256(path: Path | str, throttle: ReadThrottle | None = None) -> str:
+    """Calculates the SHA-256 hash value of a file content.
+
+    The file is read in chunks of `HASH_CHUNK_SIZE` bytes so that large files
+    are not loaded into memory at once.
+
+    Args:
+        path (Path | str): The path to the file.
+        throttle (ReadThrottle | None, optional): Limits the files opened and the bytes
+            read per second. Defaults to None.
+
+    Returns:
+        str: The hexadecimal SHA-256 hash value.
+    """
+    if throttle is not None:
+        throttle.open_file()
+    with open(path, "rb") as ff:
+        return _calculate_sha256_of_stream(ff, throttle)
+
+
+def _calculate_sha256_of_stream(ff: IO[bytes], throttle: ReadThrottle | None = None) -> str:
+    """Calculates the SHA-256 hash value of the rest of a binary stream, read in chunks
+    of `HASH_CHUNK_SIZE` bytes within the limits of `throttle`."""
+    hash_ = hashlib.sha256()
+    while True:
+        start: float = time.perf_counter()
+        chunk: bytes = ff.read(HASH_CHUNK_SIZE)
+        if not chunk:
+            break
+        if throttle is not None:
+            throttle.read(len(chunk), time.perf_counter() - start)
+        hash_.update(chunk)
+    return hash_.hexdigest()
+
+
 def get_metadata_of_single_file(
-    path: Path | str, root_path: Path | str = ""
+    path: Path | str, root_path: Path | str = "",
+    metrics: ScanMetrics | None = None,
+    fields: List[str] | None = None
 ) -> Dict[str, Any]:
     """Generates metadata for a single file.
 
     Args:
         path (Path | str): The path to the file.  Can be a Path object or a string.
         root_path (Path | str, optional): The root path to generate relative IDs. Defaults to "".
+        metrics (ScanMetrics | None, optional): Collects the time spent in `stat` and hashing.
+            Defaults to None.
+        fields (List[str] | None, optional): The optional keys (see `OPTIONAL_FIELDS`) to include.
+            The content is not read unless `sha256` is requested, and the file is not stat'ed
+            unless `contentSize` or a date is requested. All the keys if None. Defaults to None.
 
     Returns:
         Dict[str, Any]: A dictionary containing the file's metadata.  The keys include:
@@ -76,7 +160,24 @@ def get_metadata_of_single_file(
         path = Path(path)
     if not path.is_file():
         raise TypeError(f"{str(path)}: 'path' must be a file path.")
+    if metrics is not None:
+        metrics.count("statCalls")
+    return _get_metadata_of_single_file(path, root_path, metrics, fields)
+
+
+def _get_metadata_of_single_file(
+    path: Path, root_path: Path | str = "",
+    metrics: ScanMetrics | None = None,
+    fields: List[str] | None = None,
+    links: LinkTracker | None = None,
+    throttle: ReadThrottle | None = None
+) -> Dict[str, Any]:
+    """Generates metadata for a path known to be a file. See `get_metadata_of_single_file`.
 
+    With `links`, a file with several links is stat'ed to be identified if it is hashed:
+    the hash value of the first link met is reused for the others, and `numberOfLinks`
+    reports the number of hard links. The file is hashed within the limits of `throttle`.
+    """
     dst: Dict[str, Any] = {}
     dst["@id"] = generate_id(path, root_path)
     dst["type"] = "File"
@@ -87,23 +188,49 @@ def get_metadata_of_single_file(
     dst["basename"] = path.name
     dst["name"] = os.path.splitext(path.name)[0]
     dst["extension"] = os.path.splitext(path.name)[1]
-    dst["mimetype"] = mimetypes.guess_type(str(path))[0]
-    if dst["mimetype"] == "null":
-        dst["mimetype"] = "unknown"
-    dst["contentSize"] = path.stat().st_size
-    with open(path, "rb") as ff:
-        dst["sha256"] = hashlib.sha256(ff.read()).hexdigest()
-    if os.name == "nt":
-        dst["dateCreated"] = datetime.datetime.fromtimestamp(
-            path.stat().st_birthtime
-        ).strftime(DATETIME_FMT)
-    else:
-        dst["dateCreated"] = datetime.datetime.fromtimestamp(
-            path.stat().st_ctime
-        ).strftime(DATETIME_FMT)
-    dst["dateModified"] = datetime.datetime.fromtimestamp(
-        path.stat().st_mtime
-    ).strftime(DATETIME_FMT)
+    if has_field(fields, "mimetype"):
+        dst["mimetype"] = mimetypes.guess_type(str(path))[0]
+        if dst["mimetype"] == "null":
+            dst["mimetype"] = "unknown"
+    stat: os.stat_result | None = None
+    if any(has_field(fields, key) for key in STAT_FIELDS) or (
+        links is not None and has_field(fields, "sha256")
+    ):
+        with _timer(metrics, "stat", path):
+            stat = path.stat()
+        if metrics is not None:
+            metrics.count("statCalls")
+    first_link: Dict[str, Any] | None = None
+    if links is not None and stat is not None and links.is_tracked(stat):
+        first_link = links.first_link(stat)
+    if has_field(fields, "contentSize"):
+        dst["contentSize"] = stat.st_size
+    if has_field(fields, "sha256") and first_link is not None and "sha256" in first_link:
+        dst["sha256"] = first_link["sha256"]
+        if metrics is not None:
+            metrics.count("hashesReused")
+    elif has_field(fields, "sha256"):
+        with _timer(metrics, "hash", path):
+            dst["sha256"] = calculate_sha256(path, throttle)
+        if metrics is not None:
+            size: int = stat.st_size if stat is not None else os.path.getsize(path)
+            metrics.count("openCalls")
+            metrics.count("readCalls", size // HASH_CHUNK_SIZE + 1)
+            metrics.count("bytesHashed", size)
+    if has_field(fields, "dateCreated"):
+        if os.name == "nt":
+            dst["dateCreated"] = format_timestamp(stat.st_birthtime)
+        else:
+            dst["dateCreated"] = format_timestamp(stat.st_ctime)
+    if has_field(fields, "dateModified"):
+        dst["dateModified"] = format_timestamp(stat.st_mtime)
+    if links is not None and stat is not None and links.is_tracked(stat):
+        if stat.st_nlink > 1:
+            dst["numberOfLinks"] = stat.st_nlink
+        if first_link is None:
+            links.add(stat, dst)
+        elif links.hardlinks == "once":
+            dst["sameFileAs"] = {"@id": first_link["@id"]}
 
     return dst
 
@@ -153,14 +280,39 @@ def generate_blank_metadata(
     return dst
 
 
+def _get_metadata_of_symlink(path: Path, root_path: Path | str = "") -> Dict[str, Any]:
+    """Generates a blank metadata for a symbolic link that is not followed,
+    with the target of the link in `linkTarget`."""
+    dst: Dict[str, Any] = generate_blank_metadata(path, root_path)
+    # the ID is that of the parent followed by the name, as in `hasPart`.
+    dst["@id"] = f"{dst['parent']['@id']}{path.name}"
+    dst["linkTarget"] = os.readlink(path)
+    return dst
+
+
 def get_metadata_of_single_directory(
-    path: Path | str, root_path: Path | str = ""
+    path: Path | str, root_path: Path | str = "",
+    metrics: ScanMetrics | None = None,
+    children: List[Path] | None = None,
+    child_types: Dict[Path, str] | None = None,
+    fields: List[str] | None = None
 ) -> Dict[str, Any]:
     """Generates metadata for a single directory.
 
     Args:
         path (Path | str): The path to the directory. Can be a Path object or a string.
         root_path (Path | str, optional): The root path to generate relative IDs. Defaults to "".
+        metrics (ScanMetrics | None, optional): Collects the time spent in `stat`
+            and `readdir` of the children. Defaults to None.
+        children (List[Path] | None, optional): The children to describe, e.g., the entries
+            left after pruning. All the entries of the directory if None. Defaults to None.
+        child_types (Dict[Path, str] | None, optional): The types of the children ("File",
+            "Directory" or "Unknown"), e.g., from `os.scandir`. Checked with `stat` if None,
+            the symbolic links being "Unknown" as in a scan without `follow_symlinks`.
+            Defaults to None.
+        fields (List[str] | None, optional): The optional keys (see `OPTIONAL_FIELDS`) to include.
+            `contentSize` adds the sizes, `mimetype` the MIME types and the dates those of the
+            directory. All the keys if None. Defaults to None.
 
     Returns:
         Dict[str, Any]: A dictionary containing the directory's metadata.  The keys include:
@@ -192,6 +344,164 @@ def get_metadata_of_single_directory(
     if not path.is_dir():
         raise TypeError(f"{str(path)}: 'path' must be a directory path.")
 
+    with _timer(metrics, "stat", path):
+        if children is None:
+            children = list(path.iterdir())
+            if metrics is not None:
+                metrics.count("readdirCalls")
+        if child_types is None:
+            child_types = {p_: _get_path_type(p_, False) for p_ in children}
+            if metrics is not None:
+                metrics.count("statCalls", 2 * len(children))
+        dst: Dict[str, Any] = _get_metadata_of_single_directory(
+            path, root_path, children, child_types, fields
+        )
+    if metrics is not None:
+        metrics.count("statCalls", 1 + (
+            dst["numberOfFiles"] if has_field(fields, "contentSize") else 0
+        ) + (
+            1 if any(has_field(fields, key) for key in DATE_FIELDS) else 0
+        ))
+    return dst
+
+
+def _get_path_type(path: Path, follow_symlinks: bool = True) -> str:
+    """Returns the type of a path: "File", "Directory" or "Unknown". A symbolic link is
+    "Unknown" unless followed."""
+    if not follow_symlinks and path.is_symlink():
+        return "Unknown"
+    if path.is_file():
+        return "File"
+    if path.is_dir():
+        return "Directory"
+    return "Unknown"
+
+
+def _get_entry_type(entry: os.DirEntry, follow_symlinks: bool = True) -> str:
+    """Returns the type of an entry of `os.scandir` without `stat` where the file system
+    reports it in the directory listing. A symbolic link is "Unknown" unless followed."""
+    if entry.is_file(follow_symlinks=follow_symlinks):
+        return "File"
+    if entry.is_dir(follow_symlinks=follow_symlinks):
+        return "Directory"
+    return "Unknown"
+
+
+def _list_entry_types(
+    src: Path, options: ScanOptions | None = None, links: LinkTracker | None = None,
+    inodes: Dict[Path, int] | None = None
+) -> Dict[Path, str]:
+    """Lists the entries of a directory with their types (see `_get_entry_types`)."""
+    with os.scandir(src) as entries:
+        return _get_entry_types(entries, options, links, inodes)
+
+
+def _get_entry_types(
+    entries: Iterable[os.DirEntry], options: ScanOptions | None = None,
+    links: LinkTracker | None = None, inodes: Dict[Path, int] | None = None
+) -> Dict[Path, str]:
+    """Returns the types of entries of `os.scandir` (see `_get_entry_type`).
+
+    Symbolic links are followed only with `options.follow_symlinks`, and a link to
+    a directory making a cycle (see `LinkTracker.is_cycle`) is "Unknown" then.
+    With `options.archives`, the files named as archives are "Archive". The inode
+    numbers of the entries other than symbolic links are stored in `inodes` if given.
+    """
+    if inodes is not None:
+        entries = list(entries)
+        for entry in entries:
+            try:
+                if not entry.is_symlink():
+                    inodes[Path(entry.path)] = entry.inode()
+            except OSError:
+                pass
+    child_types: Dict[Path, str] = {}
+    if options is None or not options.follow_symlinks:
+        child_types = {Path(entry.path): _get_entry_type(entry, False) for entry in entries}
+    else:
+        for entry in entries:
+            path_: Path = Path(entry.path)
+            child_types[path_] = _get_entry_type(entry)
+            if (
+                child_types[path_] == "Directory" and links is not None
+                and entry.is_symlink() and links.is_cycle(path_)
+            ):
+                child_types[path_] = "Unknown"
+    if options is not None and options.archives:
+        for path_, path_type in child_types.items():
+            if path_type == "File" and archive_format(path_.name) is not None:
+                child_types[path_] = "Archive"
+    return child_types
+
+
+def _reads_in_order(options: ScanOptions | None) -> bool:
+    """Returns True if the files are hashed in another order than that of the listing."""
+    return options is not None and options.read_order != "listing" and has_field(
+        options.fields, "sha256"
+    )
+
+
+def _sort_for_reading(
+    paths: List[Path], options: ScanOptions | None, inodes: Dict[Path, int] | None = None
+) -> List[Path]:
+    """Returns the files of a directory in the order in which to hash them
+    (see `ScanOptions.read_order`), with the inode numbers of the listing if known."""
+    if not _reads_in_order(options):
+        return paths
+    return sort_for_reading(paths, options.read_order, inodes)
+
+
+def _discount_repeated_files(
+    directory: Dict[str, Any], leaves: List[Dict[str, Any]]
+) -> None:
+    """Removes the sizes of the files met through another link first (`sameFileAs`)
+    from the sizes of their directory."""
+    repeated: int = sum(
+        node.get("contentSize", 0) for node in leaves if "sameFileAs" in node
+    )
+    if repeated and "contentSize" in directory:
+        directory["contentSize"] -= repeated
+        directory["contentSizeOfAllFiles"] -= repeated
+
+
+def _get_metadata_of_single_directory(
+    path: Path, root_path: Path | str, children: List[Path],
+    child_types: Dict[Path, str], fields: List[str] | None = None
+) -> Dict[str, Any]:
+    """Generates metadata for a single directory. See `get_metadata_of_single_directory`."""
+    dst: Dict[str, Any] = _get_header_of_single_directory(path, root_path)
+    dst["hasPart"] = [
+        _get_part(dst["@id"], p_, child_types[p_]) for p_ in children
+    ]
+    size: int = 0
+    number_of_files: int = 0
+    number_of_files_per_extension: Dict[str, int] = {}
+    number_of_files_per_mimetype: Dict[str | None, int] = {}
+    # a single pass over the files, counting in the order of the children.
+    for p_ in children:
+        if child_types[p_] != "File":
+            continue
+        number_of_files += 1
+        if has_field(fields, "contentSize"):
+            size += p_.stat().st_size
+        extension: str = os.path.splitext(p_.name)[1]
+        number_of_files_per_extension[extension] = number_of_files_per_extension.get(
+            extension, 0
+        ) + 1
+        if has_field(fields, "mimetype"):
+            mimetype: str | None = mimetypes.guess_type(str(p_))[0]
+            number_of_files_per_mimetype[mimetype] = number_of_files_per_mimetype.get(
+                mimetype, 0
+            ) + 1
+    dst.update(_get_statistics_of_single_directory(
+        path, len(dst["hasPart"]), number_of_files, size,
+        number_of_files_per_extension, number_of_files_per_mimetype, fields
+    ))
+    return dst
+
+
+def _get_header_of_single_directory(path: Path, root_path: Path | str) -> Dict[str, Any]:
+    """Returns the keys of a directory metadata preceding `hasPart`."""
     dst: Dict[str, Any] = {}
     dst["@id"] = generate_id(path, root_path)
     dst["type"] = "Directory"
@@ -201,103 +511,614 @@ def get_metadata_of_single_directory(
         dst["parent"] = {"@id": generate_id(path.parent, root_path)}
     dst["basename"] = path.name
     dst["name"] = path.name
-    dst["hasPart"] = [
-        {"@id": generate_id(p_, root_path)}
-        for p_ in path.iterdir()
-    ]
+    return dst
+
+
+def _get_part(directory_id: str, path: Path, path_type: str) -> Dict[str, str]:
+    """Returns an item of `hasPart`: the ID of a child is that of the directory
+    followed by its name."""
+    if path_type in ["Directory", "Archive"]:
+        return {"@id": f"{directory_id}{path.name}/"}
+    return {"@id": f"{directory_id}{path.name}"}
 
+
+def _get_statistics_of_single_directory(
+    path: Path, number_of_contents: int, number_of_files: int, size: int,
+    number_of_files_per_extension: Dict[str, int],
+    number_of_files_per_mimetype: Dict[str | None, int],
+    fields: List[str] | None = None
+) -> Dict[str, Any]:
+    """Returns the keys of a directory metadata following `hasPart` from the counts
+    of its children. See `get_metadata_of_single_directory`."""
+    dst: Dict[str, Any] = {}
     # children only
-    dst["contentSize"] = sum(
-        p_.stat().st_size for p_ in path.iterdir() if p_.is_file()
-    )
-    dst["numberOfContents"] = len(dst["hasPart"])
-    dst["numberOfFiles"] = len([
-        p_ for p_ in path.iterdir() if p_.is_file()
-    ])
-    dst["numberOfFilesPerExtension"] = dict(Counter(
-        os.path.splitext(p_.name)[1] for p_ in path.iterdir()
-        if p_.is_file()
-    ))
-    dst["extension"] = list(dst["numberOfFilesPerExtension"].keys())
-    dst["numberOfFilesPerMIMEType"] = dict(Counter(
-        mimetypes.guess_type(str(p_))[0] for p_ in path.iterdir()
-        if p_.is_file()
-    ))
-    for key, value in dst["numberOfFilesPerMIMEType"].items():
-        if value == "null":
-            dst[key] = "unknown"
-    dst["mimetype"] = list(dst["numberOfFilesPerMIMEType"].keys())
-
-    # all contents
-    dst["contentSizeOfAllFiles"] = sum(
-        p_.stat().st_size for p_ in path.iterdir() if p_.is_file()
-    )
-    dst["numberOfAllContents"] = len(dst["hasPart"])
-    dst["numberOfAllFiles"] = len([
-        p_ for p_ in path.iterdir() if p_.is_file()
-    ])
-    dst["numberOfAllFilesPerExtension"] = copy.deepcopy(
-        dst["numberOfFilesPerExtension"]
-    )
-    dst["extensionsOfAllFiles"] = list(
-        dst["numberOfAllFilesPerExtension"].keys()
-    )
-    dst["numberOfAllFilesPerMIMEType"] = copy.deepcopy(
-        dst["numberOfFilesPerMIMEType"]
-    )
-    dst["mimetypesOfAllFiles"] = list(
-        dst["numberOfAllFilesPerMIMEType"].keys()
-    )
+    if has_field(fields, "contentSize"):
+        dst["contentSize"] = size
+    dst["numberOfContents"] = number_of_contents
+    dst["numberOfFiles"] = number_of_files
+    dst["numberOfFilesPerExtension"] = number_of_files_per_extension
+    dst["extension"] = list(number_of_files_per_extension.keys())
+    if has_field(fields, "mimetype"):
+        dst["numberOfFilesPerMIMEType"] = number_of_files_per_mimetype
+        dst["mimetype"] = list(number_of_files_per_mimetype.keys())
 
-    if os.name == "nt":
-        dst["dateCreated"] = datetime.datetime.fromtimestamp(
-            path.stat().st_birthtime
-        ).strftime(DATETIME_FMT)
-    else:
-        dst["dateCreated"] = datetime.datetime.fromtimestamp(
-            path.stat().st_ctime
-        ).strftime(DATETIME_FMT)
-    dst["dateModified"] = datetime.datetime.fromtimestamp(
-        path.stat().st_mtime
-    ).strftime(DATETIME_FMT)
+    # all contents, updated by the roll-up; the counts are copied as they are flat.
+    if has_field(fields, "contentSize"):
+        dst["contentSizeOfAllFiles"] = size
+    dst["numberOfAllContents"] = number_of_contents
+    dst["numberOfAllFiles"] = number_of_files
+    dst["numberOfAllFilesPerExtension"] = dict(number_of_files_per_extension)
+    dst["extensionsOfAllFiles"] = list(number_of_files_per_extension.keys())
+    if has_field(fields, "mimetype"):
+        dst["numberOfAllFilesPerMIMEType"] = dict(number_of_files_per_mimetype)
+        dst["mimetypesOfAllFiles"] = list(number_of_files_per_mimetype.keys())
+
+    if any(has_field(fields, key) for key in DATE_FIELDS):
+        stat: os.stat_result = path.stat()
+        if has_field(fields, "dateCreated"):
+            if os.name == "nt":
+                dst["dateCreated"] = format_timestamp(stat.st_birthtime)
+            else:
+                dst["dateCreated"] = format_timestamp(stat.st_ctime)
+        if has_field(fields, "dateModified"):
+            dst["dateModified"] = format_timestamp(stat.st_mtime)
 
     return dst
 
 
-def _get_metadata_list(src: Path, root_path: Path | str = "") -> List[Dict[str, Any]]:
+def _read_ignore_file(
+    src: Path, root_path: Path | str, options: ScanOptions,
+    ignore_rules: List[IgnoreRule]
+) -> List[IgnoreRule]:
+    """Returns `ignore_rules` followed by the rules of the ignore file in `src` if any."""
+    if not options.ignore_file or not (src / options.ignore_file).is_file():
+        return ignore_rules
+    root_path = Path(root_path) if root_path else src
+    rel_dir: str = "" if src == root_path else src.relative_to(root_path).as_posix()
+    return ignore_rules + parse_ignore_file(str(src / options.ignore_file), rel_dir)
+
+
+def _filter_children(
+    src: Path, children: List[Path], child_types: Dict[Path, str],
+    root_path: Path | str, options: ScanOptions, depth: int,
+    ignore_rules: List[IgnoreRule]
+) -> Tuple[List[Path], List[IgnoreRule]]:
+    """Prunes the children of a directory according to `options`.
+
+    Returns:
+        Tuple[List[Path], List[IgnoreRule]]: The included children and the ignore rules
+            applying to them, including those of the ignore file in `src` if any.
+    """
+    root_path = Path(root_path) if root_path else src
+    rel_dir: str = "" if src == root_path else src.relative_to(root_path).as_posix()
+    ignore_rules = _read_ignore_file(src, root_path, options, ignore_rules)
+    dst: List[Path] = [
+        p_ for p_ in children
+        if options.is_included(
+            f"{rel_dir}/{p_.name}" if rel_dir else p_.name,
+            child_types[p_] in ["Directory", "Archive"], depth + 1, ignore_rules
+        )
+    ]
+    return dst, ignore_rules
+
+
+def _get_metadata_list(
+    src: Path, root_path: Path | str = "",
+    metrics: ScanMetrics | None = None,
+    options: ScanOptions | None = None,
+    depth: int = 0,
+    ignore_rules: List[IgnoreRule] | None = None,
+    path_type: str = "",
+    checkpoint: ScanCheckpoint | None = None,
+    links: LinkTracker | None = None,
+    throttle: ReadThrottle | None = None
+) -> List[Dict[str, Any]]:
     """Recursively generates a list of metadata dictionaries for a given path.
 
     This function traverses a directory tree, creating metadata for each file and directory encountered.
+    Entries excluded by `options` are pruned before descending into them.
+    The types of the children are taken from the directory listing (`os.scandir`)
+    so that the children are not stat'ed only to tell files from directories.
 
     Args:
         src (Path): The path to the file or directory to process.
         root_path (Path | str, optional): The root path for relative ID generation. Defaults to "".
+        metrics (ScanMetrics | None, optional): Collects counters and timings of the scan.
+            Defaults to None.
+        options (ScanOptions | None, optional): Options of the walk. Defaults to None.
+        depth (int, optional): The depth of `src` below the root path. Defaults to 0.
+        ignore_rules (List[IgnoreRule] | None, optional): The rules of the ignore files
+            of the ancestors of `src`. Defaults to None.
+        path_type (str, optional): The type of `src` if already known ("File", "Directory",
+            "Archive" or "Unknown"). Checked with `stat` if empty. Defaults to "".
+        checkpoint (ScanCheckpoint | None, optional): Records each directory once its
+            files are processed, and provides the directories recorded by an interrupted
+            scan, which are not scanned again. Defaults to None.
+        links (LinkTracker | None, optional): The files and directories met so far,
+            to skip the cycles of symbolic links and to hash each file once.
+            Defaults to None.
+        throttle (ReadThrottle | None, optional): Limits the reads of the hashing.
+            Defaults to None.
 
     Returns:
         List[Dict[str, Any]]: A list of dictionaries, where each dictionary contains the metadata of a single file or directory.  The structure of each dictionary is defined by `get_metadata_of_single_file` and `get_metadata_of_single_directory`.
 
     """
     dst: List[Dict[str, Any]] = []
-    if src.is_file():
+    fields: List[str] | None = options.fields if options is not None else None
+    if not path_type:
+        path_type = _get_path_type(src)
+        if metrics is not None:
+            metrics.count("statCalls", 1 if path_type == "File" else 2)
+    if (
+        path_type == "File" and options is not None and options.archives
+        and archive_format(src.name) is not None
+    ):
+        path_type = "Archive"
+    if path_type == "Archive":
+        return _get_metadata_list_of_archive(src, root_path, metrics, options, depth, throttle)
+    if path_type == "File":
         dst.append(
-            get_metadata_of_single_file(src, root_path=root_path)
+            _get_metadata_of_single_file(
+                src, root_path=root_path, metrics=metrics, fields=fields, links=links,
+                throttle=throttle
+            )
         )
+        if metrics is not None:
+            metrics.node_done("File")
         return dst
-    if not src.is_dir():
+    if path_type != "Directory":
         dst.append(
-            generate_blank_metadata(src, root_path=root_path)
+            _get_metadata_of_symlink(src, root_path=root_path) if src.is_symlink()
+            else generate_blank_metadata(src, root_path=root_path)
         )
+        if metrics is not None:
+            metrics.node_done("Unknown")
         return dst
+    if checkpoint is not None:
+        record: List[Dict[str, Any]] | None = checkpoint.get(generate_id(src, root_path))
+        if record is not None:
+            return _resume_metadata_list(
+                src, record, root_path, metrics, options, depth, ignore_rules, checkpoint,
+                links, throttle
+            )
+    threshold: int = options.large_directory_threshold if options is not None else 0
+    inodes: Dict[Path, int] | None = {} if _reads_in_order(options) else None
+    if threshold:
+        with os.scandir(src) as entries:
+            with _timer(metrics, "stat", src):
+                head: List[os.DirEntry] = list(itertools.islice(entries, threshold + 1))
+            if len(head) > threshold:
+                return _get_metadata_list_of_large_directory(
+                    src, itertools.chain(head, entries), root_path, metrics, options,
+                    depth, ignore_rules, checkpoint, links, throttle
+                )
+            with _timer(metrics, "stat", src):
+                child_types: Dict[Path, str] = _get_entry_types(head, options, links, inodes)
+    else:
+        with _timer(metrics, "stat", src):
+            child_types = _list_entry_types(src, options, links, inodes)
+    children: List[Path] = list(child_types.keys())
+    ignore_rules = ignore_rules or []
+    if options is not None:
+        children, ignore_rules = _filter_children(
+            src, children, child_types, root_path, options, depth, ignore_rules
+        )
     dst.append(
-        get_metadata_of_single_directory(src, root_path=root_path)
+        get_metadata_of_single_directory(
+            src, root_path=root_path, metrics=metrics,
+            children=children, child_types=child_types, fields=fields
+        )
     )
-    for path_ in src.iterdir():
-        dst.extend(_get_metadata_list(path_, root_path=root_path))
+    if metrics is not None:
+        metrics.node_done("Directory")
+        metrics.count("readdirCalls")
+    # the files are processed before the subdirectories so that the directory
+    # can be checkpointed before descending, and in the read order of `options`;
+    # the output order is unchanged.
+    leaves: Dict[Path, List[Dict[str, Any]]] = {
+        path_: _get_metadata_list(
+            path_, root_path=root_path, metrics=metrics, options=options,
+            depth=depth + 1, path_type=child_types[path_], links=links, throttle=throttle
+        )
+        for path_ in _sort_for_reading(
+            [p_ for p_ in children if child_types[p_] != "Directory"], options, inodes
+        )
+    }
+    if links is not None and links.hardlinks == "once":
+        _discount_repeated_files(dst[0], [node for nodes in leaves.values() for node in nodes])
+    if checkpoint is not None:
+        checkpoint.add(dst + [node for nodes in leaves.values() for node in nodes])
+    for path_ in children:
+        if path_ in leaves:
+            dst.extend(leaves[path_])
+            continue
+        dst.extend(_get_metadata_list(
+            path_, root_path=root_path, metrics=metrics,
+            options=options, depth=depth + 1, ignore_rules=ignore_rules,
+            path_type="Directory", checkpoint=checkpoint, links=links, throttle=throttle
+        ))
+    return dst
+
+
+def _get_metadata_list_of_large_directory(
+    src: Path, entries: Iterator[os.DirEntry], root_path: Path | str,
+    metrics: ScanMetrics | None, options: ScanOptions, depth: int,
+    ignore_rules: List[IgnoreRule] | None, checkpoint: ScanCheckpoint | None,
+    links: LinkTracker | None, throttle: ReadThrottle | None
+) -> List[Dict[str, Any]]:
+    """Generates the metadata list of a directory with more entries than
+    `options.large_directory_threshold`. See `_get_metadata_list`.
+
+    The entries are read from `entries` in batches of `LARGE_DIRECTORY_BATCH`, and
+    the children of each batch are appended in the order of the listing as they are
+    processed, the subdirectories being walked on the way. The counts of the directory
+    are updated batch by batch from the metadata of its files, which are stat'ed once,
+    and the directory is checkpointed once all its children are processed.
+    """
+    fields: List[str] | None = options.fields
+    ignore_rules = _read_ignore_file(src, root_path, options, ignore_rules or [])
+    root_path_: Path = Path(root_path) if root_path else src
+    rel_dir: str = "" if src == root_path_ else src.relative_to(root_path_).as_posix()
+    directory: Dict[str, Any] = _get_header_of_single_directory(src, root_path)
+    directory["hasPart"] = []
+    dst: List[Dict[str, Any]] = [directory]
+    leaves: List[Dict[str, Any]] = []
+    number_of_files: int = 0
+    size: int = 0
+    number_of_files_per_extension: Dict[str, int] = {}
+    number_of_files_per_mimetype: Dict[str | None, int] = {}
+    if metrics is not None:
+        metrics.count("readdirCalls")
+        metrics.count("largeDirectories")
+    while True:
+        with _timer(metrics, "stat", src):
+            batch: List[os.DirEntry] = list(itertools.islice(entries, LARGE_DIRECTORY_BATCH))
+            inodes: Dict[Path, int] | None = {} if _reads_in_order(options) else None
+            child_types: Dict[Path, str] = _get_entry_types(batch, options, links, inodes)
+        if not batch:
+            break
+        children: List[Path] = [
+            p_ for p_ in child_types
+            if options.is_included(
+                f"{rel_dir}/{p_.name}" if rel_dir else p_.name,
+                child_types[p_] in ["Directory", "Archive"], depth + 1, ignore_rules
+            )
+        ]
+        nodes: Dict[Path, List[Dict[str, Any]]] = {
+            path_: _get_metadata_list(
+                path_, root_path=root_path, metrics=metrics, options=options,
+                depth=depth + 1, path_type=child_types[path_], links=links,
+                throttle=throttle
+            )
+            for path_ in _sort_for_reading(
+                [p_ for p_ in children if child_types[p_] != "Directory"], options, inodes
+            )
+        }
+        for path_ in children:
+            directory["hasPart"].append(_get_part(directory["@id"], path_, child_types[path_]))
+            if path_ not in nodes:
+                dst.extend(_get_metadata_list(
+                    path_, root_path=root_path, metrics=metrics,
+                    options=options, depth=depth + 1, ignore_rules=ignore_rules,
+                    path_type="Directory", checkpoint=checkpoint, links=links,
+                    throttle=throttle
+                ))
+                continue
+            dst.extend(nodes[path_])
+            leaves.extend(nodes[path_])
+            # the first node is the child itself, followed by the members of an archive.
+            node: Dict[str, Any] = nodes[path_][0]
+            if node["type"] == "File":
+                number_of_files += 1
+                size += node.get("contentSize", 0)
+                number_of_files_per_extension[node["extension"]] = (
+                    number_of_files_per_extension.get(node["extension"], 0) + 1
+                )
+                if "mimetype" in node:
+                    number_of_files_per_mimetype[node["mimetype"]] = (
+                        number_of_files_per_mimetype.get(node["mimetype"], 0) + 1
+                    )
+    directory.update(_get_statistics_of_single_directory(
+        src, len(directory["hasPart"]),
+        number_of_files, size,
+        number_of_files_per_extension, number_of_files_per_mimetype, fields
+    ))
+    if metrics is not None:
+        metrics.node_done("Directory")
+        metrics.count("statCalls", 1 + (
+            1 if any(has_field(fields, key) for key in DATE_FIELDS) else 0
+        ))
+    if links is not None and links.hardlinks == "once":
+        _discount_repeated_files(directory, leaves)
+    if checkpoint is not None:
+        checkpoint.add([directory] + leaves)
+    _trim_has_part(directory, options)
+    return dst
+
+
+def _get_metadata_list_of_archive(
+    src: Path, root_path: Path | str, metrics: ScanMetrics | None,
+    options: ScanOptions, depth: int, throttle: ReadThrottle | None
+) -> List[Dict[str, Any]]:
+    """Generates the metadata list of an archive scanned as a directory
+    (see `ScanOptions.archives`). See `_get_metadata_list`.
+
+    The archive is a directory whose ID is that of the file followed by "/", with
+    `archiveFormat` and the size of the file in `archiveContentSize`. It is followed by
+    the directories and files it holds, whose IDs are under that of the archive. The
+    members are read once, in the order in which they are stored, each file being hashed
+    from the archive as it is read. As archives record the modification times only, those
+    are used for `dateCreated` too. An archive that cannot be read is output without any
+    member, with the reason in `archiveError`. So is a member whose name is absolute or
+    goes up with "..", which is skipped, the other members being output.
+    """
+    fields: List[str] | None = options.fields
+    # the dates of the directories within the archive are taken from the archive.
+    member_fields: List[str] = [
+        key for key in OPTIONAL_FIELDS if has_field(fields, key) and key not in DATE_FIELDS
+    ]
+    root_path_: Path = Path(root_path) if root_path else src
+    rel_dir: str = "" if src == root_path_ else src.relative_to(root_path_).as_posix()
+    archive: Dict[str, Any] = _get_header_of_single_directory(src, root_path)
+    archive["@id"] = f"{generate_id(src, root_path)}/"
+    format_: str = archive_format(src.name) or ""
+    # the directories by their paths in the archive, with their children and dates.
+    directories: Dict[Tuple[str, ...], Dict[str, Any]] = {(): archive}
+    children: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {(): []}
+    mtimes: Dict[Tuple[str, ...], float] = {}
+    included: Dict[Tuple[str, ...], bool] = {(): True}
+    files: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+
+    def _is_included(parts: Tuple[str, ...], is_dir: bool) -> bool:
+        if parts not in included or not is_dir:
+            included[parts] = _is_included(parts[:-1], True) and options.is_included(
+                "/".join((rel_dir,) + parts if rel_dir else parts),
+                is_dir, depth + len(parts)
+            )
+        return included[parts]
+
+    def _directory(parts: Tuple[str, ...]) -> Dict[str, Any]:
+        if parts not in directories:
+            parent: Dict[str, Any] = _directory(parts[:-1])
+            directories[parts] = {
+                "@id": f"{parent['@id']}{parts[-1]}/",
+                "type": "Directory",
+                "parent": {"@id": parent["@id"]},
+                "basename": parts[-1],
+                "name": parts[-1],
+            }
+            children[parts] = []
+            children[parts[:-1]].append(directories[parts])
+        return directories[parts]
+
+    if throttle is not None and has_field(fields, "sha256"):
+        throttle.open_file()
+    error: str = ""
+    try:
+        for member, stream in iter_archive_members(
+            src, format_, has_field(fields, "sha256")
+        ):
+            if member.unsafe_name:
+                error = error or (
+                    f"{src}: the member '{member.unsafe_name}' is skipped "
+                    "as its name is absolute or goes up with '..'."
+                )
+                continue
+            if not member.parts or not _is_included(member.parts[:-1], True):
+                continue
+            # the directories holding a member are listed even without an entry.
+            _directory(member.parts[:-1])
+            if not _is_included(member.parts, member.type == "Directory"):
+                continue
+            if metrics is not None:
+                metrics.count("archiveMembers")
+            if member.type == "Directory":
+                _directory(member.parts)
+                mtimes[member.parts] = member.mtime
+                continue
+            node: Dict[str, Any] = _get_metadata_of_archive_member(
+                src, member, stream, _directory(member.parts[:-1])["@id"], fields,
+                metrics, throttle
+            )
+            if member.parts in files:
+                # a member stored again replaces the former one, as on extraction.
+                files[member.parts].clear()
+                files[member.parts].update(node)
+                continue
+            files[member.parts] = node
+            children[member.parts[:-1]].append(node)
+    except ValueError as exc:
+        directories, children = {(): archive}, {(): []}
+        error = str(exc)
+    if metrics is not None:
+        metrics.count("archives")
+        if error:
+            metrics.count("archiveErrors")
+
+    stat: os.stat_result = src.stat()
+    dst: List[Dict[str, Any]] = []
+
+    def _add_directory(parts: Tuple[str, ...]) -> None:
+        directory: Dict[str, Any] = directories[parts]
+        directory["hasPart"] = [{"@id": node["@id"]} for node in children[parts]]
+        size: int = 0
+        number_of_files: int = 0
+        number_of_files_per_extension: Dict[str, int] = {}
+        number_of_files_per_mimetype: Dict[str | None, int] = {}
+        for node in children[parts]:
+            if node["type"] != "File":
+                continue
+            number_of_files += 1
+            size += node.get("contentSize", 0)
+            number_of_files_per_extension[node["extension"]] = (
+                number_of_files_per_extension.get(node["extension"], 0) + 1
+            )
+            if "mimetype" in node:
+                number_of_files_per_mimetype[node["mimetype"]] = (
+                    number_of_files_per_mimetype.get(node["mimetype"], 0) + 1
+                )
+        directory.update(_get_statistics_of_single_directory(
+            src, len(children[parts]), number_of_files, size,
+            number_of_files_per_extension, number_of_files_per_mimetype,
+            fields if not parts else member_fields
+        ))
+        if parts:
+            # the directories without an entry of their own have the date of the archive.
+            mtime: float = mtimes.get(parts, stat.st_mtime)
+            if has_field(fields, "dateCreated"):
+                directory["dateCreated"] = format_timestamp(mtime)
+            if has_field(fields, "dateModified"):
+                directory["dateModified"] = format_timestamp(mtime)
+        if metrics is not None:
+            metrics.node_done("Directory")
+        dst.append(directory)
+        for node in children[parts]:
+            if node["type"] == "Directory":
+                _add_directory(parts + (node["basename"],))
+            else:
+                dst.append(node)
+
+    _add_directory(())
+    archive["archiveFormat"] = format_
+    if has_field(fields, "contentSize"):
+        archive["archiveContentSize"] = stat.st_size
+    if error:
+        archive["archiveError"] = error
+    return dst
+
+
+def _get_metadata_of_archive_member(
+    src: Path, member: ArchiveMember, stream: IO[bytes] | None, parent_id: str,
+    fields: List[str] | None, metrics: ScanMetrics | None, throttle: ReadThrottle | None
+) -> Dict[str, Any]:
+    """Generates the metadata of a file, or a blank one of another entry (e.g., a link
+    with its target in `linkTarget`), held by an archive. See `_get_metadata_of_single_file`.
+    """
+    name: str = member.parts[-1]
+    dst: Dict[str, Any] = {}
+    dst["@id"] = f"{parent_id}{name}"
+    dst["type"] = member.type
+    dst["parent"] = {"@id": parent_id}
+    dst["basename"] = name
+    dst["name"] = os.path.splitext(name)[0]
+    dst["extension"] = os.path.splitext(name)[1]
+    if member.type != "File":
+        dst["mimetype"] = "unknown"
+        dst["contentSize"] = -1
+        dst["sha256"] = ""
+        dst["dateCreated"] = "unknown"
+        dst["dateModified"] = "unknown"
+        if member.link_target:
+            dst["linkTarget"] = member.link_target
+        if metrics is not None:
+            metrics.node_done("Unknown")
+        return dst
+    if has_field(fields, "mimetype"):
+        dst["mimetype"] = mimetypes.guess_type(name)[0]
+    if has_field(fields, "contentSize"):
+        dst["contentSize"] = member.size
+    if has_field(fields, "sha256"):
+        with _timer(metrics, "hash", f"{src}/{'/'.join(member.parts)}"):
+            dst["sha256"] = _calculate_sha256_of_stream(stream, throttle)
+        if metrics is not None:
+            metrics.count("readCalls", member.size // HASH_CHUNK_SIZE + 1)
+            metrics.count("bytesHashed", member.size)
+    if has_field(fields, "dateCreated"):
+        dst["dateCreated"] = format_timestamp(member.mtime)
+    if has_field(fields, "dateModified"):
+        dst["dateModified"] = format_timestamp(member.mtime)
+    if metrics is not None:
+        metrics.node_done("File")
+    return dst
+
+
+def _trim_has_part(directory: Dict[str, Any], options: ScanOptions | None) -> None:
+    """Keeps only the subdirectories in `hasPart` of a large directory if
+    `options.large_directory_has_part` is "directories"."""
+    if (
+        options is None or options.large_directory_has_part != "directories"
+        or not options.large_directory_threshold
+        or directory["numberOfContents"] <= options.large_directory_threshold
+    ):
+        return
+    directory["hasPart"] = [
+        part for part in directory["hasPart"] if part["@id"].endswith("/")
+    ]
+
+
+def _group_by_child(
+    directory_id: str, nodes: List[Dict[str, Any]]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Groups the nodes following a directory by its children: each child is followed
+    by its own nodes, i.e., the members of an archive."""
+    dst: Dict[str, List[Dict[str, Any]]] = {}
+    group: List[Dict[str, Any]] = []
+    for node in nodes:
+        if node["parent"].get("@id") == directory_id:
+            group = dst.setdefault(node["@id"], [])
+        group.append(node)
+    return dst
+
+
+def _track_resumed_file(path: Path, node: Dict[str, Any], links: LinkTracker) -> None:
+    """Records a file taken from a checkpoint in `links` as its scan did, so that
+    its other links met after the resume refer to it."""
+    if node["type"] != "File" or "sameFileAs" in node:
+        return
+    if "numberOfLinks" not in node and not links.follow_symlinks:
+        return
+    try:
+        stat: os.stat_result = path.stat()
+    except OSError:
+        return
+    if links.is_tracked(stat):
+        links.add(stat, node)
+
+
+def _resume_metadata_list(
+    src: Path, record: List[Dict[str, Any]], root_path: Path | str,
+    metrics: ScanMetrics | None, options: ScanOptions | None, depth: int,
+    ignore_rules: List[IgnoreRule] | None, checkpoint: ScanCheckpoint,
+    links: LinkTracker | None = None, throttle: ReadThrottle | None = None
+) -> List[Dict[str, Any]]:
+    """Generates the metadata list of a directory recorded in a checkpoint.
+    See `_get_metadata_list`.
+
+    The directory and its non-directory children are taken from `record`,
+    and only the subdirectories are walked.
+    """
+    leaves: Dict[str, List[Dict[str, Any]]] = _group_by_child(record[0]["@id"], record[1:])
+    ignore_rules = ignore_rules or []
+    if options is not None:
+        ignore_rules = _read_ignore_file(src, root_path, options, ignore_rules)
+    dst: List[Dict[str, Any]] = [record[0]]
+    if metrics is not None:
+        metrics.node_done("Directory")
+        metrics.count("resumedNodes", len(record))
+    for part in record[0]["hasPart"]:
+        if part["@id"] in leaves:
+            dst.extend(leaves[part["@id"]])
+            if links is not None:
+                _track_resumed_file(
+                    src / part["@id"].rsplit("/", 1)[-1], leaves[part["@id"]][0], links
+                )
+            continue
+        dst.extend(_get_metadata_list(
+            src / part["@id"].rstrip("/").rsplit("/", 1)[-1],
+            root_path=root_path, metrics=metrics,
+            options=options, depth=depth + 1, ignore_rules=ignore_rules,
+            path_type="Directory", checkpoint=checkpoint, links=links, throttle=throttle
+        ))
+    _trim_has_part(dst[0], options)
     return dst
 
 
 def get_metadata_of_files_in_list_format(
-    src: Path | str, include_root_path: bool = False
+    src: Path | str, include_root_path: bool = False,
+    metrics: ScanMetrics | None = None,
+    options: ScanOptions | None = None,
+    checkpoint: ScanCheckpoint | None = None
 ) -> Dict[str, Any]:
     """Generates metadata for all files and directories within a given path in a list format.
 
@@ -307,6 +1128,13 @@ def get_metadata_of_files_in_list_format(
     Args:
         src (Path | str): The path to the directory or file to process.  Can be a Path object or a string.
         include_root_path (bool, optional): Whether to include the absolute path of the source directory in the output. Defaults to False.
+        metrics (ScanMetrics | None, optional): Collects counters and timings of the scan. Defaults to None.
+        options (ScanOptions | None, optional): Options of the walk such as the maximum depth and
+            the patterns of the entries to exclude. Defaults to None (all the entries). The
+            symbolic links below `src` are followed only with `options.follow_symlinks`:
+            otherwise, including by default, they are "Unknown" entries with `linkTarget`.
+        checkpoint (ScanCheckpoint | None, optional): The checkpoint to record the progress to
+            and to resume an interrupted scan from. Defaults to None.
 
     Returns:
         Dict[str, Any]: A dictionary containing:
@@ -322,7 +1150,13 @@ def get_metadata_of_files_in_list_format(
         dst["root_path"] = f"{str(Path(src).as_posix())}/"
     else:
         dst["root_path"] = "./"
-    dst[OUTPUT_ROOT_KEY] = _get_metadata_list(src, root_path=src)
+    dst[OUTPUT_ROOT_KEY] = _get_metadata_list(
+        src, root_path=src, metrics=metrics, options=options, checkpoint=checkpoint,
+        links=LinkTracker(
+            src, options.hardlinks, options.follow_symlinks
+        ) if options is not None else LinkTracker(src),
+        throttle=options.read_throttle() if options is not None else None
+    )
     dst["dateCreated"] = datetime.datetime.now().strftime(DATETIME_FMT)
     return dst
 
@@ -361,7 +1195,9 @@ def _update_statistical_info_of_directory(
             node = _update_statistical_info_of_directory(
                 node, metadata_list_
             )
-            src["contentSizeOfAllFiles"] += node["contentSizeOfAllFiles"]
+            # sizes and MIME types are absent if they were not requested at scan time.
+            if "contentSizeOfAllFiles" in src:
+                src["contentSizeOfAllFiles"] += node["contentSizeOfAllFiles"]
             src["numberOfAllContents"] += node["numberOfAllContents"]
             src["numberOfAllFiles"] += node["numberOfAllFiles"]
             src["numberOfAllFilesPerExtension"] = dict(
@@ -371,13 +1207,14 @@ def _update_statistical_info_of_directory(
             src["extensionsOfAllFiles"] = list(
                 src["numberOfAllFilesPerExtension"].keys()
             )
-            src["numberOfAllFilesPerMIMEType"] = dict(
-                Counter(src["numberOfAllFilesPerMIMEType"]) +
-                Counter(node["numberOfAllFilesPerMIMEType"])
-            )
-            src["mimetypesOfAllFiles"] = list(
-                src["numberOfAllFilesPerMIMEType"].keys()
-            )
+            if "numberOfAllFilesPerMIMEType" in src:
+                src["numberOfAllFilesPerMIMEType"] = dict(
+                    Counter(src["numberOfAllFilesPerMIMEType"]) +
+                    Counter(node["numberOfAllFilesPerMIMEType"])
+                )
+                src["mimetypesOfAllFiles"] = list(
+                    src["numberOfAllFilesPerMIMEType"].keys()
+                )
     return src
 
 
@@ -0,0 +1,139 @@
+"""index
+
+in-memory index of a metadata in a list format
+"""
+
+import copy
+import threading
+from typing import Dict, Any, List, Iterator
+from directory_structure_py.constants import OUTPUT_ROOT_KEY
+
+STATISTICS_KEYS: List[str] = [
+    "contentSize",
+    "numberOfContents",
+    "numberOfFiles",
+    "numberOfFilesPerExtension",
+    "numberOfFilesPerMIMEType",
+    "contentSizeOfAllFiles",
+    "numberOfAllContents",
+    "numberOfAllFiles",
+    "numberOfAllFilesPerExtension",
+    "extensionsOfAllFiles",
+    "numberOfAllFilesPerMIMEType",
+    "mimetypesOfAllFiles",
+    # set by the columnar engine only (see `columnar.DISTRIBUTION_KEYS`)
+    "contentSizeOfAllFilesPerExtension",
+    "contentSizeHistogramOfAllFiles",
+    "contentSizePercentilesOfAllFiles",
+    "latestDateModifiedOfAllFiles",
+]
+
+
+class MetadataIndex:
+    """
+    In-memory index of a metadata in a list format.
+
+    Nodes of `@graph` are indexed by their `@id` so that a node, its children,
+    its subtree and its statistical information can be looked up without
+    scanning the whole list. Hold `lock` while reading an index that is
+    updated concurrently (e.g., by `watcher.IndexUpdater`).
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        """
+        Args:
+            data (Dict[str, Any]): A metadata in a list format, i.e., the output of
+                `get_metadata_of_files_in_list_format`.
+        """
+        self.root_path: str = data.get("root_path", "./")
+        self.date_created: str = data.get("dateCreated", "")
+        self.root_id: str = ""
+        self.lock: threading.RLock = threading.RLock()
+        self._nodes: Dict[str, Dict[str, Any]] = {}
+        for node in data.get(OUTPUT_ROOT_KEY, []):
+            self._nodes[node["@id"]] = node
+            if not node.get("parent", {}) and not self.root_id:
+                self.root_id = node["@id"]
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._nodes
+
+    def get(self, node_id: str) -> Dict[str, Any] | None:
+        """Returns the metadata of a node, or None if it is not indexed."""
+        return self._nodes.get(node_id)
+
+    def put(self, node: Dict[str, Any]) -> None:
+        """Adds or replaces a node. Links from its parent are not updated."""
+        self._nodes[node["@id"]] = node
+        if not node.get("parent", {}) and not self.root_id:
+            self.root_id = node["@id"]
+
+    def pop(self, node_id: str) -> Dict[str, Any]:
+        """Removes a node and returns it. Links from its parent are not updated.
+
+        Raises:
+            KeyError: If `node_id` is not indexed.
+        """
+        node: Dict[str, Any] = self._nodes.pop(node_id)
+        if node_id == self.root_id:
+            self.root_id = ""
+        return node
+
+    def children(self, node_id: str) -> List[Dict[str, Any]]:
+        """Returns the metadata of the direct children of a node.
+
+        Raises:
+            KeyError: If `node_id` is not indexed.
+        """
+        node: Dict[str, Any] = self._nodes[node_id]
+        return [
+            self._nodes[part["@id"]] for part in node.get("hasPart", [])
+            if part["@id"] in self._nodes
+        ]
+
+    def iter_subtree(self, node_id: str) -> Iterator[Dict[str, Any]]:
+        """Yields the metadata of a node and all its descendants in depth-first order,
+        i.e., the order of `@graph` produced by `get_metadata_of_files_in_list_format`.
+
+        Raises:
+            KeyError: If `node_id` is not indexed.
+        """
+        stack: List[str] = [node_id]
+        while stack:
+            node: Dict[str, Any] = self._nodes[stack.pop()]
+            yield node
+            stack.extend(
+                part["@id"] for part in reversed(node.get("hasPart", []))
+                if part["@id"] in self._nodes
+            )
+
+    def subtree(self, node_id: str) -> List[Dict[str, Any]]:
+        """Returns the metadata of a node and all its descendants in depth-first order.
+
+        Raises:
+            KeyError: If `node_id` is not indexed.
+        """
+        return list(self.iter_subtree(node_id))
+
+    def statistics(self, node_id: str) -> Dict[str, Any]:
+        """Returns the statistical information of a directory node.
+        For a file node, only `contentSize` is returned.
+
+        Raises:
+            KeyError: If `node_id` is not indexed.
+        """
+        node: Dict[str, Any] = self._nodes[node_id]
+        return {
+            key: copy.deepcopy(node[key]) for key in STATISTICS_KEYS if key in node
+        }
+
+    def to_list(self) -> Dict[str, Any]:
+        """Returns the indexed metadata in a list format."""
+        dst: Dict[str, Any] = {}
+        dst["root_path"] = self.root_path
+        dst[OUTPUT_ROOT_KEY] = self.subtree(self.root_id) if self.root_id else []
+        dst["dateCreated"] = self.date_created
+        return dst
@@ -0,0 +1,83 @@
+"""links
+
+identities (st_dev, st_ino) of the entries met during a scan, to follow symbolic links
+without cycles and to read the content of a file with several links once
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Any, Tuple
+
+from directory_structure_py.scan_options import HARDLINK_POLICIES
+
+
+def _identity(stat: os.stat_result) -> Tuple[int, int]:
+    return (stat.st_dev, stat.st_ino)
+
+
+class LinkTracker:
+    """
+    The files and directories met during a scan, identified by (st_dev, st_ino).
+
+    A symbolic link to a directory makes a cycle if it points to the directory holding
+    it or to one of its ancestors: the ancestors being the directories on the path of
+    the link below the root, their identities are checked with `stat` (following the
+    links, as the walk does) only when such a link is met.
+
+    The first link met of each file with several hard links (or of any file if the
+    symbolic links are followed) is recorded, so that the other links reuse its
+    SHA-256 hash value and, with the "once" policy, are not counted in the sizes.
+    """
+
+    def __init__(
+        self, root_path: Path | str, hardlinks: str = "all", follow_symlinks: bool = False
+    ):
+        """
+        Args:
+            root_path (Path | str): The path to the root of the scan.
+            hardlinks (str, optional): "all" to count the size of every link of a file,
+                or "once" to count it for the first link met only. Defaults to "all".
+            follow_symlinks (bool, optional): Whether the scan follows symbolic links.
+                Defaults to False.
+
+        Raises:
+            ValueError: If `hardlinks` is not one of `HARDLINK_POLICIES`.
+        """
+        if hardlinks not in HARDLINK_POLICIES:
+            raise ValueError(f"{hardlinks}: 'hardlinks' must be one of {HARDLINK_POLICIES}.")
+        self.root_path: Path = Path(root_path)
+        self.hardlinks: str = hardlinks
+        self.follow_symlinks: bool = follow_symlinks
+        self._directories: Dict[Path, Tuple[int, int]] = {}
+        self._files: Dict[Tuple[int, int], Dict[str, Any]] = {}
+
+    def _directory_identity(self, path: Path) -> Tuple[int, int]:
+        if path not in self._directories:
+            self._directories[path] = _identity(os.stat(path))
+        return self._directories[path]
+
+    def is_cycle(self, path: Path) -> bool:
+        """Returns True if the link `path` points to a directory on its own path from the root."""
+        try:
+            target: Tuple[int, int] = _identity(os.stat(path))
+        except OSError:
+            return False
+        ancestor: Path = path.parent
+        while True:
+            if self._directory_identity(ancestor) == target:
+                return True
+            if ancestor == self.root_path or ancestor == ancestor.parent:
+                return False
+            ancestor = ancestor.parent
+
+    def is_tracked(self, stat: os.stat_result) -> bool:
+        """Returns True if the file of `stat` may be met through other links."""
+        return stat.st_nlink > 1 or self.follow_symlinks
+
+    def first_link(self, stat: os.stat_result) -> Dict[str, Any] | None:
+        """Returns the metadata of the first link met of the file of `stat`, if any."""
+        return self._files.get(_identity(stat))
+
+    def add(self, stat: os.stat_result, node: Dict[str, Any]) -> None:
+        """Records `node` as the first link met of the file of `stat`."""
+        self._files.setdefault(_identity(stat), node)
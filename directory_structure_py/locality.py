@@ -0,0 +1,85 @@
+"""locality
+
+orders in which the files of a directory are read, to reduce the seeks of spinning
+disks and the recalls of tape-backed (HSM) file systems
+"""
+
+import os
+from pathlib import Path
+import struct
+import sys
+from typing import Dict, List, Tuple
+
+# _IOWR('f', 11, struct fiemap)
+FS_IOC_FIEMAP: int = 0xC020660B
+# fm_start, fm_length, fm_flags, fm_mapped_extents, fm_extent_count, fm_reserved
+FIEMAP = struct.Struct("=QQIIII")
+# fe_logical, fe_physical, fe_length, fe_reserved64[2], fe_flags, fe_reserved[3]
+FIEMAP_EXTENT = struct.Struct("=QQQQQIIII")
+FIEMAP_MAX_OFFSET: int = 2 ** 64 - 1
+
+
+def physical_offset(path: Path | str) -> int | None:
+    """Returns the physical offset of the first extent of a file with the FIEMAP ioctl.
+
+    Returns:
+        int | None: The offset in bytes, or None if the platform or the file system does
+            not support FIEMAP, or if the file has no extent (e.g., it is empty or inline).
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    import fcntl  # pylint: disable=import-outside-toplevel
+    request: bytearray = bytearray(
+        FIEMAP.pack(0, FIEMAP_MAX_OFFSET, 0, 0, 1, 0) + bytes(FIEMAP_EXTENT.size)
+    )
+    try:
+        fd: int = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        fcntl.ioctl(fd, FS_IOC_FIEMAP, request, True)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+    if FIEMAP.unpack_from(request)[3] == 0:
+        return None
+    return FIEMAP_EXTENT.unpack_from(request, FIEMAP.size)[1]
+
+
+def _inode(path: Path, inodes: Dict[Path, int]) -> int:
+    if path in inodes:
+        return inodes[path]
+    try:
+        return os.stat(path).st_ino
+    except OSError:
+        return 0
+
+
+def sort_for_reading(
+    paths: List[Path], order: str, inodes: Dict[Path, int] | None = None
+) -> List[Path]:
+    """Returns the files of a directory in the order in which to read them.
+
+    Args:
+        paths (List[Path]): The files in the order of the directory listing.
+        order (str): One of `scan_options.READ_ORDERS`: "listing" keeps the order of `paths`,
+            "inode" sorts them by inode number, which follows the allocation order
+            on many file systems, and "extent" by the physical offset of their first
+            extent (see `physical_offset`), the files without any following by inode.
+        inodes (Dict[Path, int] | None, optional): The inode numbers already known,
+            e.g., from `os.DirEntry.inode`; the other files are stat'ed. Defaults to None.
+
+    Returns:
+        List[Path]: The sorted files.
+    """
+    inodes = inodes or {}
+    if order == "inode":
+        return sorted(paths, key=lambda path: _inode(path, inodes))
+    if order == "extent":
+        keys: List[Tuple[int, int]] = []
+        for path in paths:
+            offset: int | None = physical_offset(path)
+            keys.append((0, offset) if offset is not None else (1, _inode(path, inodes)))
+        return [path for _, path in sorted(zip(keys, paths), key=lambda pair: pair[0])]
+    return paths
@@ -3,77 +3,174 @@
 get the directory tree
 """
 
+import atexit
 import copy
+import dataclasses
 import datetime
-import importlib.resources
 import json
-from logging import getLogger, config, Logger
+from logging import getLogger, config, FileHandler, Logger, LogRecord, DEBUG
+from logging.handlers import QueueHandler, QueueListener
 import os
 from pathlib import Path
+import queue
 import time
 import traceback
 from typing import Dict, Any, List
-from rocrate.rocrate import ROCrate
 
-from directory_structure_py.constants import (
-    ENSURE_ASCII, JSON_OUTPUT_INDENT
-)
 from directory_structure_py.get_metadata import (
     get_metadata_of_files_in_list_format,
     update_statistical_info_to_metadata_list
 )
+from directory_structure_py.metrics import ScanMetrics
+from directory_structure_py.profiling import PipelineProfiler
+from directory_structure_py.scan_options import ScanOptions
+from directory_structure_py.checkpoint import ScanCheckpoint, DEFAULT_CHECKPOINT_INTERVAL
+from directory_structure_py.compression import (
+    infer_compression, strip_compression_extension, add_compression_extension, open_output
+)
+from directory_structure_py.serialization import dump_json
+from directory_structure_py.snapshot import write_snapshot, SNAPSHOT_EXTENSION
+from directory_structure_py.sharding import scan_shard, load_manifest
+from directory_structure_py.estimate import (
+    estimate_metadata, DEFAULT_ESTIMATE_DEPTH, DEFAULT_CONFIDENCE
+)
+from directory_structure_py.duplicates import find_duplicates as find_duplicate_files
 from directory_structure_py.conversion import (
-    list2tree,
+    write_list_as_tree,
     convert_meta_list_json_to_tsv,
     convert_meta_list_json_to_rocrate
 )
-from directory_structure_py.rocrate_models import Preview, Metadata
 
-LOG_CONF_PATH: str = importlib.resources.files(
-    __package__
-).joinpath("config/logging.json")
+LOG_CONF_PATH: str = os.path.join(
+    os.path.dirname(__file__), "config/logging.json"
+)
 LOG_OUTPUT_PATH: str = os.path.join(
     os.path.dirname(__file__),
     f"log/directory_structure_py_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}.log"
 )
 
 
-def set_logger(config_path: str, output_log_path: str) -> Logger:
-    """Set a logger"""
+# the paths of the configuration applied by `set_logger` and the listener of its queue
+_logging_state: Dict[str, Any] = {}
+
+
+class _RecordQueueHandler(QueueHandler):
+    """A `QueueHandler` leaving the formatting to the handlers of its listener.
+
+    The stock one formats each record in the calling thread; this one only merges the
+    message with its arguments, which may change after the call, and passes the
+    exception information as is.
+    """
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def set_logger(config_path: str, output_log_path: str, debug: bool = False) -> Logger:
+    """Set a logger
+
+    The handlers of the "main" logger in the configuration are put behind a
+    `QueueHandler`, so that the records are formatted and written by a `QueueListener`
+    on a background thread and the scan never waits for the log file. With `debug`,
+    the "main" logger and its file handlers are lowered to the DEBUG level, e.g., to
+    write the slow entries of `ScanMetrics` to the log file. The configuration is
+    applied once per pair of paths and `debug`: the next calls with the same ones,
+    e.g., repeated `main` calls in a process, reuse it.
+    """
+    logger = getLogger("main")
+    if _logging_state.get("paths") == (config_path, output_log_path, debug):
+        return logger
+    stop_logger()
     with open(config_path, "r", encoding="utf-8") as ff:
         log_conf = json.load(ff)
         log_conf["handlers"]["fileHandler"]["filename"] = output_log_path
         config.dictConfig(log_conf)
+    if debug:
+        logger.setLevel(DEBUG)
+        for handler in logger.handlers:
+            if isinstance(handler, FileHandler):
+                handler.setLevel(DEBUG)
 
-    logger = getLogger("main")
+    if logger.handlers and not any(isinstance(h_, QueueHandler) for h_ in logger.handlers):
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, *logger.handlers, respect_handler_level=True)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.addHandler(_RecordQueueHandler(log_queue))
+        listener.start()
+        _logging_state["listener"] = listener
+    _logging_state["paths"] = (config_path, output_log_path, debug)
     return logger
 
 
-def save_dict_to_json(data: Dict[str, Any], dst: str) -> None:
+@atexit.register
+def stop_logger() -> None:
+    """Writes the pending records of the logger of `set_logger` and stops its thread."""
+    listener: QueueListener | None = _logging_state.pop("listener", None)
+    _logging_state.pop("paths", None)
+    if listener is not None:
+        listener.stop()
+
+
+def save_dict_to_json(
+    data: Dict[str, Any], dst: str, compression: str = "",
+    compact: bool = False, backend: str = "auto"
+) -> None:
     """Saves a dictionary to a JSON file.
 
     Args:
         data: The dictionary to be saved.
         dst: The path to the output JSON file.
             The file will be overwritten if it already exists.
+        compression: "gzip", "zstd" or "xz" to compress the file, in which case
+            the extension of the compression is appended to `dst` if missing.
+            Inferred from the extension of `dst` if empty. Defaults to "".
+        compact: If `True`, omit the indentation. Defaults to False.
+        backend: The JSON encoder: "orjson", "msgspec", "json" or "auto" for the fastest
+            installed one (see `select_json_backend`). Defaults to "auto".
     """
-    with open(dst, "w", encoding="utf-8") as ff:
-        json.dump(
-            data, ff,
-            indent=JSON_OUTPUT_INDENT,
-            ensure_ascii=ENSURE_ASCII
-        )
+    compression = infer_compression(dst, compression)
+    with open_output(add_compression_extension(dst, compression), compression) as ff:
+        dump_json(data, ff, compact=compact, backend=backend)
+
+
+def save_list_as_tree_to_json(
+    data: Dict[str, Any], dst: str, structure_only: bool = False,
+    compression: str = "", compact: bool = False
+) -> None:
+    """Saves a metadata in a list format to a JSON file in the tree format.
+
+    The tree is streamed by `write_list_as_tree` instead of being built in memory.
 
+    Args:
+        data: The metadata in a list format.
+        dst: The path to the output JSON file.
+            The file will be overwritten if it already exists.
+        structure_only: If `True`, output the structure only. Defaults to False.
+        compression: See `save_dict_to_json`. Defaults to "".
+        compact: If `True`, omit the indentation. Defaults to False.
+    """
+    compression = infer_compression(dst, compression)
+    with open_output(add_compression_extension(dst, compression), compression) as ff:
+        write_list_as_tree(data, ff, structure_only, compact)
 
-def save_nested_list_to_tsv(data: List[List[str]], dst: str) -> None:
+
+def save_nested_list_to_tsv(data: List[List[str]], dst: str, compression: str = "") -> None:
     """Saves a nested list to a TSV file.
     
     Args:
         data: The nested list to be saved.
         dst: The path to the output TSV file.
             The file will be overwritten if it already exists.
+        compression: "gzip", "zstd" or "xz" to compress the file, in which case
+            the extension of the compression is appended to `dst` if missing.
+            Inferred from the extension of `dst` if empty. Defaults to "".
     """
-    with open(dst, "w", encoding="utf-8") as ff:
+    compression = infer_compression(dst, compression)
+    with open_output(add_compression_extension(dst, compression), compression) as ff:
         ff.writelines(["\t".join(l) + "\n" for l in data])
 
 
@@ -86,7 +183,28 @@ def main(
     structure_only: bool = False,
     log_config_path: str = LOG_CONF_PATH,
     log_output_path: str = LOG_OUTPUT_PATH,
-    preview_template_path: str = None
+    preview_template_path: str = None,
+    find_duplicates: bool = False,
+    metrics_out: str = "",
+    progress_interval: float = 0.0,
+    profile: str = "",
+    scan_options: ScanOptions | None = None,
+    estimate: float = 0.0,
+    estimate_depth: int = DEFAULT_ESTIMATE_DEPTH,
+    confidence: float = DEFAULT_CONFIDENCE,
+    seed: int | None = None,
+    checkpoint_path: str = "",
+    checkpoint_interval: float = DEFAULT_CHECKPOINT_INTERVAL,
+    resume: bool = False,
+    compress: str = "",
+    compact: bool = False,
+    json_backend: str = "auto",
+    snapshot: str = "",
+    stats_engine: str = "python",
+    percentile_depth: int | None = 1,
+    shard: int | None = None,
+    manifest_path: str = "",
+    slow_entry_threshold: float = 0.0
 ):
     """
     Collects metadata from the source directory and writes it to a JSON file.
@@ -104,9 +222,58 @@ def main(
         include_root_path (bool): If `True`, includes the root path in the result 
             under the key 'root_path'. Default is `False`.
         structure_only: A boolean indicating whether to output the structure only.
-            in the resulting tree. Defaults to False.
+            in the resulting tree. Unless `scan_options.fields` is set, the scan also
+            skips hashing, MIME guessing and the `stat` of files. Defaults to False.
         in_tree (bool): If `True`, output the metadata in a tree format.
         to_tsv (bool): If `True`, output the metadata a TSV format as well as a JSON one.
+        find_duplicates (bool): If `True`, output the groups of duplicate files
+            to a `_duplicates` JSON file.
+        metrics_out (str): If not empty, save the elapsed time of each stage
+            and the counters of the scan (see `ScanMetrics.report`) to this JSON file.
+        progress_interval (float): If positive, log the progress of the scan
+            at this interval in seconds.
+        profile (str): "cpu", "memory" or "both" to profile the pipeline with
+            cProfile and/or tracemalloc (see `PipelineProfiler`). The results are
+            saved next to `log_output_path`. Defaults to "" (no profiling).
+        scan_options (ScanOptions | None): The maximum depth and the patterns of
+            the entries to prune from the scan. Defaults to None (all the entries).
+        estimate (float): If positive, estimate the statistical information of the
+            directories down to `estimate_depth` by stat'ing this fraction of the files
+            instead of scanning the whole tree (see `estimate_metadata`). Defaults to 0.0.
+        estimate_depth (int): The depth of the deepest directories reported in the
+            estimate mode. Defaults to `DEFAULT_ESTIMATE_DEPTH`.
+        confidence (float): The confidence level of the intervals of the estimates.
+            Defaults to `DEFAULT_CONFIDENCE`.
+        seed (int | None): The seed of the sampling of the estimate mode. Defaults to None.
+        checkpoint_path (str): If not empty, record the progress of the scan to this
+            state file every `checkpoint_interval` seconds (see `ScanCheckpoint`).
+            The file is removed once the metadata is saved. Defaults to "".
+        checkpoint_interval (float): The interval in seconds between checkpoints.
+            Defaults to `DEFAULT_CHECKPOINT_INTERVAL`.
+        resume (bool): If `True`, resume the scan from the state file at `checkpoint_path`,
+            reusing the directories it records. Defaults to False.
+        compress (str): "gzip", "zstd" or "xz" to compress the JSON, TSV and tree outputs
+            (the RO-Crate files are not compressed). Inferred from the extension of `dst`
+            (e.g., ".json.gz") if empty. Defaults to "".
+        compact (bool): If `True`, write the JSON outputs without indentation. Defaults to False.
+        json_backend (str): The JSON encoder of the outputs: "orjson", "msgspec", "json"
+            or "auto" for the fastest installed one. The tree output is streamed with the
+            stdlib encoder regardless. Defaults to "auto".
+        snapshot (str): "alongside" to write a binary snapshot of the metadata in a list
+            format to `<dst>.snap` as well (see `SnapshotReader`), or "only" to write it
+            instead of the JSON. Defaults to "" (no snapshot).
+        stats_engine (str): "python" to roll up the statistical information node by node,
+            or "numpy" to use the columnar engine (see `ColumnarStats`), which is faster on
+            large trees and adds the distributions of the sizes. Defaults to "python".
+        percentile_depth (int | None): The depth of the deepest directories with the
+            percentiles of the sizes in the "numpy" engine, or None for all. Defaults to 1.
+        shard (int | None): If set, scan only this shard of the plan at `manifest_path`
+            (see `scan_shard`) with the scan options of the plan, and write a partial output
+            to be merged by `merge_shards`. Defaults to None (the whole tree).
+        manifest_path (str): The manifest saved by the `plan` command. Defaults to "".
+        slow_entry_threshold (float): If positive, log at the DEBUG level the entries
+            whose `stat` or hash takes longer than this in seconds (see `ScanMetrics`),
+            the DEBUG level being enabled for the log file. Defaults to 0.0.
 
     Returns:
         None: The function writes the metadata to a file and does not return anything.
@@ -114,65 +281,149 @@ def main(
     st = time.time()
     if not os.path.exists(os.path.dirname(log_output_path)):
         os.makedirs(os.path.dirname(log_output_path))
-    logger: Logger = set_logger(log_config_path, log_output_path)
+    logger: Logger = set_logger(log_config_path, log_output_path, slow_entry_threshold > 0)
     logger.info("starts.")
     logger.info("source path: '%s'.", str(src))
+    metrics = ScanMetrics(progress_interval, logger, slow_entry_threshold)
+    profiler: PipelineProfiler | None = None
+    if profile:
+        profiler = PipelineProfiler(profile, os.path.splitext(log_output_path)[0])
+        metrics.stage_callbacks.append(profiler.on_stage_end)
+        profiler.start()
+    checkpoint: ScanCheckpoint | None = None
     try:
+        compression: str = infer_compression(str(dst), compress)
+        dst = strip_compression_extension(str(dst))
         src = os.path.abspath(src)
         if os.name == "nt" and not str(src).startswith(r"//?/"):
             src = Path(r"//?/" + src)
-        logger.info("extract the metadata...")
-        data: Dict[str, Any] = get_metadata_of_files_in_list_format(
-            src, include_root_path
-        )
-        data = update_statistical_info_to_metadata_list(data)
+        if structure_only and (scan_options is None or scan_options.fields is None):
+            scan_options = dataclasses.replace(scan_options or ScanOptions(), fields=[])
+        if estimate > 0:
+            logger.info("estimate the metadata from %.2f%% of the files...", estimate * 100)
+            with metrics.stage("estimate"):
+                data: Dict[str, Any] = estimate_metadata(
+                    src, estimate, include_root_path, estimate_depth,
+                    confidence, seed, scan_options, metrics
+                )
+        elif shard is not None:
+            logger.info("extract the metadata of the shard %d of '%s'...", shard, manifest_path)
+            with metrics.stage("scan"):
+                data = scan_shard(
+                    src, load_manifest(manifest_path), shard, include_root_path, metrics
+                )
+        else:
+            if checkpoint_path:
+                checkpoint = ScanCheckpoint(checkpoint_path, {
+                    "src": str(src),
+                    "include_root_path": include_root_path,
+                    "scan_options": dataclasses.asdict(scan_options) if scan_options else None,
+                }, resume, checkpoint_interval, logger)
+            logger.info("extract the metadata...")
+            with metrics.stage("scan"):
+                data = get_metadata_of_files_in_list_format(
+                    src, include_root_path, metrics=metrics, options=scan_options,
+                    checkpoint=checkpoint
+                )
+            with metrics.stage("rollUp"):
+                if stats_engine == "numpy":
+                    # numpy is an optional dependency; load it only when needed.
+                    from directory_structure_py.columnar import (  # pylint: disable=import-outside-toplevel
+                        update_statistical_info_with_columns
+                    )
+                    data = update_statistical_info_with_columns(data, percentile_depth)
+                else:
+                    data = update_statistical_info_to_metadata_list(data)
         if not os.path.exists(os.path.dirname(dst)):
             os.makedirs(os.path.dirname(dst))
 
-        logger.info("save the metadata in a list format...")
-        save_dict_to_json(data, dst)
+        if snapshot not in ["", "alongside", "only"]:
+            raise ValueError(f"{snapshot}: 'snapshot' must be 'alongside' or 'only'.")
+        if snapshot != "only":
+            logger.info("save the metadata in a list format...")
+            with metrics.stage("writeJson"):
+                save_dict_to_json(data, dst, compression, compact, json_backend)
+        if snapshot:
+            logger.info("save the metadata in a binary snapshot...")
+            with metrics.stage("snapshot"):
+                write_snapshot(data, f"{os.path.splitext(dst)[0]}{SNAPSHOT_EXTENSION}")
+        if checkpoint is not None:
+            checkpoint.close(remove=True)
+
+        if find_duplicates:
+            logger.info("find duplicate files...")
+            with metrics.stage("duplicates"):
+                duplicates: List[Dict[str, Any]] = find_duplicate_files(
+                    data, src,
+                    throttle=scan_options.read_throttle() if scan_options is not None else None
+                )
+                dst_duplicates: str = dst.replace(
+                    os.path.splitext(dst)[-1],
+                    f"_duplicates{os.path.splitext(dst)[-1]}"
+                )
+                logger.info("save %d groups of duplicate files...", len(duplicates))
+                save_dict_to_json({
+                    "root_path": data["root_path"],
+                    "duplicates": duplicates,
+                    "dateCreated": data["dateCreated"]
+                }, dst_duplicates, compression, compact, json_backend)
 
         if in_rocrate:
+            # rocrate and jinja2 are heavy to import; load them only when needed.
+            from directory_structure_py.rocrate_models import (  # pylint: disable=import-outside-toplevel
+                Preview, Metadata
+            )
             logger.info("convert the metadata format from list to the RO-Crate... ")
-            root_path_original: str = copy.deepcopy(data["root_path"])
-            data["root_path"] = f"{str(Path(src).absolute().as_posix())}"
-            crate: ROCrate = convert_meta_list_json_to_rocrate(data)
-            data["root_path"] = root_path_original
-            _ = crate.add(Preview(crate))
-            # crate.write_zip(os.path.dirname(dst))
-            # crate.write(os.path.dirname(dst))
-            crate.metadata.write(os.path.dirname(dst))
-            logger.info("save the metadata in the RO-Crate format... ")
-            rocrate_metadata: Metadata = Metadata(crate)
-            rocrate_metadata.write(os.path.dirname(dst))
+            with metrics.stage("rocrate"):
+                root_path_original: str = copy.deepcopy(data["root_path"])
+                data["root_path"] = f"{str(Path(src).absolute().as_posix())}"
+                crate = convert_meta_list_json_to_rocrate(data)
+                data["root_path"] = root_path_original
+                _ = crate.add(Preview(crate))
+                # crate.write_zip(os.path.dirname(dst))
+                # crate.write(os.path.dirname(dst))
+                crate.metadata.write(os.path.dirname(dst))
+                logger.info("save the metadata in the RO-Crate format... ")
+                rocrate_metadata: Metadata = Metadata(crate)
+                rocrate_metadata.write(os.path.dirname(dst))
             logger.info("save the preview for the RO-Crate-format metadata... ")
-            crate.preview.write(os.path.dirname(dst), preview_template_path)
+            with metrics.stage("preview"):
+                crate.preview.write(os.path.dirname(dst), preview_template_path)
 
         if to_tsv:
             logger.info("save the metadata in a TSV format...")
-            data_tsv = convert_meta_list_json_to_tsv(data)
-            dst_tsv: str = dst.replace(
-                os.path.splitext(dst)[-1], ".tsv"
-            )
-            save_nested_list_to_tsv(data_tsv, dst_tsv)
+            with metrics.stage("tsv"):
+                data_tsv = convert_meta_list_json_to_tsv(data)
+                dst_tsv: str = dst.replace(
+                    os.path.splitext(dst)[-1], ".tsv"
+                )
+                save_nested_list_to_tsv(data_tsv, dst_tsv, compression)
 
         if in_tree:
             if structure_only:
                 logger.info("extract the directory structure...")
             else:
                 logger.info("convert the metadata format from list to tree...")
-            data = list2tree(copy.deepcopy(data), structure_only)
-            dst_tree: str = dst.replace(
-                os.path.splitext(dst)[-1],
-                f"_tree{os.path.splitext(dst)[-1]}"
-            )
-            if structure_only:
-                logger.info("save the directory structure...")
-            else:
-                logger.info("save the metadata in a tree format...")
-            save_dict_to_json(data, dst_tree)
+            with metrics.stage("tree"):
+                dst_tree: str = dst.replace(
+                    os.path.splitext(dst)[-1],
+                    f"_tree{os.path.splitext(dst)[-1]}"
+                )
+                if structure_only:
+                    logger.info("save the directory structure...")
+                else:
+                    logger.info("save the metadata in a tree format...")
+                save_list_as_tree_to_json(data, dst_tree, structure_only, compression, compact)
     except Exception:
         traceback.print_exc()
         logger.error(traceback.format_exc())
+    if checkpoint is not None:
+        checkpoint.close()
+    if profiler is not None:
+        for path_ in profiler.stop():
+            logger.info("save the profile to '%s'.", path_)
+    metrics.log_summary()
+    if metrics_out:
+        metrics.save(metrics_out)
     logger.info("ended.")
     logger.info("elapsed time: %.*f sec.\n", 3, time.time() - st)
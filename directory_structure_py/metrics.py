@@ -0,0 +1,171 @@
+"""metrics
+
+per-stage timing and throughput instrumentation of the scan pipeline
+"""
+
+from collections import defaultdict
+from contextlib import contextmanager
+import json
+from logging import getLogger, Logger, DEBUG
+import os
+import time
+from typing import Dict, Any, Iterator, List, Callable
+
+from directory_structure_py.constants import ENSURE_ASCII, JSON_OUTPUT_INDENT
+
+# at most this many slow entries are logged per second, the others being counted only.
+SLOW_ENTRY_LOGS_PER_SECOND: int = 10
+
+
+class ScanMetrics:
+    """
+    Collects per-stage elapsed times and counters of a run of `main`.
+
+    Stages are timed with `stage` and run one after another (scan, roll-up,
+    JSON write, RO-Crate conversion, ...). Within the scan stage, the time
+    spent in `stat` and hashing is accumulated with `timer`; the rest of
+    the scan is reported as the directory walk.
+
+    An operation on an entry taking longer than `slow_entry_threshold` is counted
+    in "slowEntries" and logged at the DEBUG level, up to `SLOW_ENTRY_LOGS_PER_SECOND`
+    times per second, so that a storage hiccup on many files does not flood the log.
+    """
+
+    def __init__(
+        self, progress_interval: float = 0.0, logger: Logger | None = None,
+        slow_entry_threshold: float = 0.0
+    ):
+        """
+        Args:
+            progress_interval (float, optional): The interval in seconds of progress
+                logging during the scan. No progress is logged if it is not positive.
+                Defaults to 0.0.
+            logger (Logger | None, optional): The logger of the progress and the summary.
+                Defaults to the "main" logger.
+            slow_entry_threshold (float, optional): The elapsed time in seconds of a `stat`
+                or a hash of an entry above which the entry is logged. Never if not positive.
+                Defaults to 0.0.
+        """
+        self.progress_interval: float = progress_interval
+        self.logger: Logger = logger or getLogger("main")
+        self.slow_entry_threshold: float = (
+            slow_entry_threshold if slow_entry_threshold > 0 else float("inf")
+        )
+        self._slow_entry_second: int = 0
+        self._slow_entry_logs: int = 0
+        self._slow_entries_dropped: int = 0
+        self.stages: Dict[str, float] = {}
+        self.timers: Dict[str, float] = defaultdict(float)
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.stage_callbacks: List[Callable[[str], None]] = []
+        self._start: float = time.perf_counter()
+        self._last_progress: float = self._start
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Times a stage of the pipeline. The callbacks in `stage_callbacks`
+        are called with the name of the stage when it ends."""
+        st = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - st
+            for callback in self.stage_callbacks:
+                callback(name)
+
+    @contextmanager
+    def timer(self, name: str, path: os.PathLike | str | None = None) -> Iterator[None]:
+        """Accumulates the elapsed time of an operation repeated within a stage.
+        If `path` is given, the operation is checked against `slow_entry_threshold`."""
+        st = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed: float = time.perf_counter() - st
+            self.timers[name] += elapsed
+            if path is not None and elapsed > self.slow_entry_threshold:
+                self._slow_entry(name, path, elapsed)
+
+    def _slow_entry(self, name: str, path: os.PathLike | str, elapsed: float) -> None:
+        self.counters["slowEntries"] += 1
+        if not self.logger.isEnabledFor(DEBUG):
+            return
+        second: int = int(time.monotonic())
+        if second != self._slow_entry_second:
+            self._slow_entry_second = second
+            self._slow_entry_logs = 0
+        if self._slow_entry_logs >= SLOW_ENTRY_LOGS_PER_SECOND:
+            self._slow_entries_dropped += 1
+            return
+        self._slow_entry_logs += 1
+        self.logger.debug(
+            "slow %s: %.3f sec. on '%s' (%d other slow entries not logged).",
+            name, elapsed, path, self._slow_entries_dropped
+        )
+        self._slow_entries_dropped = 0
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Increments a counter."""
+        self.counters[name] += value
+
+    def node_done(self, node_type: str) -> None:
+        """Counts a scanned node and logs the progress if the interval has elapsed."""
+        if node_type == "Directory":
+            self.counters["directories"] += 1
+        elif node_type == "File":
+            self.counters["files"] += 1
+        if self.progress_interval <= 0:
+            return
+        now = time.perf_counter()
+        if now - self._last_progress < self.progress_interval:
+            return
+        self._last_progress = now
+        self.logger.info(
+            "progress: %d files, %d directories, %.1f MB hashed (%.1f files/s).",
+            self.counters["files"], self.counters["directories"],
+            self.counters["bytesHashed"] / 1e6,
+            self.counters["files"] / max(now - self._start, 1e-9)
+        )
+
+    def report(self) -> Dict[str, Any]:
+        """Returns the measurements as a dictionary."""
+        elapsed: float = time.perf_counter() - self._start
+        scan: float = self.stages.get("scan", 0.0)
+        timers: Dict[str, float] = dict(self.timers)
+        if scan:
+            timers["walk"] = max(
+                scan - sum(v for k, v in self.timers.items() if k in ["stat", "hash"]), 0.0
+            )
+        counters: Dict[str, int] = dict(self.counters)
+        counters["syscalls"] = sum(
+            v for k, v in self.counters.items() if k.endswith("Calls")
+        )
+
+        def _rate(value: float, seconds: float) -> float:
+            return value / seconds if seconds > 0 else 0.0
+
+        return {
+            "elapsedTime": elapsed,
+            "stages": dict(self.stages),
+            "timers": timers,
+            "counters": counters,
+            "rates": {
+                "filesPerSecond": _rate(self.counters["files"], scan),
+                "directoriesPerSecond": _rate(self.counters["directories"], scan),
+                "bytesHashedPerSecond": _rate(
+                    self.counters["bytesHashed"], self.timers.get("hash", 0.0)
+                ),
+            },
+        }
+
+    def log_summary(self) -> None:
+        """Logs the elapsed time of each stage."""
+        for name, seconds in self.stages.items():
+            self.logger.info("stage '%s': %.*f sec.", name, 3, seconds)
+
+    def save(self, dst: str) -> None:
+        """Saves the report to a JSON file."""
+        with open(dst, "w", encoding="utf-8") as ff:
+            json.dump(
+                self.report(), ff, indent=JSON_OUTPUT_INDENT, ensure_ascii=ENSURE_ASCII
+            )
@@ -0,0 +1,94 @@
+"""profiling
+
+cProfile and tracemalloc hooks around the `main` pipeline
+"""
+
+import cProfile
+import os
+import tracemalloc
+from typing import List, Tuple
+
+PROFILE_MODES: List[str] = ["cpu", "memory", "both"]
+DEFAULT_TOP_ALLOCATORS: int = 10
+
+
+class PipelineProfiler:
+    """
+    Profiles the `main` pipeline with cProfile and/or tracemalloc.
+
+    With "cpu", the whole pipeline runs under cProfile and the statistics are
+    written to `<dst_base>.prof` (readable with `pstats` or snakeviz).
+    With "memory", a tracemalloc snapshot is taken at each stage boundary
+    (see `ScanMetrics.stage_callbacks`) and the top allocators of each stage
+    are written to `<dst_base>_memory.txt`. "both" does both.
+    """
+
+    def __init__(self, mode: str, dst_base: str, top: int = DEFAULT_TOP_ALLOCATORS):
+        """
+        Args:
+            mode (str): One of `PROFILE_MODES`.
+            dst_base (str): The output path without an extension.
+            top (int, optional): The number of allocators reported per stage.
+                Defaults to `DEFAULT_TOP_ALLOCATORS`.
+
+        Raises:
+            ValueError: If `mode` is not supported.
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"{mode}: 'mode' must be one of {PROFILE_MODES}.")
+        self.cpu: bool = mode in ["cpu", "both"]
+        self.memory: bool = mode in ["memory", "both"]
+        self.top: int = top
+        self.cpu_output_path: str = f"{dst_base}.prof"
+        self.memory_output_path: str = f"{dst_base}_memory.txt"
+        self._profile: cProfile.Profile | None = None
+        self._snapshot: tracemalloc.Snapshot | None = None
+        self._memory_report: List[Tuple[str, List[str], int, int]] = []
+
+    def start(self) -> None:
+        """Starts profiling."""
+        if self.memory:
+            tracemalloc.start()
+            self._snapshot = tracemalloc.take_snapshot()
+        if self.cpu:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def on_stage_end(self, stage: str) -> None:
+        """Records the allocations made during a stage."""
+        if not self.memory or not tracemalloc.is_tracing():
+            return
+        snapshot: tracemalloc.Snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ])
+        stats = snapshot.compare_to(self._snapshot, "lineno")
+        current, peak = tracemalloc.get_traced_memory()
+        self._memory_report.append((stage, [str(s) for s in stats[:self.top]], current, peak))
+        self._snapshot = snapshot
+        tracemalloc.reset_peak()
+
+    def stop(self) -> List[str]:
+        """Stops profiling and writes the results.
+
+        Returns:
+            List[str]: The paths to the written files.
+        """
+        dst: List[str] = []
+        if self._profile is not None:
+            self._profile.disable()
+            os.makedirs(os.path.dirname(self.cpu_output_path) or ".", exist_ok=True)
+            self._profile.dump_stats(self.cpu_output_path)
+            self._profile = None
+            dst.append(self.cpu_output_path)
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+            os.makedirs(os.path.dirname(self.memory_output_path) or ".", exist_ok=True)
+            with open(self.memory_output_path, "w", encoding="utf-8") as ff:
+                for stage, lines, current, peak in self._memory_report:
+                    ff.write(
+                        f"[{stage}] current: {current / 1024 ** 2:.2f} MiB, "
+                        f"peak: {peak / 1024 ** 2:.2f} MiB\n"
+                    )
+                    ff.writelines(f"    {line}\n" for line in lines)
+            dst.append(self.memory_output_path)
+        return dst
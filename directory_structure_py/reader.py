@@ -0,0 +1,254 @@
+"""reader
+
+readers of metadata files in a list format
+"""
+
+import importlib.util
+import itertools
+import json
+from pathlib import Path
+import re
+from typing import Dict, Any, Iterator, List, TextIO
+
+from directory_structure_py.constants import OUTPUT_ROOT_KEY
+from directory_structure_py.compression import open_input, strip_compression_extension
+
+# in the order of preference of the "auto" backend
+READER_BACKENDS: List[str] = ["ijson", "json"]
+READ_CHUNK_SIZE: int = 1024 * 1024
+# a value decoded this close to the end of the buffer may be truncated (e.g., "1e+1|2").
+_LOOKAHEAD: int = 32
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_CONTAINER_STARTS: List[str] = ["start_map", "start_array"]
+_CONTAINER_ENDS: List[str] = ["end_map", "end_array"]
+
+
+def select_reader_backend(backend: str = "auto") -> str:
+    """Returns the JSON parser to use.
+
+    Args:
+        backend (str, optional): One of `READER_BACKENDS`, or "auto" (or "") for
+            `ijson` if installed and the stdlib otherwise. Defaults to "auto".
+
+    Raises:
+        ValueError: If `backend` is not supported.
+        ImportError: If `backend` is not installed.
+    """
+    if backend in ["", "auto"]:
+        return "ijson" if importlib.util.find_spec("ijson") is not None else "json"
+    if backend not in READER_BACKENDS:
+        raise ValueError(f"{backend}: 'backend' must be one of {READER_BACKENDS} or 'auto'.")
+    if backend == "ijson" and importlib.util.find_spec("ijson") is None:
+        raise ImportError("ijson is not installed.")
+    return backend
+
+
+class _IncrementalDecoder:
+    """
+    Decodes the JSON values of a text stream one by one with the stdlib decoder.
+
+    The stream is read in chunks of `READ_CHUNK_SIZE` characters and the decoded
+    part of the buffer is dropped, so that only the value being decoded is held.
+    """
+
+    def __init__(self, ff: TextIO):
+        self._ff: TextIO = ff
+        self._buffer: str = ""
+        self._pos: int = 0
+        self._eof: bool = False
+        self._decoder = json.JSONDecoder()
+
+    def _read(self, size: int = READ_CHUNK_SIZE) -> bool:
+        """Appends a chunk to the buffer. Returns False at the end of the stream."""
+        if self._eof:
+            return False
+        chunk: str = self._ff.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self._buffer, self._pos)
+
+    def peek(self) -> str:
+        """Returns the next non-whitespace character ("" at the end of the stream)."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read():
+                return ""
+
+    def expect(self, characters: str) -> str:
+        """Consumes one of `characters` and returns it.
+
+        Raises:
+            json.JSONDecodeError: If the next character is not one of `characters`.
+        """
+        character: str = self.peek()
+        if not character or character not in characters:
+            raise self._error(f"Expecting one of {characters!r}")
+        self._pos += 1
+        return character
+
+    def value(self) -> Any:
+        """Decodes the next value, reading more of the stream until it is complete.
+
+        Raises:
+            json.JSONDecodeError: If the value is invalid.
+        """
+        self.peek()
+        size: int = READ_CHUNK_SIZE
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                if self._eof or end + _LOOKAHEAD <= len(self._buffer):
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError as ex:
+                # only an error at the end of the buffer may come from a truncated value.
+                truncated: bool = (
+                    ex.msg.startswith("Unterminated string")
+                    or ex.pos + _LOOKAHEAD > len(self._buffer)
+                )
+                if self._eof or not truncated:
+                    raise
+            # grow the reads so that a large value is not decoded too many times.
+            self._read(size)
+            size *= 2
+
+
+def _iter_json_graph(ff: TextIO, header: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Yields the nodes of `@graph` with the stdlib decoder."""
+    decoder = _IncrementalDecoder(ff)
+    decoder.expect("{")
+    if decoder.peek() == "}":
+        return
+    while True:
+        key: Any = decoder.value()
+        decoder.expect(":")
+        if key == OUTPUT_ROOT_KEY and decoder.peek() == "[":
+            decoder.expect("[")
+            if decoder.peek() == "]":
+                decoder.expect("]")
+            else:
+                while True:
+                    yield decoder.value()
+                    if decoder.expect(",]") == "]":
+                        break
+        else:
+            header[key] = decoder.value()
+        if decoder.expect(",}") == "}":
+            return
+
+
+class _IntegerOverflow(Exception):
+    """An integer too large for the C parser of `ijson` (above 64 bits)."""
+
+
+def _iter_ijson_graph(ff: TextIO, header: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Yields the nodes of `@graph` with the event parser of `ijson`.
+
+    Raises:
+        _IntegerOverflow: If an integer cannot be parsed by the backend of `ijson`.
+    """
+    import ijson  # pylint: disable=import-outside-toplevel,import-error
+    depth: int = 0
+    key: str = ""
+    builder: Any = None
+    base: int = 0
+    events: Iterator[Any] = iter(ijson.parse(ff.buffer, use_float=True))
+    while True:
+        try:
+            _, event, value = next(events)
+        except StopIteration:
+            return
+        except ijson.IncompleteJSONError as exc:
+            if "integer overflow" not in str(exc):
+                raise
+            raise _IntegerOverflow(str(exc)) from exc
+        if builder is None:
+            if depth == 0 and event == "start_map":
+                depth = 1
+                continue
+            if depth == 1 and event == "map_key":
+                key = value
+                continue
+            if depth == 1 and event == "end_map":
+                depth = 0
+                continue
+            if depth == 1 and key == OUTPUT_ROOT_KEY and event == "start_array":
+                depth = 2
+                continue
+            if depth == 2 and event == "end_array":
+                depth = 1
+                continue
+            # a node of `@graph` (depth 2) or another value of the document (depth 1)
+            builder = ijson.ObjectBuilder()
+            base = depth
+        builder.event(event, value)
+        if event in _CONTAINER_STARTS:
+            depth += 1
+        elif event in _CONTAINER_ENDS:
+            depth -= 1
+        if depth == base:
+            if base == 2:
+                yield builder.value
+            else:
+                header[key] = builder.value
+            builder = None
+
+
+def iter_graph_nodes(
+    src: Path | str, header: Dict[str, Any] | None = None, backend: str = "auto"
+) -> Iterator[Dict[str, Any]]:
+    """Yields the nodes of `@graph` in a metadata file in a list format one by one.
+
+    The file is parsed incrementally, so that only the node being yielded is held
+    in memory. A file whose name ends with ".jsonl" is read as JSON Lines holding
+    one node per line; lines without an `@id` are skipped. A file compressed with
+    gzip, zstd or xz (e.g., ".json.gz") is decompressed transparently.
+
+    Args:
+        src (Path | str): The path to the metadata file.
+        header (Dict[str, Any] | None, optional): If given, the other keys of the
+            document (e.g., `root_path` and `dateCreated`) are stored in it as they
+            are read, i.e., those following `@graph` once all the nodes are yielded.
+        backend (str, optional): The JSON parser: "ijson", "json" or "auto"
+            (see `select_reader_backend`). Defaults to "auto". A file holding an integer
+            too large for the C parser of `ijson` is read again with the stdlib, the nodes
+            already yielded being skipped.
+
+    Yields:
+        Dict[str, Any]: The metadata of a single file or directory.
+
+    Raises:
+        FileNotFoundError: If the specified file does not exist.
+        json.JSONDecodeError: If the file contains invalid JSON.
+    """
+    header = {} if header is None else header
+    yielded: int = 0
+    with open_input(src) as ff:
+        if strip_compression_extension(str(src)).endswith(".jsonl"):
+            for line in ff:
+                if not line.strip():
+                    continue
+                node: Dict[str, Any] = json.loads(line)
+                if "@id" in node:
+                    yield node
+            return
+        if select_reader_backend(backend) == "ijson":
+            try:
+                for node in _iter_ijson_graph(ff, header):
+                    yield node
+                    yielded += 1
+                return
+            except _IntegerOverflow:
+                pass
+    # the C parser of ijson cannot read the integers above 64 bits, which the stdlib
+    # decoder reads: the file is read again with it, skipping the nodes yielded.
+    with open_input(src) as ff:
+        yield from itertools.islice(_iter_json_graph(ff, header), yielded, None)
@@ -15,7 +15,7 @@ from rocrate.model import (
     Metadata as MetadataOrigin,
     Preview as PreviewOrigin
 )
-from directory_structure_py.constants import ENSURE_ASCII
+from directory_structure_py.serialization import dump_json
 
 
 class Metadata(MetadataOrigin):
@@ -39,9 +39,7 @@ class Metadata(MetadataOrigin):
         write_path = Path(base_path) / self.id
         as_jsonld = self.generate()
         with open(write_path, 'w', encoding="utf-8") as outfile:
-            json.dump(
-                as_jsonld, outfile, indent=4, sort_keys=True, ensure_ascii=ENSURE_ASCII
-            )
+            dump_json(as_jsonld, outfile, sort_keys=True)
 
 
 class Preview(PreviewOrigin):
@@ -0,0 +1,271 @@
+"""scan_options
+
+options of the directory walk of `get_metadata_of_files_in_list_format`
+"""
+
+from dataclasses import dataclass, field
+import fnmatch
+import os
+import re
+from typing import List
+
+from directory_structure_py.throttle import ReadThrottle
+
+# optional keys of the file metadata, from the cheapest to the most expensive
+# to compute: MIME types are guessed from the names, the sizes and dates need
+# a `stat` of each file, and `sha256` reads the whole content.
+OPTIONAL_FIELDS: List[str] = [
+    "mimetype", "contentSize", "dateCreated", "dateModified", "sha256"
+]
+DATE_FIELDS: List[str] = ["dateCreated", "dateModified"]
+STAT_FIELDS: List[str] = ["contentSize"] + DATE_FIELDS
+# policies of the files with several hard links: every link is counted in the sizes,
+# or only the first one met.
+HARDLINK_POLICIES: List[str] = ["all", "once"]
+# orders in which the files of a directory are hashed (see `locality.sort_for_reading`)
+READ_ORDERS: List[str] = ["listing", "inode", "extent"]
+# contents of `hasPart` of a large directory: all the children, or the subdirectories only
+LARGE_DIRECTORY_HAS_PART: List[str] = ["full", "directories"]
+
+
+def has_field(fields: List[str] | None, name: str) -> bool:
+    """Returns True if the optional key `name` is requested (all the keys if `fields` is None)."""
+    return fields is None or name in fields
+
+
+@dataclass(frozen=True)
+class IgnoreRule:
+    """
+    A pattern of an ignore file in the `.gitignore` syntax.
+
+    Attributes:
+        regex: The compiled pattern matched against a path relative to `base`.
+        base: The POSIX path of the directory holding the ignore file,
+            relative to the root of the scan ("" for the root itself).
+        negate: True if the pattern starts with "!" and re-includes matching paths.
+        dir_only: True if the pattern ends with "/" and only matches directories.
+    """
+    regex: re.Pattern
+    base: str
+    negate: bool
+    dir_only: bool
+
+    def matches(self, rel_path: str, is_dir: bool) -> bool:
+        """Returns True if the rule matches a path relative to the root of the scan."""
+        if self.dir_only and not is_dir:
+            return False
+        if self.base:
+            if not rel_path.startswith(self.base + "/"):
+                return False
+            rel_path = rel_path[len(self.base) + 1:]
+        return self.regex.fullmatch(rel_path) is not None
+
+
+def _translate(pattern: str) -> str:
+    """Translates a `.gitignore` glob into a regular expression."""
+    dst: str = ""
+    ii: int = 0
+    while ii < len(pattern):
+        if pattern.startswith("**/", ii):
+            dst += "(?:.*/)?"
+            ii += 3
+        elif pattern.startswith("/**", ii) and ii + 3 == len(pattern):
+            dst += "/.*"
+            ii += 3
+        elif pattern.startswith("**", ii):
+            dst += ".*"
+            ii += 2
+        elif pattern[ii] == "*":
+            dst += "[^/]*"
+            ii += 1
+        elif pattern[ii] == "?":
+            dst += "[^/]"
+            ii += 1
+        elif pattern[ii] == "[" and "]" in pattern[ii + 1:]:
+            end: int = pattern.index("]", ii + 1)
+            body: str = pattern[ii + 1:end].replace("\\", "\\\\")
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            dst += f"[{body}]"
+            ii = end + 1
+        else:
+            dst += re.escape(pattern[ii])
+            ii += 1
+    return dst
+
+
+def parse_ignore_file(path: str, base: str = "") -> List[IgnoreRule]:
+    """Parses an ignore file in the `.gitignore` syntax.
+
+    Supported: comments (#), negation (!), directory-only patterns (trailing /),
+    patterns anchored to the directory of the file (containing / elsewhere),
+    and the wildcards *, ?, [...] and **.
+
+    Args:
+        path (str): The path to the ignore file.
+        base (str, optional): The POSIX path of the directory holding the file,
+            relative to the root of the scan. Defaults to "".
+
+    Returns:
+        List[IgnoreRule]: The rules in the order of the file.
+    """
+    dst: List[IgnoreRule] = []
+    with open(path, "r", encoding="utf-8", errors="replace") as ff:
+        for line in ff:
+            line = line.rstrip("\n").rstrip("\r")
+            if not line.strip() or line.startswith("#"):
+                continue
+            line = line.rstrip(" ")
+            negate: bool = line.startswith("!")
+            if negate:
+                line = line[1:]
+            if line.startswith("\\"):
+                line = line[1:]
+            dir_only: bool = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            if "/" in line:
+                line = line.lstrip("/")
+            else:
+                line = "**/" + line
+            dst.append(IgnoreRule(re.compile(_translate(line)), base, negate, dir_only))
+    return dst
+
+
+@dataclass
+class ScanOptions:
+    """
+    Options of the directory walk.
+
+    Excluded entries are pruned during the walk: an excluded directory is not
+    descended into, and the statistical information of directories only covers
+    the included entries.
+
+    Attributes:
+        max_depth: The maximum depth of the entries to include, the source path
+            being at depth 0. Directories at the maximum depth are included
+            without their contents. No limit if None.
+        include: Glob patterns of the files to include. A file is included if
+            its name or its path relative to the source matches one of them.
+            All files are included if empty. Directories are not affected.
+        exclude: Glob patterns of the files and directories to exclude,
+            matched against the name and the path relative to the source.
+        ignore_file: The name of ignore files in the `.gitignore` syntax
+            (e.g., ".gitignore") read from each directory during the walk.
+            No ignore file is read if empty.
+        fields: The optional keys of the metadata to compute (see `OPTIONAL_FIELDS`).
+            The structure (IDs, names, extensions and counts) is always output.
+            An empty list only lists the directories. All the keys if None.
+        follow_symlinks: Whether symbolic links are followed. If False, a link is
+            reported as an "Unknown" entry with its target in `linkTarget`. If True,
+            a link to a directory on its own path from the source (a cycle) is
+            reported so instead of being descended into.
+        hardlinks: "all" to count the size of every link of a file with several hard
+            links, or "once" to count it for the first link met only, the other links
+            referring to it in `sameFileAs`. The content is hashed once in both cases.
+        read_order: The order in which the files of each directory are hashed:
+            "listing" (that of the directory listing), "inode" or "extent" (the
+            physical offset, with the FIEMAP ioctl on Linux) to reduce the seeks on
+            spinning disks and tape-backed storage. The output order is unchanged.
+        max_read_mbps: The maximum megabytes (10^6 bytes) read per second by the
+            hashing. No limit if 0.
+        max_iops: The maximum files opened per second by the hashing. No limit if 0.
+        adaptive_throttle: Whether to lower the limits above while the read latency
+            rises (see `throttle.ReadThrottle`).
+        large_directory_threshold: The number of entries above which a directory is
+            read in batches, its children being processed as they are read and its
+            counts taken from the metadata of its files. Never if 0.
+        large_directory_has_part: "full" to list all the children of a large directory
+            in `hasPart`, or "directories" to list its subdirectories only, its files
+            being linked to it by their `parent` only (they are then left out of the
+            tree format and of the snapshot children).
+        archives: Whether to scan the zip and tar archives (see `archives.ARCHIVE_SUFFIXES`)
+            as directories holding their members, read from the archives without
+            extracting them. The members are filtered as the other entries, except by
+            the ignore files.
+
+    Raises:
+        ValueError: If `fields` contains an unknown key, `hardlinks` is not one of
+            `HARDLINK_POLICIES`, `read_order` is not one of `READ_ORDERS`, a limit
+            or `large_directory_threshold` is negative, `adaptive_throttle` is set
+            without any limit, or `large_directory_has_part` is not one of
+            `LARGE_DIRECTORY_HAS_PART`.
+    """
+    max_depth: int | None = None
+    include: List[str] = field(default_factory=list)
+    exclude: List[str] = field(default_factory=list)
+    ignore_file: str = ""
+    fields: List[str] | None = None
+    follow_symlinks: bool = False
+    hardlinks: str = "all"
+    read_order: str = "listing"
+    max_read_mbps: float = 0.0
+    max_iops: float = 0.0
+    adaptive_throttle: bool = False
+    large_directory_threshold: int = 0
+    large_directory_has_part: str = "full"
+    archives: bool = False
+
+    def __post_init__(self):
+        unknown: List[str] = [
+            key for key in self.fields or [] if key not in OPTIONAL_FIELDS
+        ]
+        if unknown:
+            raise ValueError(f"{unknown}: 'fields' must be in {OPTIONAL_FIELDS}.")
+        if self.hardlinks not in HARDLINK_POLICIES:
+            raise ValueError(
+                f"{self.hardlinks}: 'hardlinks' must be one of {HARDLINK_POLICIES}."
+            )
+        if self.read_order not in READ_ORDERS:
+            raise ValueError(
+                f"{self.read_order}: 'read_order' must be one of {READ_ORDERS}."
+            )
+        if self.max_read_mbps < 0 or self.max_iops < 0:
+            raise ValueError("'max_read_mbps' and 'max_iops' must not be negative.")
+        if self.adaptive_throttle and not (self.max_read_mbps or self.max_iops):
+            raise ValueError("'adaptive_throttle' needs 'max_read_mbps' or 'max_iops'.")
+        if self.large_directory_threshold < 0:
+            raise ValueError("'large_directory_threshold' must not be negative.")
+        if self.large_directory_has_part not in LARGE_DIRECTORY_HAS_PART:
+            raise ValueError(
+                f"{self.large_directory_has_part}: 'large_directory_has_part' "
+                f"must be one of {LARGE_DIRECTORY_HAS_PART}."
+            )
+
+    def read_throttle(self) -> ReadThrottle | None:
+        """Returns a new throttle of the reads of the scan, or None without any limit."""
+        if not (self.max_read_mbps or self.max_iops):
+            return None
+        return ReadThrottle(self.max_read_mbps, self.max_iops, self.adaptive_throttle)
+
+    def is_included(
+        self, rel_path: str, is_dir: bool, depth: int,
+        ignore_rules: List[IgnoreRule] | None = None
+    ) -> bool:
+        """Returns True if an entry below the source path is to be scanned.
+
+        Args:
+            rel_path (str): The POSIX path of the entry relative to the source path.
+            is_dir (bool): Whether the entry is a directory.
+            depth (int): The depth of the entry (1 for the children of the source).
+            ignore_rules (List[IgnoreRule] | None, optional): The rules of the
+                ignore files of the ancestors, the deepest last. Defaults to None.
+        """
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+        name: str = os.path.basename(rel_path)
+        for pattern in self.exclude:
+            if fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(rel_path, pattern):
+                return False
+        if self.include and not is_dir:
+            if not any(
+                fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(rel_path, pattern)
+                for pattern in self.include
+            ):
+                return False
+        ignored: bool = False
+        for rule in ignore_rules or []:
+            if rule.matches(rel_path, is_dir):
+                ignored = not rule.negate
+        return not ignored
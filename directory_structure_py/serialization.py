@@ -0,0 +1,123 @@
+"""serialization
+
+pluggable JSON encoders of the outputs
+"""
+
+import importlib.util
+import json
+from typing import Any, List, TextIO
+
+from directory_structure_py.constants import ENSURE_ASCII, JSON_OUTPUT_INDENT
+
+# in the order of preference of the "auto" backend
+JSON_BACKENDS: List[str] = ["orjson", "msgspec", "json"]
+
+
+def _is_installed(backend: str) -> bool:
+    return backend == "json" or importlib.util.find_spec(backend) is not None
+
+
+def _supports(backend: str, compact: bool) -> bool:
+    """orjson only indents with 2 spaces, so it is used for the compact output only."""
+    return compact or backend != "orjson"
+
+
+def select_json_backend(backend: str = "auto", compact: bool = False) -> str:
+    """Returns the JSON encoder to use.
+
+    Args:
+        backend (str, optional): One of `JSON_BACKENDS`, or "auto" (or "") for the fastest
+            installed one supporting the output format. Defaults to "auto".
+        compact (bool, optional): Whether the output is compact (no indentation).
+            Defaults to False.
+
+    Raises:
+        ValueError: If `backend` is not supported, or does not support the output format.
+        ImportError: If `backend` is not installed.
+    """
+    if backend in ["", "auto"]:
+        for backend_ in JSON_BACKENDS:
+            if _supports(backend_, compact) and _is_installed(backend_):
+                return backend_
+    if backend not in JSON_BACKENDS:
+        raise ValueError(f"{backend}: 'backend' must be one of {JSON_BACKENDS} or 'auto'.")
+    if not _supports(backend, compact):
+        raise ValueError(f"{backend}: only the compact output is supported.")
+    if not _is_installed(backend):
+        raise ImportError(f"{backend} is not installed.")
+    return backend
+
+
+def _dumps_stdlib(data: Any, compact: bool, sort_keys: bool) -> bytes:
+    return json.dumps(
+        data, indent=None if compact else JSON_OUTPUT_INDENT,
+        separators=(",", ":") if compact else None,
+        sort_keys=sort_keys, ensure_ascii=ENSURE_ASCII
+    ).encode("utf-8")
+
+
+def dumps_json(
+    data: Any, compact: bool = False, sort_keys: bool = False, backend: str = "auto"
+) -> bytes:
+    """Encodes data to UTF-8 JSON.
+
+    The output is indented with `JSON_OUTPUT_INDENT` spaces unless `compact` is set.
+    Data that the selected backend cannot encode (e.g., the `None` keys of
+    `numberOfFilesPerMIMEType` with msgspec) is encoded with the stdlib.
+
+    Args:
+        data (Any): The data to encode.
+        compact (bool, optional): Whether to omit the indentation and the spaces.
+            Defaults to False.
+        sort_keys (bool, optional): Whether to sort the keys of the objects. Defaults to False.
+        backend (str, optional): See `select_json_backend`. Defaults to "auto".
+
+    Returns:
+        bytes: The encoded data.
+    """
+    backend = select_json_backend(backend, compact)
+    try:
+        if backend == "orjson":
+            import orjson  # pylint: disable=import-outside-toplevel,import-error
+            option: int = orjson.OPT_NON_STR_KEYS
+            if sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            return orjson.dumps(data, option=option)
+        if backend == "msgspec":
+            import msgspec  # pylint: disable=import-outside-toplevel,import-error
+            encoded: bytes = msgspec.json.encode(
+                data, order="sorted" if sort_keys else None
+            )
+            if compact:
+                return encoded
+            return msgspec.json.format(encoded, indent=JSON_OUTPUT_INDENT)
+    except TypeError:
+        pass
+    return _dumps_stdlib(data, compact, sort_keys)
+
+
+def dump_json(
+    data: Any, ff: TextIO, compact: bool = False, sort_keys: bool = False,
+    backend: str = "auto"
+) -> None:
+    """Writes data as JSON to a text stream. See `dumps_json`.
+
+    The indented output of the stdlib is streamed, since its C encoder does not
+    indent anyway; the compact output is encoded at once with the C encoder, which
+    is several times faster. The other backends encode the data at once and write
+    the bytes to the buffer of `ff`, skipping the text layer.
+    """
+    backend = select_json_backend(backend, compact)
+    if backend == "json" and compact:
+        ff.write(json.dumps(
+            data, separators=(",", ":"), sort_keys=sort_keys, ensure_ascii=ENSURE_ASCII
+        ))
+        return
+    if backend == "json":
+        json.dump(
+            data, ff, indent=JSON_OUTPUT_INDENT, sort_keys=sort_keys, ensure_ascii=ENSURE_ASCII
+        )
+        return
+    encoded: bytes = dumps_json(data, compact, sort_keys, backend)
+    ff.flush()
+    ff.buffer.write(encoded)
@@ -0,0 +1,393 @@
+"""server
+
+service mode keeping the metadata of configured roots in memory and
+serving node/subtree/statistics queries over localhost HTTP or a Unix socket
+"""
+
+import copy
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from logging import getLogger, Logger
+import os
+from pathlib import Path
+import socketserver
+import threading
+import time
+import traceback
+from typing import Dict, Any, List, Tuple
+from urllib.parse import urlsplit, parse_qs, unquote
+
+from directory_structure_py.constants import ENSURE_ASCII
+from directory_structure_py.get_metadata import (
+    get_metadata_of_files_in_list_format,
+    update_statistical_info_to_metadata_list
+)
+from directory_structure_py.index import MetadataIndex
+from directory_structure_py.watcher import watch
+
+DEFAULT_HOST: str = "127.0.0.1"
+DEFAULT_PORT: int = 8765
+QUERY_TYPES: List[str] = ["node", "children", "subtree", "statistics"]
+
+logger: Logger = getLogger("main")
+
+
+class ScanService:
+    """
+    Keeps the latest metadata index of each configured root resident in memory.
+
+    Each root is scanned with `get_metadata_of_files_in_list_format` and
+    `update_statistical_info_to_metadata_list`. A refresh builds a new index
+    in the background and swaps it in at once, so queries are never blocked
+    by a running scan. With `watch`, filesystem events are applied to the
+    indices as they happen (see `watcher.watch`) instead of rescanning.
+    """
+
+    def __init__(
+        self, roots: Dict[str, Path | str],
+        include_root_path: bool = False,
+        refresh_interval: float = 0.0,
+        watch_backend: str = ""
+    ):
+        """
+        Args:
+            roots (Dict[str, Path | str]): A dictionary mapping root names to source paths.
+            include_root_path (bool, optional): Whether to include the absolute path
+                of each root in the metadata. Defaults to False.
+            refresh_interval (float, optional): The interval in seconds between
+                background refreshes. No background refresh runs if it is not positive.
+                Defaults to 0.0.
+            watch_backend (str, optional): The backend of `watcher.watch` to keep
+                the indices up to date with. The roots are not watched if empty.
+                Defaults to "".
+        """
+        self.roots: Dict[str, str] = {
+            name: os.path.abspath(src) for name, src in roots.items()
+        }
+        self.include_root_path: bool = include_root_path
+        self.refresh_interval: float = refresh_interval
+        self.watch_backend: str = watch_backend
+        self._observers: Dict[str, Any] = {}
+        self._indices: Dict[str, MetadataIndex] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self._stop_event: threading.Event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._refreshes: Dict[str, threading.Thread] = {}
+
+    def refresh(self, name: str) -> MetadataIndex:
+        """Scans a root and replaces its index.
+
+        Raises:
+            KeyError: If `name` is not a configured root.
+        """
+        src: str = self.roots[name]
+        st = time.time()
+        data: Dict[str, Any] = get_metadata_of_files_in_list_format(
+            src, self.include_root_path
+        )
+        data = update_statistical_info_to_metadata_list(data)
+        index = MetadataIndex(data)
+        with self._lock:
+            self._indices[name] = index
+            if self.watch_backend:
+                if name in self._observers:
+                    self._observers.pop(name).stop()
+                self._observers[name] = watch(index, src, self.watch_backend)
+        logger.info(
+            "refreshed '%s' (%d nodes) in %.*f sec.", name, len(index), 3, time.time() - st
+        )
+        return index
+
+    def request_refresh(self, name: str) -> bool:
+        """Starts a refresh of a root on a background thread, unless one is running.
+        The current index is served until the new one is swapped in.
+
+        Returns:
+            bool: True if a refresh was started, False if one was already running.
+
+        Raises:
+            KeyError: If `name` is not a configured root.
+        """
+        if name not in self.roots:
+            raise KeyError(name)
+        with self._lock:
+            thread: threading.Thread | None = self._refreshes.get(name)
+            if thread is not None and thread.is_alive():
+                return False
+            thread = threading.Thread(
+                target=self._refresh_in_background, args=(name,),
+                name=f"ScanServiceRefresh-{name}", daemon=True
+            )
+            self._refreshes[name] = thread
+        thread.start()
+        return True
+
+    def _refresh_in_background(self, name: str) -> None:
+        try:
+            self.refresh(name)
+        except Exception:
+            logger.error(traceback.format_exc())
+
+    def is_refreshing(self, name: str) -> bool:
+        """Returns True while a refresh started by `request_refresh` is running."""
+        with self._lock:
+            thread: threading.Thread | None = self._refreshes.get(name)
+        return thread is not None and thread.is_alive()
+
+    def refresh_all(self) -> None:
+        """Scans all the roots."""
+        for name in self.roots:
+            try:
+                self.refresh(name)
+            except Exception:
+                logger.error(traceback.format_exc())
+
+    def index(self, name: str) -> MetadataIndex:
+        """Returns the current index of a root, scanning it first if necessary.
+
+        Only the first query of a root not scanned yet waits for the scan (`serve`
+        scans all the roots before listening); the later refreshes run in the
+        background (see `request_refresh`).
+
+        Raises:
+            KeyError: If `name` is not a configured root.
+        """
+        with self._lock:
+            index: MetadataIndex | None = self._indices.get(name)
+        if index is None:
+            index = self.refresh(name)
+        return index
+
+    def set_index(self, name: str, index: MetadataIndex) -> None:
+        """Replaces the index of a root."""
+        with self._lock:
+            self._indices[name] = index
+
+    def _refresh_loop(self) -> None:
+        while not self._stop_event.wait(self.refresh_interval):
+            self.refresh_all()
+
+    def start(self) -> None:
+        """Starts the background refresh if `refresh_interval` is positive."""
+        if self.refresh_interval <= 0 or self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._refresh_loop, name="ScanServiceRefresh", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the background refresh and the watchers."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            for observer in self._observers.values():
+                observer.stop()
+            self._observers.clear()
+
+    def query(self, name: str, query_type: str, node_id: str = "") -> Any:
+        """Answers a query on a root.
+
+        Args:
+            name (str): The name of the root.
+            query_type (str): One of `QUERY_TYPES`.
+            node_id (str, optional): The `@id` of the node to query.
+                Defaults to the root node.
+
+        Raises:
+            KeyError: If the root or the node is not found.
+            ValueError: If `query_type` is not supported.
+        """
+        index: MetadataIndex = self.index(name)
+        with index.lock:
+            if not node_id:
+                node_id = index.root_id
+            if node_id not in index:
+                raise KeyError(node_id)
+            if query_type == "node":
+                return copy.deepcopy(index.get(node_id))
+            if query_type == "children":
+                return copy.deepcopy(index.children(node_id))
+            if query_type == "subtree":
+                return copy.deepcopy(index.subtree(node_id))
+            if query_type == "statistics":
+                return index.statistics(node_id)
+        raise ValueError(f"{query_type}: 'query_type' must be one of {QUERY_TYPES}.")
+
+    def summary(self) -> Dict[str, Any]:
+        """Returns the configured roots and the state of their indices."""
+        dst: Dict[str, Any] = {}
+        with self._lock:
+            for name, src in self.roots.items():
+                index: MetadataIndex | None = self._indices.get(name)
+                thread: threading.Thread | None = self._refreshes.get(name)
+                dst[name] = {
+                    "src": src,
+                    "dateCreated": index.date_created if index else "",
+                    "numberOfNodes": len(index) if index else 0,
+                    "refreshing": thread is not None and thread.is_alive(),
+                }
+        return dst
+
+
+class ScanServiceRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP request handler of `ScanService`.
+
+    Endpoints:
+        GET  /                               : the configured roots.
+        GET  /<root>/<query>?id=<@id>        : `node`, `children`, `subtree` or `statistics`
+                                               of a node (the root node if `id` is omitted).
+        POST /<root>/refresh                 : rescan a root in the background (202),
+                                               the current index being served meanwhile.
+    """
+    server_version = "directory_structure_py"
+
+    @property
+    def service(self) -> ScanService:
+        """The service bound to the server."""
+        return self.server.service
+
+    def address_string(self) -> str:
+        # the client address of a Unix socket is not a (host, port) pair.
+        if isinstance(self.client_address, tuple):
+            return super().address_string()
+        return "unix"
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status: HTTPStatus, body: Any) -> None:
+        payload: bytes = json.dumps(body, ensure_ascii=ENSURE_ASCII).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _parse_path(self) -> Tuple[List[str], Dict[str, List[str]]]:
+        url = urlsplit(self.path)
+        parts: List[str] = [unquote(p_) for p_ in url.path.split("/") if p_]
+        return parts, parse_qs(url.query)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Answers a query."""
+        parts, params = self._parse_path()
+        if not parts:
+            self._send_json(HTTPStatus.OK, self.service.summary())
+            return
+        name: str = parts[0]
+        query_type: str = parts[1] if len(parts) > 1 else "node"
+        node_id: str = params.get("id", [""])[0]
+        if name not in self.service.roots:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"unknown root: '{name}'."})
+            return
+        if query_type not in QUERY_TYPES:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"unknown query: '{query_type}'."})
+            return
+        try:
+            self._send_json(HTTPStatus.OK, self.service.query(name, query_type, node_id))
+        except KeyError:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"unknown id: '{node_id}'."})
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Starts a rescan of a root without waiting for it."""
+        parts, _ = self._parse_path()
+        if len(parts) != 2 or parts[1] != "refresh" or parts[0] not in self.service.roots:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"unknown path: '{self.path}'."})
+            return
+        started: bool = self.service.request_refresh(parts[0])
+        self._send_json(HTTPStatus.ACCEPTED, {"started": started, "refreshing": True})
+
+
+class ScanServiceHTTPServer(ThreadingHTTPServer):
+    """Threading HTTP server bound to a `ScanService`."""
+
+    def __init__(self, service: ScanService, server_address: Tuple[str, int]):
+        self.service: ScanService = service
+        super().__init__(server_address, ScanServiceRequestHandler)
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+    class ScanServiceUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        """Threading HTTP server on a Unix socket bound to a `ScanService`."""
+        daemon_threads = True
+
+        def __init__(self, service: ScanService, socket_path: str):
+            self.service: ScanService = service
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            super().__init__(socket_path, ScanServiceRequestHandler)
+
+        def server_close(self):
+            super().server_close()
+            if os.path.exists(self.server_address):
+                os.remove(self.server_address)
+
+
+def create_server(
+    service: ScanService,
+    host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+    unix_socket: str = ""
+) -> socketserver.BaseServer:
+    """Creates a server answering the queries of a `ScanService`.
+
+    Args:
+        service (ScanService): The service to serve.
+        host (str, optional): The host to listen on. Defaults to `DEFAULT_HOST`.
+        port (int, optional): The port to listen on. Defaults to `DEFAULT_PORT`.
+        unix_socket (str, optional): The path to a Unix socket to listen on
+            instead of `host` and `port`. Defaults to "".
+
+    Returns:
+        socketserver.BaseServer: The server. Call `serve_forever` to start it.
+
+    Raises:
+        OSError: If Unix sockets are not supported on the platform.
+    """
+    if unix_socket:
+        if not hasattr(socketserver, "UnixStreamServer"):
+            raise OSError("Unix sockets are not supported on this platform.")
+        return ScanServiceUnixServer(service, unix_socket)
+    return ScanServiceHTTPServer(service, (host, port))
+
+
+def serve(
+    roots: Dict[str, Path | str],
+    host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+    unix_socket: str = "",
+    include_root_path: bool = False,
+    refresh_interval: float = 0.0,
+    watch_backend: str = ""
+) -> None:
+    """Scans the roots and serves queries on them until interrupted.
+
+    Args:
+        roots (Dict[str, Path | str]): A dictionary mapping root names to source paths.
+        host (str, optional): The host to listen on. Defaults to `DEFAULT_HOST`.
+        port (int, optional): The port to listen on. Defaults to `DEFAULT_PORT`.
+        unix_socket (str, optional): The path to a Unix socket to listen on
+            instead of `host` and `port`. Defaults to "".
+        include_root_path (bool, optional): Whether to include the absolute path
+            of each root in the metadata. Defaults to False.
+        refresh_interval (float, optional): The interval in seconds between
+            background refreshes. Defaults to 0.0 (no background refresh).
+        watch_backend (str, optional): The backend of `watcher.watch` to keep
+            the indices up to date with. Defaults to "" (no watching).
+    """
+    service = ScanService(roots, include_root_path, refresh_interval, watch_backend)
+    service.refresh_all()
+    server = create_server(service, host, port, unix_socket)
+    service.start()
+    logger.info("serving on %s.", unix_socket or f"http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
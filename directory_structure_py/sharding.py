@@ -0,0 +1,388 @@
+"""sharding
+
+scans of a directory split into shards run on several processes or hosts, and their merge
+
+A plan (manifest) divides the tree into units of work balanced by their numbers of
+entries, counted by a readdir-only pre-pass:
+    - "subtrees": directories scanned with all their contents by one shard;
+    - "directories": the directories above the subtrees (the root included), of which
+      a shard scans the directory itself and its non-directory children only.
+Each shard writes a partial list output, in which each subtree is rolled up, and the
+merge puts the nodes back in the order of a single scan and rolls up the directories
+above the subtrees only.
+"""
+
+import dataclasses
+import datetime
+import heapq
+import json
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+from directory_structure_py.compression import open_input
+from directory_structure_py.constants import DATETIME_FMT, OUTPUT_ROOT_KEY
+from directory_structure_py.get_metadata import (
+    generate_id,
+    get_metadata_of_single_directory,
+    _discount_repeated_files,
+    _filter_children,
+    _get_metadata_list,
+    _group_by_child,
+    _list_entry_types,
+    _read_ignore_file,
+    _reads_in_order,
+    _sort_for_reading,
+    _update_statistical_info_of_directory
+)
+from directory_structure_py.links import LinkTracker
+from directory_structure_py.metrics import ScanMetrics
+from directory_structure_py.reader import iter_graph_nodes
+from directory_structure_py.scan_options import ScanOptions, IgnoreRule
+from directory_structure_py.throttle import ReadThrottle
+
+ROOT_REL_PATH: str = "."
+
+
+@dataclasses.dataclass
+class _DirectoryCount:
+    """The numbers of entries of a directory counted by the pre-pass."""
+    own: int
+    total: int
+    subdirectories: List[str]
+
+
+def _list_children(
+    src: Path, root_path: Path, options: ScanOptions | None, depth: int,
+    ignore_rules: List[IgnoreRule], links: LinkTracker, inodes: Dict[Path, int] | None = None
+) -> Tuple[List[Path], Dict[Path, str], List[IgnoreRule]]:
+    """Lists the children of a directory kept by `options` without stat'ing them,
+    storing their inode numbers in `inodes` if given (see `_get_entry_types`)."""
+    child_types: Dict[Path, str] = _list_entry_types(src, options, links, inodes)
+    children: List[Path] = list(child_types.keys())
+    if options is not None:
+        children, ignore_rules = _filter_children(
+            src, children, child_types, root_path, options, depth, ignore_rules
+        )
+    return children, child_types, ignore_rules
+
+
+def _rel_path(path: Path, root_path: Path) -> str:
+    return ROOT_REL_PATH if path == root_path else path.relative_to(root_path).as_posix()
+
+
+def _count_entries(
+    src: Path, root_path: Path, options: ScanOptions | None, depth: int,
+    ignore_rules: List[IgnoreRule], counts: Dict[str, _DirectoryCount], links: LinkTracker
+) -> int:
+    """Counts the entries of the subtree of a directory, recording each directory."""
+    children, child_types, ignore_rules = _list_children(
+        src, root_path, options, depth, ignore_rules, links
+    )
+    subdirectories: List[Path] = [p_ for p_ in children if child_types[p_] == "Directory"]
+    own: int = 1 + len(children) - len(subdirectories)
+    total: int = own + sum(
+        _count_entries(p_, root_path, options, depth + 1, ignore_rules, counts, links)
+        for p_ in subdirectories
+    )
+    counts[_rel_path(src, root_path)] = _DirectoryCount(
+        own, total, [_rel_path(p_, root_path) for p_ in subdirectories]
+    )
+    return total
+
+
+def plan_shards(
+    src: Path | str, number_of_shards: int, options: ScanOptions | None = None
+) -> Dict[str, Any]:
+    """Splits the scan of a directory into shards balanced by their numbers of entries.
+
+    A directory whose subtree holds more than 1/`number_of_shards` of the entries is
+    split into its subdirectories; the units are then assigned to the shards, the
+    largest first, to the least loaded shard.
+
+    Args:
+        src (Path | str): The path to the directory to scan.
+        number_of_shards (int): The number of shards.
+        options (ScanOptions | None, optional): The options of the scan, recorded in
+            the manifest and applied to all the shards. Defaults to None.
+
+    Returns:
+        Dict[str, Any]: The manifest, with `src`, `rootId`, `scan_options` and `shards`,
+            the paths of whose units are relative to `src` ("." for `src` itself).
+
+    Raises:
+        ValueError: If `src` is not a directory, `number_of_shards` is not positive,
+            or `options` leaves files out of `hasPart`, which the merge relies on.
+    """
+    root_path: Path = Path(src)
+    if not root_path.is_dir():
+        raise ValueError(f"{src}: only a directory can be split into shards.")
+    if number_of_shards < 1:
+        raise ValueError(f"{number_of_shards}: 'number_of_shards' must be positive.")
+    if options is not None and options.large_directory_has_part != "full":
+        raise ValueError("the shards need 'large_directory_has_part' to be \"full\".")
+    counts: Dict[str, _DirectoryCount] = {}
+    total: int = _count_entries(
+        root_path, root_path, options, 0, [], counts, _link_tracker(root_path, options)
+    )
+    target: float = total / number_of_shards
+
+    # (kind, relative path, number of entries) in the order of the walk
+    units: List[Tuple[str, str, int]] = []
+    pending: List[str] = [ROOT_REL_PATH]
+    while pending:
+        rel_path: str = pending.pop()
+        count: _DirectoryCount = counts[rel_path]
+        if rel_path != ROOT_REL_PATH and count.total <= target:
+            units.append(("subtrees", rel_path, count.total))
+            continue
+        units.append(("directories", rel_path, count.own))
+        pending.extend(reversed(count.subdirectories))
+
+    shards: List[Dict[str, Any]] = [
+        {"shard": ii, "numberOfEntries": 0, "directories": [], "subtrees": []}
+        for ii in range(number_of_shards)
+    ]
+    loads: List[Tuple[int, int]] = [(0, ii) for ii in range(number_of_shards)]
+    for kind, rel_path, count in sorted(units, key=lambda unit: -unit[2]):
+        load, index = heapq.heappop(loads)
+        shards[index][kind].append(rel_path)
+        shards[index]["numberOfEntries"] += count
+        heapq.heappush(loads, (load + count, index))
+    for shard in shards:
+        shard["directories"].sort()
+        shard["subtrees"].sort()
+    return {
+        "src": str(root_path.absolute().as_posix()),
+        "rootId": generate_id(root_path, root_path),
+        "scan_options": dataclasses.asdict(options) if options is not None else None,
+        "numberOfEntries": total,
+        "shards": shards,
+        "dateCreated": datetime.datetime.now().strftime(DATETIME_FMT),
+    }
+
+
+def load_manifest(path: Path | str) -> Dict[str, Any]:
+    """Loads a manifest saved from `plan_shards`, decompressing it transparently."""
+    with open_input(path) as ff:
+        return json.load(ff)
+
+
+def _link_tracker(root_path: Path, options: ScanOptions | None) -> LinkTracker:
+    if options is None:
+        return LinkTracker(root_path)
+    return LinkTracker(root_path, options.hardlinks, options.follow_symlinks)
+
+
+def _options_of(manifest: Dict[str, Any]) -> ScanOptions | None:
+    if not manifest.get("scan_options"):
+        return None
+    return ScanOptions(**manifest["scan_options"])
+
+
+def _ancestor_ignore_rules(
+    path: Path, root_path: Path, options: ScanOptions | None
+) -> List[IgnoreRule]:
+    """Returns the ignore rules that the walk from the root passes to `path`."""
+    ignore_rules: List[IgnoreRule] = []
+    if options is None or path == root_path:
+        return ignore_rules
+    ancestor: Path = root_path
+    for name in path.relative_to(root_path).parts[:-1]:
+        ignore_rules = _read_ignore_file(ancestor, root_path, options, ignore_rules)
+        ancestor = ancestor / name
+    return _read_ignore_file(ancestor, root_path, options, ignore_rules)
+
+
+def _scan_directory_only(
+    src: Path, root_path: Path, metrics: ScanMetrics | None,
+    options: ScanOptions | None, depth: int, links: LinkTracker,
+    throttle: ReadThrottle | None
+) -> List[Dict[str, Any]]:
+    """Returns the metadata of a directory and of its non-directory children."""
+    inodes: Dict[Path, int] | None = {} if _reads_in_order(options) else None
+    children, child_types, _ = _list_children(
+        src, root_path, options, depth, _ancestor_ignore_rules(src, root_path, options), links,
+        inodes
+    )
+    dst: List[Dict[str, Any]] = [get_metadata_of_single_directory(
+        src, root_path=root_path, metrics=metrics, children=children,
+        child_types=child_types, fields=options.fields if options is not None else None
+    )]
+    if metrics is not None:
+        metrics.node_done("Directory")
+        metrics.count("readdirCalls")
+    leaves: Dict[Path, List[Dict[str, Any]]] = {
+        path_: _get_metadata_list(
+            path_, root_path=root_path, metrics=metrics, options=options,
+            depth=depth + 1, path_type=child_types[path_], links=links, throttle=throttle
+        )
+        for path_ in _sort_for_reading(
+            [p_ for p_ in children if child_types[p_] != "Directory"], options, inodes
+        )
+    }
+    for path_ in children:
+        dst.extend(leaves.get(path_, []))
+        if child_types[path_] == "Archive":
+            # rolled up as the subtrees, the members being in the same shard.
+            _update_statistical_info_of_directory(leaves[path_][0], leaves[path_])
+    if links.hardlinks == "once":
+        _discount_repeated_files(dst[0], dst[1:])
+    return dst
+
+
+def scan_shard(
+    src: Path | str, manifest: Dict[str, Any], shard: int,
+    include_root_path: bool = False, metrics: ScanMetrics | None = None
+) -> Dict[str, Any]:
+    """Scans a shard of a plan made by `plan_shards`.
+
+    `src` may be another mount of the planned directory, e.g., on another host,
+    provided it has the same name, which is that of the root of the `@id`s.
+
+    Args:
+        src (Path | str): The path to the planned directory.
+        manifest (Dict[str, Any]): The output of `plan_shards`.
+        shard (int): The index of the shard to scan.
+        include_root_path (bool, optional): See `get_metadata_of_files_in_list_format`.
+            Defaults to False.
+        metrics (ScanMetrics | None, optional): Collects counters and timings of the scan.
+            Defaults to None.
+
+    Returns:
+        Dict[str, Any]: A partial metadata in a list format, whose subtrees are rolled up.
+
+    Raises:
+        ValueError: If `shard` is not in the manifest, or `src` does not match it.
+        IndexError: If `shard` is out of range.
+    """
+    root_path: Path = Path(src)
+    if generate_id(root_path, root_path) != manifest["rootId"]:
+        raise ValueError(f"{src}: the name of the root does not match '{manifest['rootId']}'.")
+    if not 0 <= shard < len(manifest["shards"]):
+        raise IndexError(f"{shard}: the manifest has {len(manifest['shards'])} shards.")
+    options: ScanOptions | None = _options_of(manifest)
+    # the files with several links are identified within the shard only.
+    links: LinkTracker = _link_tracker(root_path, options)
+    # the limits of the reads apply to each shard.
+    throttle: ReadThrottle | None = options.read_throttle() if options is not None else None
+    nodes: List[Dict[str, Any]] = []
+    for rel_path in manifest["shards"][shard]["directories"]:
+        path: Path = root_path if rel_path == ROOT_REL_PATH else root_path / rel_path
+        depth: int = 0 if rel_path == ROOT_REL_PATH else len(Path(rel_path).parts)
+        nodes.extend(_scan_directory_only(
+            path, root_path, metrics, options, depth, links, throttle
+        ))
+    for rel_path in manifest["shards"][shard]["subtrees"]:
+        path = root_path / rel_path
+        subtree: List[Dict[str, Any]] = _get_metadata_list(
+            path, root_path=root_path, metrics=metrics, options=options,
+            depth=len(Path(rel_path).parts),
+            ignore_rules=_ancestor_ignore_rules(path, root_path, options),
+            path_type="Directory", links=links, throttle=throttle
+        )
+        _update_statistical_info_of_directory(subtree[0], subtree)
+        nodes.extend(subtree)
+    dst: Dict[str, Any] = {}
+    dst["root_path"] = f"{str(root_path.as_posix())}/" if include_root_path else "./"
+    dst[OUTPUT_ROOT_KEY] = nodes
+    dst["dateCreated"] = datetime.datetime.now().strftime(DATETIME_FMT)
+    return dst
+
+
+def _unit_id(manifest: Dict[str, Any], rel_path: str) -> str:
+    if rel_path == ROOT_REL_PATH:
+        return manifest["rootId"]
+    return f"{manifest['rootId']}{rel_path}/"
+
+
+def _restore_null_keys(node: Dict[str, Any]) -> Dict[str, Any]:
+    """Restores the `None` keys of the MIME type counters, which JSON turns into "null"."""
+    for key in ["numberOfFilesPerMIMEType", "numberOfAllFilesPerMIMEType"]:
+        if "null" in node.get(key, {}):
+            node[key] = {
+                None if mimetype == "null" else mimetype: count
+                for mimetype, count in node[key].items()
+            }
+    return node
+
+
+def merge_shards(manifest: Dict[str, Any], shard_paths: List[Path | str]) -> Dict[str, Any]:
+    """Merges the outputs of `scan_shard` into the output of a single scan.
+
+    The nodes are put back in the order of a single scan, and only the directories
+    above the subtrees are rolled up, as `update_statistical_info_to_metadata_list` does.
+
+    Args:
+        manifest (Dict[str, Any]): The output of `plan_shards`.
+        shard_paths (List[Path | str]): The paths to the outputs of the shards.
+
+    Returns:
+        Dict[str, Any]: The merged metadata in a list format.
+
+    Raises:
+        ValueError: If a unit of the manifest is missing from the outputs.
+    """
+    directory_ids: Dict[str, str] = {
+        _unit_id(manifest, rel_path): rel_path
+        for shard in manifest["shards"] for rel_path in shard["directories"]
+    }
+    subtree_ids: Dict[str, str] = {
+        _unit_id(manifest, rel_path): rel_path
+        for shard in manifest["shards"] for rel_path in shard["subtrees"]
+    }
+    blocks: Dict[str, List[Dict[str, Any]]] = {}
+    root_path: str | None = None
+    for path in shard_paths:
+        header: Dict[str, Any] = {}
+        block: List[Dict[str, Any]] = []
+        for node in iter_graph_nodes(path, header):
+            if node["@id"] in directory_ids or node["@id"] in subtree_ids:
+                block = blocks.setdefault(node["@id"], [])
+            block.append(node)
+        if root_path is None:
+            root_path = header.get("root_path")
+
+    missing: List[str] = sorted(
+        rel_path for node_id, rel_path in {**directory_ids, **subtree_ids}.items()
+        if node_id not in blocks
+    )
+    if missing:
+        raise ValueError(f"{missing}: missing from the outputs of the shards.")
+
+    nodes: List[Dict[str, Any]] = []
+    # the archives scanned as directories within the directory units, already rolled up.
+    archives: List[Dict[str, Any]] = []
+    pending: List[List[Dict[str, Any]] | str] = [manifest["rootId"]]
+    while pending:
+        item: List[Dict[str, Any]] | str = pending.pop()
+        if isinstance(item, list):
+            nodes.extend(item)
+            continue
+        if item in subtree_ids:
+            nodes.extend(blocks[item])
+            continue
+        if item not in blocks:
+            raise ValueError(f"{item}: not in the plan; the tree changed after planning.")
+        directory: Dict[str, Any] = blocks[item][0]
+        leaves: Dict[str, List[Dict[str, Any]]] = _group_by_child(item, blocks[item][1:])
+        archives.extend(
+            group[0] for group in leaves.values() if group[0]["type"] == "Directory"
+        )
+        nodes.append(directory)
+        pending.extend(reversed([
+            leaves[part["@id"]] if part["@id"] in leaves else part["@id"]
+            for part in directory.get("hasPart", [])
+        ]))
+
+    _update_statistical_info_of_directory(
+        blocks[manifest["rootId"]][0],
+        [
+            _restore_null_keys(blocks[node_id][0])
+            for node_id in list(directory_ids) + list(subtree_ids)
+        ] + [_restore_null_keys(node) for node in archives]
+    )
+    dst: Dict[str, Any] = {}
+    dst["root_path"] = root_path if root_path is not None else "./"
+    dst[OUTPUT_ROOT_KEY] = nodes
+    dst["dateCreated"] = datetime.datetime.now().strftime(DATETIME_FMT)
+    return dst
@@ -0,0 +1,292 @@
+"""snapshot
+
+binary snapshot of a metadata in a list format with memory-mapped random access
+
+Layout (little endian), each section following the previous one:
+    header:          `HEADER`
+    node records:    `RECORD` x number of nodes, in the order of `@graph`
+    children:        uint32 node indices x number of links
+    @id hash index:  uint32 (node index + 1, 0 if empty) x number of slots (a power of 2)
+    string offsets:  uint64 x (number of strings + 1)
+    strings:         UTF-8
+Each node has two strings: its `@id` and its metadata as compact JSON, in which
+`hasPart` is null and restored from the children section.
+"""
+
+import array
+import hashlib
+import json
+import mmap
+import struct
+import sys
+from typing import Dict, Any, List, Iterator, Tuple
+
+from directory_structure_py.constants import ENSURE_ASCII, OUTPUT_ROOT_KEY
+from directory_structure_py.conversion import list2tree
+from directory_structure_py.index import STATISTICS_KEYS
+
+SNAPSHOT_MAGIC: bytes = b"DSPYSNAP"
+SNAPSHOT_VERSION: int = 1
+SNAPSHOT_EXTENSION: str = ".snap"
+# magic, version, root index (-1 if none), numbers of nodes, links, hash slots and strings,
+# and the offsets of root_path and dateCreated in the strings
+HEADER = struct.Struct("<8sIiQQQQII")
+# @id, metadata, parent (-1 for the root), first child, number of children, type,
+# contentSize (contentSizeOfAllFiles for directories), numberOfAllFiles, numberOfAllContents
+RECORD = struct.Struct("<IIiIIBqqq")
+NODE_TYPES: List[str] = ["File", "Directory", "Unknown"]
+
+
+def _hash_id(node_id: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(node_id, digest_size=8).digest(), "little")
+
+
+def _pack_array(typecode: str, values: List[int]) -> bytes:
+    """Packs integers in little endian without unpacking them as arguments."""
+    packed: array.array = array.array(typecode, values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _number_of_slots(n_nodes: int) -> int:
+    """Returns the smallest power of 2 keeping the load factor of the hash index under 0.5."""
+    n_slots: int = 1
+    while n_slots < 2 * n_nodes:
+        n_slots *= 2
+    return n_slots
+
+
+def write_snapshot(data: Dict[str, Any], dst: str) -> None:
+    """Writes a metadata in a list format to a binary snapshot.
+
+    Args:
+        data (Dict[str, Any]): A metadata in a list format.
+        dst (str): The path to the snapshot file.
+            The file will be overwritten if it already exists.
+    """
+    nodes: List[Dict[str, Any]] = data.get(OUTPUT_ROOT_KEY, [])
+    indices: Dict[str, int] = {node["@id"]: ii for ii, node in enumerate(nodes)}
+    strings: List[bytes] = [
+        str(data.get("root_path", "./")).encode("utf-8"),
+        str(data.get("dateCreated", "")).encode("utf-8"),
+    ]
+    records: List[bytes] = []
+    children: List[int] = []
+    root: int = -1
+    for ii, node in enumerate(nodes):
+        parent_id: str | None = node.get("parent", {}).get("@id")
+        if parent_id is None and root < 0:
+            root = ii
+        child_indices: List[int] = [
+            indices[part["@id"]] for part in node.get("hasPart", []) or []
+            if part["@id"] in indices
+        ]
+        metadata: Dict[str, Any] = dict(node)
+        if "hasPart" in metadata:
+            metadata["hasPart"] = None
+        strings.append(node["@id"].encode("utf-8"))
+        strings.append(json.dumps(
+            metadata, separators=(",", ":"), ensure_ascii=ENSURE_ASCII
+        ).encode("utf-8"))
+        is_directory: bool = node.get("type") == "Directory"
+        records.append(RECORD.pack(
+            len(strings) - 2, len(strings) - 1,
+            indices.get(parent_id, -1) if parent_id is not None else -1,
+            len(children), len(child_indices),
+            NODE_TYPES.index(node.get("type")) if node.get("type") in NODE_TYPES else 2,
+            node.get("contentSizeOfAllFiles" if is_directory else "contentSize", -1),
+            node.get("numberOfAllFiles", 1 if node.get("type") == "File" else 0),
+            node.get("numberOfAllContents", 0),
+        ))
+        children.extend(child_indices)
+
+    n_slots: int = _number_of_slots(len(nodes))
+    slots: List[int] = [0] * n_slots
+    for ii, node in enumerate(nodes):
+        slot: int = _hash_id(node["@id"].encode("utf-8")) & (n_slots - 1)
+        while slots[slot]:
+            slot = (slot + 1) & (n_slots - 1)
+        slots[slot] = ii + 1
+
+    offsets: List[int] = [0]
+    for string in strings:
+        offsets.append(offsets[-1] + len(string))
+    with open(dst, "wb") as ff:
+        ff.write(HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_VERSION, root,
+            len(nodes), len(children), n_slots, len(strings), 0, 1
+        ))
+        ff.write(b"".join(records))
+        ff.write(_pack_array("I", children))
+        ff.write(_pack_array("I", slots))
+        ff.write(_pack_array("Q", offsets))
+        for string in strings:
+            ff.write(string)
+
+
+class SnapshotReader:
+    """
+    Random access to a binary snapshot through a memory map.
+
+    Opening a snapshot only maps the file: a node is decoded when it is looked up,
+    its `@id` is found through the hash index, and its children through the
+    children section, so that the memory use does not depend on the size of
+    the snapshot. The interface follows `MetadataIndex`.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): The path to the snapshot file.
+
+        Raises:
+            ValueError: If the file is not a snapshot of a supported version.
+        """
+        self.path: str = path
+        with open(path, "rb") as ff:
+            self._mmap: mmap.mmap = mmap.mmap(ff.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            magic, version, self._root, self._n_nodes, n_links,
+            self._n_slots, n_strings, root_path, date_created
+        ) = HEADER.unpack_from(self._mmap, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path}: not a snapshot of version {SNAPSHOT_VERSION}.")
+        self._records: int = HEADER.size
+        self._children: int = self._records + self._n_nodes * RECORD.size
+        self._slots: int = self._children + n_links * 4
+        self._offsets: int = self._slots + self._n_slots * 4
+        self._strings: int = self._offsets + (n_strings + 1) * 8
+        self.root_path: str = self._string(root_path)
+        self.date_created: str = self._string(date_created)
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmaps the file."""
+        self._mmap.close()
+
+    def __len__(self) -> int:
+        return self._n_nodes
+
+    def __contains__(self, node_id: str) -> bool:
+        return self._find(node_id) >= 0
+
+    def _string_bytes(self, index: int) -> memoryview:
+        start, end = struct.unpack_from("<QQ", self._mmap, self._offsets + index * 8)
+        return memoryview(self._mmap)[self._strings + start:self._strings + end]
+
+    def _string(self, index: int) -> str:
+        with self._string_bytes(index) as view:
+            return str(view, "utf-8")
+
+    def _record(self, index: int) -> Tuple:
+        return RECORD.unpack_from(self._mmap, self._records + index * RECORD.size)
+
+    def _child_indices(self, record: Tuple) -> Tuple[int, ...]:
+        return struct.unpack_from(
+            f"<{record[4]}I", self._mmap, self._children + record[3] * 4
+        )
+
+    def _find(self, node_id: str) -> int:
+        """Returns the index of a node, or -1 if it is not in the snapshot."""
+        if not self._n_nodes:
+            return -1
+        encoded: bytes = node_id.encode("utf-8")
+        slot: int = _hash_id(encoded) & (self._n_slots - 1)
+        while True:
+            value: int = struct.unpack_from("<I", self._mmap, self._slots + slot * 4)[0]
+            if value == 0:
+                return -1
+            with self._string_bytes(self._record(value - 1)[0]) as view:
+                if view == encoded:
+                    return value - 1
+            slot = (slot + 1) & (self._n_slots - 1)
+
+    def _node(self, index: int) -> Dict[str, Any]:
+        record: Tuple = self._record(index)
+        with self._string_bytes(record[1]) as view:
+            node: Dict[str, Any] = json.loads(view.tobytes())
+        if "hasPart" in node:
+            node["hasPart"] = [
+                {"@id": self._string(self._record(child)[0])}
+                for child in self._child_indices(record)
+            ]
+        return node
+
+    def _index(self, node_id: str) -> int:
+        index: int = self._find(node_id)
+        if index < 0:
+            raise KeyError(node_id)
+        return index
+
+    @property
+    def root_id(self) -> str:
+        """The `@id` of the root node ("" if none)."""
+        return self._string(self._record(self._root)[0]) if self._root >= 0 else ""
+
+    def get(self, node_id: str) -> Dict[str, Any] | None:
+        """Returns the metadata of a node, or None if it is not in the snapshot."""
+        index: int = self._find(node_id)
+        return self._node(index) if index >= 0 else None
+
+    def children(self, node_id: str) -> List[Dict[str, Any]]:
+        """Returns the metadata of the direct children of a node.
+
+        Raises:
+            KeyError: If `node_id` is not in the snapshot.
+        """
+        record: Tuple = self._record(self._index(node_id))
+        return [self._node(child) for child in self._child_indices(record)]
+
+    def iter_subtree(self, node_id: str) -> Iterator[Dict[str, Any]]:
+        """Yields the metadata of a node and all its descendants in depth-first order.
+
+        Raises:
+            KeyError: If `node_id` is not in the snapshot.
+        """
+        stack: List[int] = [self._index(node_id)]
+        while stack:
+            index: int = stack.pop()
+            yield self._node(index)
+            stack.extend(reversed(self._child_indices(self._record(index))))
+
+    def subtree_stats(self, node_id: str, full: bool = True) -> Dict[str, Any]:
+        """Returns the statistical information of a node (see `MetadataIndex.statistics`).
+
+        Args:
+            node_id (str): The `@id` of the node.
+            full (bool, optional): If False, only the total size and the numbers of files
+                and contents of the subtree are returned, read from the fixed-width record
+                without decoding the metadata. Defaults to True.
+
+        Raises:
+            KeyError: If `node_id` is not in the snapshot.
+        """
+        index: int = self._index(node_id)
+        if not full:
+            record: Tuple = self._record(index)
+            return {
+                "contentSizeOfAllFiles": record[6],
+                "numberOfAllFiles": record[7],
+                "numberOfAllContents": record[8],
+            }
+        node: Dict[str, Any] = self._node(index)
+        return {key: node[key] for key in STATISTICS_KEYS if key in node}
+
+    def to_list(self) -> Dict[str, Any]:
+        """Returns the whole snapshot as a metadata in a list format."""
+        dst: Dict[str, Any] = {}
+        dst["root_path"] = self.root_path
+        dst[OUTPUT_ROOT_KEY] = [self._node(ii) for ii in range(self._n_nodes)]
+        dst["dateCreated"] = self.date_created
+        return dst
+
+    def to_tree(self, structure_only: bool = False) -> Dict[str, Any]:
+        """Returns the whole snapshot as a metadata in a tree format (see `list2tree`)."""
+        return list2tree(self.to_list(), structure_only)
@@ -0,0 +1,147 @@
+"""throttle
+
+token-bucket limits of the bandwidth and the number of files opened per second
+by the hashing, to scan production storage without hurting its other users
+"""
+
+import threading
+import time
+from typing import List
+
+# the bucket holds up to this many seconds of tokens, i.e., the burst after an idle time.
+BURST_SECONDS: float = 1.0
+# the adaptive mode compares a fast and a slow moving average of the read latency.
+FAST_LATENCY_WEIGHT: float = 0.2
+SLOW_LATENCY_WEIGHT: float = 0.01
+# the limits are halved when the fast average exceeds the slow one by this factor,
+# and recover by this fraction of the configured limits per read otherwise.
+LATENCY_BACKOFF_RATIO: float = 2.0
+RECOVERY_STEP: float = 0.05
+MIN_RATE_FACTOR: float = 1 / 64
+# the latency of a read is taken per read of this size (the chunks of the hashing):
+# a shorter read, e.g., the end of a file, costs about the access time of a whole one,
+# and a longer one is scaled down to it.
+LATENCY_READ_SIZE: int = 1024 * 1024
+
+
+class TokenBucket:
+    """
+    A token bucket refilled at a constant rate.
+
+    A request larger than the tokens available is granted at once and leaves a debt,
+    which delays the next requests, so that requests of any size keep the average
+    rate. The bucket may be shared by several threads.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        """
+        Args:
+            rate (float): The tokens added per second.
+            capacity (float | None, optional): The maximum number of tokens.
+                Defaults to `rate` * `BURST_SECONDS`.
+        """
+        self.rate: float = rate
+        self.capacity: float = capacity if capacity is not None else rate * BURST_SECONDS
+        self._tokens: float = self.capacity
+        self._last: float = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float) -> float:
+        """Takes `amount` tokens, sleeping while the bucket is in debt.
+
+        Returns:
+            float: The time slept in seconds.
+        """
+        with self._lock:
+            now: float = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= amount
+            wait: float = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class ReadThrottle:
+    """
+    Limits of the bytes read and the files opened per second, shared by all the
+    reads of a scan.
+
+    In the adaptive mode, the latency of each read (per `LATENCY_READ_SIZE` bytes, so that
+    the short reads are not taken as slow ones) is tracked with a fast and a slow moving
+    average: when the fast one rises `LATENCY_BACKOFF_RATIO` times above the slow one,
+    i.e., the storage is getting busy, the limits are halved at each read, down to
+    `MIN_RATE_FACTOR` of the configured ones, and they recover step by step while
+    the latency stays normal (additive increase, multiplicative decrease). A lasting
+    change of the latency ends up in the slow average and no longer holds the limits down.
+    """
+
+    def __init__(
+        self, max_read_mbps: float = 0.0, max_iops: float = 0.0, adaptive: bool = False
+    ):
+        """
+        Args:
+            max_read_mbps (float, optional): The maximum bytes read per second,
+                in megabytes (10^6 bytes). No limit if 0. Defaults to 0.0.
+            max_iops (float, optional): The maximum files opened per second.
+                No limit if 0. Defaults to 0.0.
+            adaptive (bool, optional): Whether to lower the limits while the read
+                latency rises. Defaults to False.
+
+        Raises:
+            ValueError: If a limit is negative, or `adaptive` is set without any limit.
+        """
+        if max_read_mbps < 0 or max_iops < 0:
+            raise ValueError("'max_read_mbps' and 'max_iops' must not be negative.")
+        if adaptive and not (max_read_mbps or max_iops):
+            raise ValueError("the adaptive mode needs 'max_read_mbps' or 'max_iops'.")
+        self.adaptive: bool = adaptive
+        self._bytes: TokenBucket | None = (
+            TokenBucket(max_read_mbps * 1e6) if max_read_mbps > 0 else None
+        )
+        self._opens: TokenBucket | None = TokenBucket(max_iops) if max_iops > 0 else None
+        self._max_rates: List[float] = [
+            bucket.rate for bucket in [self._bytes, self._opens] if bucket is not None
+        ]
+        self.rate_factor: float = 1.0
+        self.waited: float = 0.0
+        self._fast_latency: float = 0.0
+        self._slow_latency: float = 0.0
+        self._lock = threading.Lock()
+
+    def open_file(self) -> None:
+        """Waits until a file may be opened."""
+        if self._opens is not None:
+            self._wait(self._opens.acquire(1))
+
+    def read(self, size: int, elapsed: float) -> None:
+        """Accounts for a read of `size` bytes that took `elapsed` seconds,
+        waiting until the next read may start."""
+        if self.adaptive and size > 0:
+            self._observe(elapsed * LATENCY_READ_SIZE / max(size, LATENCY_READ_SIZE))
+        if self._bytes is not None:
+            self._wait(self._bytes.acquire(size))
+
+    def _wait(self, seconds: float) -> None:
+        with self._lock:
+            self.waited += seconds
+
+    def _observe(self, latency: float) -> None:
+        with self._lock:
+            if not self._slow_latency:
+                self._fast_latency = self._slow_latency = latency
+                return
+            self._fast_latency += FAST_LATENCY_WEIGHT * (latency - self._fast_latency)
+            self._slow_latency += SLOW_LATENCY_WEIGHT * (latency - self._slow_latency)
+            if self._fast_latency > LATENCY_BACKOFF_RATIO * self._slow_latency:
+                factor: float = max(MIN_RATE_FACTOR, self.rate_factor / 2)
+            else:
+                factor = min(1.0, self.rate_factor + RECOVERY_STEP)
+            if factor != self.rate_factor:
+                self.rate_factor = factor
+                for bucket, max_rate in zip(
+                    [bucket for bucket in [self._bytes, self._opens] if bucket is not None],
+                    self._max_rates
+                ):
+                    bucket.rate = max_rate * factor
@@ -0,0 +1,435 @@
+"""watcher
+
+live updates of a metadata index from filesystem events
+"""
+
+from collections import Counter
+import mimetypes
+from logging import getLogger, Logger
+import os
+from pathlib import Path
+import threading
+import traceback
+from typing import Dict, Any, List, Tuple, Callable
+
+from directory_structure_py.get_metadata import (
+    format_timestamp,
+    generate_id,
+    get_metadata_of_single_file,
+    _get_metadata_list,
+    _update_statistical_info_of_directory
+)
+from directory_structure_py.index import MetadataIndex
+
+DEFAULT_POLLING_INTERVAL: float = 1.0
+
+logger: Logger = getLogger("main")
+
+
+def _add_counts(src: Dict, other: Dict, sign: int) -> Dict:
+    """Adds (sign=1) or subtracts (sign=-1) counts, dropping non-positive ones."""
+    if sign > 0:
+        return dict(Counter(src) + Counter(other))
+    return dict(Counter(src) - Counter(other))
+
+
+def _contribution(node: Dict[str, Any]) -> Dict[str, Any]:
+    """Returns what a node contributes to the `*OfAllFiles` fields of its ancestors."""
+    if node.get("type") == "Directory":
+        return {
+            "contentSizeOfAllFiles": node.get("contentSizeOfAllFiles", 0),
+            "numberOfAllContents": node.get("numberOfAllContents", 0) + 1,
+            "numberOfAllFiles": node.get("numberOfAllFiles", 0),
+            "numberOfAllFilesPerExtension": node.get("numberOfAllFilesPerExtension", {}),
+            "numberOfAllFilesPerMIMEType": node.get("numberOfAllFilesPerMIMEType", {}),
+        }
+    if node.get("type") == "File":
+        return {
+            "contentSizeOfAllFiles": max(node.get("contentSize", 0), 0),
+            "numberOfAllContents": 1,
+            "numberOfAllFiles": 1,
+            "numberOfAllFilesPerExtension": {node.get("extension", ""): 1},
+            "numberOfAllFilesPerMIMEType": {node.get("mimetype"): 1},
+        }
+    return {"numberOfAllContents": 1}
+
+
+def _renamed_file_node(
+    node: Dict[str, Any], path: Path, root_path: Path
+) -> Dict[str, Any]:
+    """Returns the metadata of a moved file, reusing its size, hash and dates.
+    Only the fields depending on the path are regenerated."""
+    dst: Dict[str, Any] = dict(node)
+    dst["@id"] = generate_id(path, root_path)
+    dst["parent"] = {"@id": generate_id(path.parent, root_path)}
+    dst["basename"] = path.name
+    dst["name"] = os.path.splitext(path.name)[0]
+    dst["extension"] = os.path.splitext(path.name)[1]
+    dst["mimetype"] = mimetypes.guess_type(str(path))[0]
+    return dst
+
+
+class IndexUpdater:
+    """
+    Applies filesystem events to a `MetadataIndex` without rescanning.
+
+    Created/modified/deleted/moved paths update the affected `@graph` nodes,
+    and the statistical information of directories (`contentSizeOfAllFiles`,
+    `numberOfAllFiles`, the per-extension counts and so on) is adjusted
+    along the ancestor chain, so an update costs O(depth) rather than O(tree).
+    Only a created directory is scanned, and only its own subtree.
+    """
+
+    def __init__(self, index: MetadataIndex, src: Path | str):
+        """
+        Args:
+            index (MetadataIndex): The index to update.
+            src (Path | str): The source path from which `index` was generated.
+        """
+        self.index: MetadataIndex = index
+        self.src: Path = Path(os.path.abspath(src))
+
+    def _find_id(self, path: Path) -> str:
+        """Returns the `@id` of an indexed path, or "" if it is not indexed.
+        The path may not exist anymore, so both a file and a directory `@id` are tried."""
+        if path != self.src and self.src not in path.parents:
+            return ""
+        if path == self.src:
+            file_id: str = self.src.name
+        else:
+            file_id = f"{self.src.name}/{path.relative_to(self.src).as_posix()}"
+        for node_id in [file_id, f"{file_id}/"]:
+            if node_id in self.index:
+                return node_id
+        return ""
+
+    def _update_parent_links(
+        self, parent: Dict[str, Any], node: Dict[str, Any], sign: int,
+        link: bool = True
+    ) -> None:
+        """Updates the fields of a directory about its direct children.
+        `hasPart` and `numberOfContents` are left untouched if `link` is False."""
+        if link and sign > 0:
+            parent.setdefault("hasPart", []).append({"@id": node["@id"]})
+            parent["numberOfContents"] = parent.get("numberOfContents", 0) + 1
+        elif link:
+            parent["hasPart"] = [
+                p_ for p_ in parent.get("hasPart", []) if p_["@id"] != node["@id"]
+            ]
+            parent["numberOfContents"] = parent.get("numberOfContents", 0) - 1
+        if node.get("type") != "File":
+            return
+        parent["contentSize"] = parent.get("contentSize", 0) + sign * max(node.get("contentSize", 0), 0)
+        parent["numberOfFiles"] = parent.get("numberOfFiles", 0) + sign
+        parent["numberOfFilesPerExtension"] = _add_counts(
+            parent.get("numberOfFilesPerExtension", {}), {node.get("extension", ""): 1}, sign
+        )
+        parent["extension"] = list(parent["numberOfFilesPerExtension"].keys())
+        parent["numberOfFilesPerMIMEType"] = _add_counts(
+            parent.get("numberOfFilesPerMIMEType", {}), {node.get("mimetype"): 1}, sign
+        )
+        parent["mimetype"] = list(parent["numberOfFilesPerMIMEType"].keys())
+
+    def _update_ancestors(
+        self, parent_id: str, contribution: Dict[str, Any], sign: int
+    ) -> None:
+        """Adds (sign=1) or subtracts (sign=-1) a contribution up the ancestor chain."""
+        while parent_id:
+            node: Dict[str, Any] | None = self.index.get(parent_id)
+            if node is None:
+                break
+            for key in ["contentSizeOfAllFiles", "numberOfAllContents", "numberOfAllFiles"]:
+                node[key] = node.get(key, 0) + sign * contribution.get(key, 0)
+            node["numberOfAllFilesPerExtension"] = _add_counts(
+                node.get("numberOfAllFilesPerExtension", {}),
+                contribution.get("numberOfAllFilesPerExtension", {}), sign
+            )
+            node["extensionsOfAllFiles"] = list(node["numberOfAllFilesPerExtension"].keys())
+            node["numberOfAllFilesPerMIMEType"] = _add_counts(
+                node.get("numberOfAllFilesPerMIMEType", {}),
+                contribution.get("numberOfAllFilesPerMIMEType", {}), sign
+            )
+            node["mimetypesOfAllFiles"] = list(node["numberOfAllFilesPerMIMEType"].keys())
+            parent_id = node.get("parent", {}).get("@id", "")
+
+    def _touch(self, node_id: str, path: Path) -> None:
+        """Updates `dateModified` of a directory node from the filesystem."""
+        node: Dict[str, Any] | None = self.index.get(node_id)
+        if node is None or not path.is_dir():
+            return
+        node["dateModified"] = format_timestamp(path.stat().st_mtime)
+
+    def _attach(self, nodes: List[Dict[str, Any]], path: Path) -> None:
+        """Adds a subtree (its top node first) under its parent directory."""
+        top: Dict[str, Any] = nodes[0]
+        parent_id: str = top.get("parent", {}).get("@id", "")
+        parent: Dict[str, Any] | None = self.index.get(parent_id)
+        if parent is None:
+            return
+        for node in nodes:
+            self.index.put(node)
+        self._update_parent_links(parent, top, 1)
+        self._update_ancestors(parent_id, _contribution(top), 1)
+        self._touch(parent_id, path.parent)
+
+    def _detach(self, node_id: str, path: Path) -> List[Dict[str, Any]]:
+        """Removes a subtree from its parent directory and returns its nodes."""
+        nodes: List[Dict[str, Any]] = self.index.subtree(node_id)
+        top: Dict[str, Any] = nodes[0]
+        parent_id: str = top.get("parent", {}).get("@id", "")
+        parent: Dict[str, Any] | None = self.index.get(parent_id)
+        if parent is not None:
+            self._update_ancestors(parent_id, _contribution(top), -1)
+            self._update_parent_links(parent, top, -1)
+            self._touch(parent_id, path.parent)
+        for node in nodes:
+            self.index.pop(node["@id"])
+        return nodes
+
+    def on_created(self, path: Path | str) -> None:
+        """Adds a created file or directory (with its contents) to the index."""
+        path = Path(os.path.abspath(path))
+        with self.index.lock:
+            if self._find_id(path):
+                self.on_modified(path)
+                return
+            if path == self.src or not path.exists() or not self._find_id(path.parent):
+                return
+            nodes: List[Dict[str, Any]] = _get_metadata_list(path, root_path=self.src)
+            if nodes[0].get("type") == "Directory":
+                _update_statistical_info_of_directory(nodes[0], nodes)
+            self._attach(nodes, path)
+
+    def on_modified(self, path: Path | str) -> None:
+        """Updates the metadata of a modified file."""
+        path = Path(os.path.abspath(path))
+        with self.index.lock:
+            node_id: str = self._find_id(path)
+            if not node_id:
+                self.on_created(path)
+                return
+            node: Dict[str, Any] = self.index.get(node_id)
+            if node.get("type") == "Directory":
+                self._touch(node_id, path)
+                return
+            if not path.is_file():
+                return
+            # replace the node in place to keep its position in `hasPart`.
+            new_node: Dict[str, Any] = get_metadata_of_single_file(path, root_path=self.src)
+            parent_id: str = node.get("parent", {}).get("@id", "")
+            parent: Dict[str, Any] | None = self.index.get(parent_id)
+            if parent is not None:
+                self._update_ancestors(parent_id, _contribution(node), -1)
+                self._update_parent_links(parent, node, -1, link=False)
+                self._update_parent_links(parent, new_node, 1, link=False)
+                self._update_ancestors(parent_id, _contribution(new_node), 1)
+            self.index.put(new_node)
+
+    def on_deleted(self, path: Path | str) -> None:
+        """Removes a deleted file or directory (with its contents) from the index."""
+        path = Path(os.path.abspath(path))
+        with self.index.lock:
+            node_id: str = self._find_id(path)
+            if not node_id or node_id == self.index.root_id:
+                return
+            self._detach(node_id, path)
+
+    def on_moved(self, src_path: Path | str, dest_path: Path | str) -> None:
+        """Moves a file or directory (with its contents) in the index.
+        The metadata of the moved nodes is reused instead of rescanning them."""
+        src_path = Path(os.path.abspath(src_path))
+        dest_path = Path(os.path.abspath(dest_path))
+        with self.index.lock:
+            node_id: str = self._find_id(src_path)
+            if not node_id:
+                self.on_created(dest_path)
+                return
+            if not self._find_id(dest_path.parent) or not dest_path.exists():
+                self.on_deleted(src_path)
+                return
+            if self._find_id(dest_path):
+                self.on_deleted(dest_path)
+            nodes: List[Dict[str, Any]] = self._detach(node_id, src_path)
+            new_id: str = generate_id(dest_path, self.src)
+            top: Dict[str, Any] = nodes[0]
+            if top.get("type") == "File":
+                self._attach([_renamed_file_node(top, dest_path, self.src)], dest_path)
+                return
+            for node in nodes:
+                node["@id"] = new_id + node["@id"][len(node_id):]
+                parent_id: str = node.get("parent", {}).get("@id", "")
+                if node is top:
+                    node["parent"] = {"@id": generate_id(dest_path.parent, self.src)}
+                    node["basename"] = dest_path.name
+                    node["name"] = dest_path.name
+                elif parent_id.startswith(node_id):
+                    node["parent"] = {"@id": new_id + parent_id[len(node_id):]}
+                if "hasPart" in node:
+                    node["hasPart"] = [
+                        {"@id": new_id + p_["@id"][len(node_id):]} for p_ in node["hasPart"]
+                    ]
+            self._attach(nodes, dest_path)
+
+
+class PollingObserver:
+    """
+    Stdlib-only event source comparing snapshots of a directory tree.
+
+    Each `poll` walks the tree with `os.scandir` (no file content is read)
+    and reports the differences from the previous snapshot to an
+    `IndexUpdater`. A deletion and a creation of the same inode are
+    reported as a move.
+    """
+
+    def __init__(self, updater: IndexUpdater, interval: float = DEFAULT_POLLING_INTERVAL):
+        self.updater: IndexUpdater = updater
+        self.interval: float = interval
+        self._snapshot: Dict[str, Tuple[bool, int, int, int]] = self._take_snapshot()
+        self._stop_event: threading.Event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _take_snapshot(self) -> Dict[str, Tuple[bool, int, int, int]]:
+        """Returns a dictionary mapping paths to (is_dir, size, mtime_ns, inode)."""
+        dst: Dict[str, Tuple[bool, int, int, int]] = {}
+        stack: List[str] = [str(self.updater.src)]
+        while stack:
+            try:
+                entries = list(os.scandir(stack.pop()))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    stat = entry.stat()
+                    is_dir: bool = entry.is_dir()
+                except OSError:
+                    continue
+                dst[entry.path] = (is_dir, stat.st_size, stat.st_mtime_ns, stat.st_ino)
+                if is_dir:
+                    stack.append(entry.path)
+        return dst
+
+    def poll(self) -> None:
+        """Takes a new snapshot and applies the differences to the index."""
+        old = self._snapshot
+        new = self._take_snapshot()
+        self._snapshot = new
+        deleted: List[str] = sorted(p_ for p_ in old if p_ not in new)
+        created: List[str] = sorted(p_ for p_ in new if p_ not in old)
+        # keep the top-most paths only; their contents follow them.
+        deleted = _top_most(deleted)
+        created = _top_most(created)
+        created_by_inode: Dict[int, str] = {new[p_][3]: p_ for p_ in created}
+        for path in deleted:
+            dest: str | None = created_by_inode.pop(old[path][3], None)
+            if dest is not None and old[path][0] == new[dest][0]:
+                self.updater.on_moved(path, dest)
+                created.remove(dest)
+            else:
+                self.updater.on_deleted(path)
+        for path in created:
+            self.updater.on_created(path)
+        for path, value in new.items():
+            if path in old and not value[0] and value[1:3] != old[path][1:3]:
+                self.updater.on_modified(path)
+
+    def _loop(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                logger.error(traceback.format_exc())
+
+    def start(self) -> None:
+        """Starts polling on a background thread."""
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="PollingObserver", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops polling."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def _top_most(paths: List[str]) -> List[str]:
+    """Drops the paths below another path of a sorted list."""
+    dst: List[str] = []
+    for path in paths:
+        if dst and path.startswith(dst[-1] + os.sep):
+            continue
+        dst.append(path)
+    return dst
+
+
+def _create_watchdog_observer(updater: IndexUpdater):
+    """Returns a `watchdog` observer forwarding events to an `IndexUpdater`.
+
+    Raises:
+        ImportError: If `watchdog` is not installed.
+    """
+    from watchdog.events import FileSystemEventHandler  # pylint: disable=import-outside-toplevel
+    from watchdog.observers import Observer  # pylint: disable=import-outside-toplevel
+
+    def _safe(func: Callable, *args) -> None:
+        try:
+            func(*args)
+        except Exception:
+            logger.error(traceback.format_exc())
+
+    class _Handler(FileSystemEventHandler):
+        def on_created(self, event):
+            _safe(updater.on_created, event.src_path)
+
+        def on_modified(self, event):
+            _safe(updater.on_modified, event.src_path)
+
+        def on_deleted(self, event):
+            _safe(updater.on_deleted, event.src_path)
+
+        def on_moved(self, event):
+            _safe(updater.on_moved, event.src_path, event.dest_path)
+
+    observer = Observer()
+    observer.schedule(_Handler(), str(updater.src), recursive=True)
+    return observer
+
+
+def watch(
+    index: MetadataIndex, src: Path | str,
+    backend: str = "auto",
+    interval: float = DEFAULT_POLLING_INTERVAL
+):
+    """Starts applying the filesystem events under a source path to its index.
+
+    Args:
+        index (MetadataIndex): The index generated from `src`.
+        src (Path | str): The source path to watch.
+        backend (str, optional): "watchdog" (inotify on Linux and the native APIs
+            elsewhere), "polling" (stdlib only) or "auto", which uses `watchdog`
+            if it is installed. Defaults to "auto".
+        interval (float, optional): The polling interval in seconds of
+            the "polling" backend. Defaults to `DEFAULT_POLLING_INTERVAL`.
+
+    Returns:
+        The started observer. Call `stop` to stop watching.
+
+    Raises:
+        ValueError: If `backend` is not supported.
+        ImportError: If `backend` is "watchdog" and `watchdog` is not installed.
+    """
+    if backend not in ["auto", "watchdog", "polling"]:
+        raise ValueError(f"{backend}: 'backend' must be 'auto', 'watchdog' or 'polling'.")
+    updater = IndexUpdater(index, src)
+    observer = None
+    if backend in ["auto", "watchdog"]:
+        try:
+            observer = _create_watchdog_observer(updater)
+        except ImportError:
+            if backend == "watchdog":
+                raise
+    if observer is None:
+        observer = PollingObserver(updater, interval)
+    observer.start()
+    return observer
@@ -0,0 +1,155 @@
+"""test_archives.py
+
+test functions for archives.py
+"""
+
+import hashlib
+import json
+from pathlib import Path
+import tarfile
+from typing import Dict, List
+import zipfile
+import pytest
+from directory_structure_py import get_metadata
+from directory_structure_py.archives import archive_format, iter_archive_members
+from directory_structure_py.checkpoint import ScanCheckpoint
+from directory_structure_py.get_metadata import (
+    get_metadata_of_files_in_list_format,
+    update_statistical_info_to_metadata_list
+)
+from directory_structure_py.scan_options import ScanOptions
+
+MEMBERS: Dict[str, bytes] = {
+    "docs/index.md": b"# index\n",
+    "docs/img/logo.png": b"\x89PNG" * 100,
+    "data.csv": b"a,b\n1,2\n",
+}
+
+
+def _make_tree(src: Path) -> Path:
+    (src / "sub").mkdir(parents=True)
+    (src / "top.txt").write_bytes(b"top")
+    with zipfile.ZipFile(src / "sub" / "bundle.zip", "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in MEMBERS.items():
+            archive.writestr(name, content)
+    with tarfile.open(src / "bundle.tar.gz", "w:gz") as archive:
+        for name, content in MEMBERS.items():
+            (src / "member").write_bytes(content)
+            archive.add(src / "member", arcname=name)
+    (src / "member").unlink()
+    (src / "broken.tar").write_bytes(b"not a tar archive" * 64)
+    return src
+
+
+def _nodes(data: Dict) -> Dict[str, Dict]:
+    return {node["@id"]: node for node in data["@graph"]}
+
+
+def test_iter_archive_members(tmp_path: Path):
+    """test function for iter_archive_members"""
+    src: Path = _make_tree(tmp_path / "root")
+    assert archive_format("Bundle.TAR.GZ") == "tar"
+    assert archive_format("bundle.zip") == "zip"
+    assert archive_format("bundle.gz") is None
+    for path, format_ in [(src / "sub" / "bundle.zip", "zip"), (src / "bundle.tar.gz", "tar")]:
+        contents: Dict[str, bytes] = {}
+        for member, stream in iter_archive_members(path, format_):
+            if member.type == "File":
+                contents["/".join(member.parts)] = stream.read()
+        assert contents == MEMBERS
+        assert all(
+            stream is None for _, stream in iter_archive_members(path, format_, False)
+        )
+    with pytest.raises(ValueError):
+        list(iter_archive_members(src / "broken.tar", "tar"))
+
+
+def test_get_metadata_of_files_in_list_format_w_archives(tmp_path: Path):
+    """test function for get_metadata_of_files_in_list_format with archives"""
+    src: Path = _make_tree(tmp_path / "root")
+    dst: Dict = update_statistical_info_to_metadata_list(get_metadata_of_files_in_list_format(
+        src, options=ScanOptions(archives=True)
+    ))
+    nodes: Dict[str, Dict] = _nodes(dst)
+    for archive_id in ["root/sub/bundle.zip/", "root/bundle.tar.gz/"]:
+        archive: Dict = nodes[archive_id]
+        assert archive["type"] == "Directory"
+        assert archive["hasPart"] == [
+            {"@id": f"{archive_id}docs/"}, {"@id": f"{archive_id}data.csv"}
+        ]
+        assert archive["numberOfAllFiles"] == 3
+        assert archive["contentSizeOfAllFiles"] == sum(len(v) for v in MEMBERS.values())
+        for name, content in MEMBERS.items():
+            node: Dict = nodes[f"{archive_id}{name}"]
+            assert node["contentSize"] == len(content)
+            assert node["sha256"] == hashlib.sha256(content).hexdigest()
+        assert nodes[f"{archive_id}docs/img/"]["parent"] == {"@id": f"{archive_id}docs/"}
+    assert nodes["root/sub/bundle.zip/"]["archiveFormat"] == "zip"
+    assert "archiveError" in nodes["root/broken.tar/"]
+    assert nodes["root/"]["numberOfAllFiles"] == 7
+    assert nodes["root/"]["numberOfFiles"] == 1
+    assert {"@id": "root/bundle.tar.gz"} not in nodes["root/"]["hasPart"]
+
+    # the members are filtered as the other entries.
+    nodes = _nodes(get_metadata_of_files_in_list_format(
+        src, options=ScanOptions(archives=True, exclude=["img"], include=["*.md"], max_depth=3)
+    ))
+    assert "root/bundle.tar.gz/docs/index.md" in nodes
+    assert "root/bundle.tar.gz/docs/img/" not in nodes
+    assert "root/bundle.tar.gz/data.csv" not in nodes
+    assert "root/sub/bundle.zip/docs/index.md" not in nodes
+    assert nodes["root/sub/bundle.zip/docs/"]["hasPart"] == []
+
+    # without the option, the archives are files.
+    nodes = _nodes(get_metadata_of_files_in_list_format(src))
+    assert nodes["root/bundle.tar.gz"]["type"] == "File"
+
+
+def test_get_metadata_of_files_in_list_format_w_archives_resume(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """test function for the archives with a large directory and a checkpoint"""
+    src: Path = _make_tree(tmp_path / "root")
+    options = ScanOptions(archives=True, fields=["contentSize", "sha256"])
+    expected: str = json.dumps(get_metadata_of_files_in_list_format(src, options=options)["@graph"])
+    monkeypatch.setattr(get_metadata, "LARGE_DIRECTORY_BATCH", 2)
+    dst: Dict = get_metadata_of_files_in_list_format(
+        src, options=ScanOptions(
+            archives=True, fields=["contentSize", "sha256"], large_directory_threshold=2
+        )
+    )
+    assert json.dumps(dst["@graph"]) == expected
+
+    state: str = str(tmp_path / "state.jsonl")
+    checkpoint = ScanCheckpoint(state, {"src": str(src)}, interval=0.0)
+    get_metadata_of_files_in_list_format(src, options=options, checkpoint=checkpoint)
+    checkpoint.close()
+    checkpoint = ScanCheckpoint(state, {"src": str(src)}, resume=True)
+    hashed: List[str] = []
+    monkeypatch.setattr(get_metadata, "_calculate_sha256_of_stream", hashed.append)
+    dst = get_metadata_of_files_in_list_format(src, options=options, checkpoint=checkpoint)
+    checkpoint.close(remove=True)
+    assert json.dumps(dst["@graph"]) == expected
+    assert not hashed
+
+
+def test_get_metadata_of_files_in_list_format_w_unsafe_archive(tmp_path: Path):
+    """test function for the members of an archive whose names escape it"""
+    src: Path = tmp_path / "root"
+    src.mkdir()
+    unsafe: List[str] = ["../evil.txt", "/abs.txt", "C:/drive.txt", "docs/../../up.txt"]
+    with zipfile.ZipFile(src / "crafted.zip", "w") as archive:
+        archive.writestr("docs/index.md", b"# index\n")
+        for name in unsafe:
+            archive.writestr(zipfile.ZipInfo(name), b"evil")
+    assert [
+        member.unsafe_name or "/".join(member.parts)
+        for member, _ in iter_archive_members(src / "crafted.zip", "zip")
+    ] == ["docs/index.md"] + unsafe
+    nodes: Dict[str, Dict] = _nodes(get_metadata_of_files_in_list_format(
+        src, options=ScanOptions(archives=True)
+    ))
+    assert sorted(nodes) == [
+        "root/", "root/crafted.zip/", "root/crafted.zip/docs/", "root/crafted.zip/docs/index.md"
+    ]
+    assert "../evil.txt" in nodes["root/crafted.zip/"]["archiveError"]
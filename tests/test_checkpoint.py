@@ -0,0 +1,102 @@
+"""test_checkpoint.py
+
+test functions for checkpoint.py
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, List
+import pytest
+from directory_structure_py import get_metadata
+from directory_structure_py.checkpoint import ScanCheckpoint
+from directory_structure_py.get_metadata import get_metadata_of_files_in_list_format
+from directory_structure_py.scan_options import ScanOptions
+
+
+def _make_tree(src: Path) -> Path:
+    for name in ["a", "b", "c"]:
+        (src / name / "sub").mkdir(parents=True)
+        (src / name / "file.txt").write_bytes(name.encode() * 3)
+        (src / name / "sub" / "file.bin").write_bytes(name.encode() * 5)
+    (src / "top.txt").write_bytes(b"top")
+    return src
+
+
+def test_scan_checkpoint_resume(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """test function for ScanCheckpoint with an interrupted scan"""
+    src: Path = _make_tree(tmp_path / "root")
+    expected: Dict = get_metadata_of_files_in_list_format(src)
+    state: str = str(tmp_path / "state.jsonl")
+    header: Dict = {"src": str(src)}
+    original = get_metadata.calculate_sha256
+    hashed: List[str] = []
+
+    def _failing_sha256(path, throttle=None):
+        if len(hashed) == 4:
+            raise OSError("interrupted")
+        hashed.append(str(path))
+        return original(path, throttle)
+
+    monkeypatch.setattr(get_metadata, "calculate_sha256", _failing_sha256)
+    checkpoint = ScanCheckpoint(state, header, interval=0.0)
+    with pytest.raises(OSError):
+        get_metadata_of_files_in_list_format(src, checkpoint=checkpoint)
+    checkpoint.close()
+
+    with open(state, "a", encoding="utf-8") as ff:
+        ff.write('{"@id": "truncated')
+    monkeypatch.setattr(get_metadata, "calculate_sha256", original)
+    checkpoint = ScanCheckpoint(state, header, resume=True)
+    assert 0 < len(checkpoint.records) < 7
+    resumed_files: List[str] = [
+        node["@id"] for nodes in checkpoint.records.values()
+        for node in nodes if node["type"] == "File"
+    ]
+    hashed.clear()
+    monkeypatch.setattr(get_metadata, "calculate_sha256", _failing_sha256)
+    dst: Dict = get_metadata_of_files_in_list_format(src, checkpoint=checkpoint)
+    checkpoint.close(remove=True)
+    assert dst["@graph"] == expected["@graph"]
+    assert resumed_files
+    assert len(hashed) == 7 - len(resumed_files)
+    assert not Path(state).exists()
+
+    with pytest.raises(ValueError):
+        ScanCheckpoint(str(tmp_path / "other.jsonl"), header).close()
+        ScanCheckpoint(str(tmp_path / "other.jsonl"), {"src": "other"}, resume=True)
+
+
+def test_scan_checkpoint_resume_w_hardlinks(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """test function for ScanCheckpoint with a hard link across the interruption"""
+    src: Path = _make_tree(tmp_path / "root")
+    try:
+        os.link(src / "top.txt", src / "c" / "link.txt")
+    except OSError:
+        pytest.skip("hard links are not supported.")
+    options = ScanOptions(hardlinks="once")
+    expected: Dict = get_metadata_of_files_in_list_format(src, options=options)
+    state: str = str(tmp_path / "state.jsonl")
+    header: Dict = {"src": str(src)}
+    original = get_metadata.calculate_sha256
+
+    def _failing_sha256(path, throttle=None):
+        if "c" in Path(path).relative_to(src).parts:
+            raise OSError("interrupted")
+        return original(path, throttle)
+
+    monkeypatch.setattr(get_metadata, "calculate_sha256", _failing_sha256)
+    checkpoint = ScanCheckpoint(state, header, interval=0.0)
+    with pytest.raises(OSError):
+        get_metadata_of_files_in_list_format(src, options=options, checkpoint=checkpoint)
+    checkpoint.close()
+
+    monkeypatch.setattr(get_metadata, "calculate_sha256", original)
+    checkpoint = ScanCheckpoint(state, header, resume=True)
+    assert "root/top.txt" in [
+        node["@id"] for nodes in checkpoint.records.values() for node in nodes
+    ]
+    dst: Dict = get_metadata_of_files_in_list_format(src, options=options, checkpoint=checkpoint)
+    checkpoint.close(remove=True)
+    assert dst["@graph"] == expected["@graph"]
+    link: Dict = next(n for n in dst["@graph"] if n["@id"] == "root/c/link.txt")
+    assert link["sameFileAs"] == {"@id": "root/top.txt"}
@@ -0,0 +1,90 @@
+"""test_columnar.py
+
+test functions for columnar.py
+"""
+
+import copy
+import json
+from pathlib import Path
+from typing import Dict, List
+import pytest
+from directory_structure_py.get_metadata import (
+    get_metadata_of_files_in_list_format,
+    update_statistical_info_to_metadata_list
+)
+from directory_structure_py.scan_options import ScanOptions
+
+np = pytest.importorskip("numpy")
+# pylint: disable=wrong-import-position
+from directory_structure_py.columnar import (  # noqa: E402
+    ColumnarStats,
+    DISTRIBUTION_KEYS,
+    size_buckets,
+    update_statistical_info_with_columns
+)
+
+
+def _make_tree(tmp_path: Path) -> Path:
+    src = tmp_path / "root"
+    (src / "a" / "b").mkdir(parents=True)
+    (src / "c").mkdir()
+    (src / "x.txt").write_bytes(b"x" * 10)
+    (src / "a" / "y.json").write_bytes(b"y" * 100)
+    (src / "a" / "z.txt").write_bytes(b"")
+    (src / "a" / "b" / "w.txt").write_bytes(b"w" * 1000)
+    (src / "a" / "b" / "v.csv").write_bytes(b"v" * 3)
+    return src
+
+
+def test_update_statistical_info_with_columns(tmp_path: Path):
+    """test function for update_statistical_info_with_columns against the python engine"""
+    data: Dict = get_metadata_of_files_in_list_format(_make_tree(tmp_path))
+    expected: Dict = update_statistical_info_to_metadata_list(copy.deepcopy(data))
+    dst: Dict = update_statistical_info_with_columns(copy.deepcopy(data), None)
+    for node in dst["@graph"]:
+        for key in DISTRIBUTION_KEYS:
+            node.pop(key, None)
+    # the same values and the same order of the keys
+    assert json.dumps(dst) == json.dumps(expected)
+
+
+def test_distributions(tmp_path: Path):
+    """test function for the distributions of the columnar engine"""
+    data: Dict = update_statistical_info_with_columns(
+        get_metadata_of_files_in_list_format(_make_tree(tmp_path)), 1
+    )
+    nodes: Dict = {node["@id"]: node for node in data["@graph"]}
+    root: Dict = nodes["root/"]
+    assert root["contentSizeOfAllFilesPerExtension"] == {".txt": 1010, ".json": 100, ".csv": 3}
+    assert root["contentSizeHistogramOfAllFiles"] == {"0": 1, "2": 1, "8": 1, "64": 1, "512": 1}
+    sizes: List[int] = [10, 100, 0, 1000, 3]
+    assert root["contentSizePercentilesOfAllFiles"] == {
+        f"p{q}": pytest.approx(np.percentile(sizes, q)) for q in [50, 90, 99]
+    }
+    assert nodes["root/a/"]["contentSizePercentilesOfAllFiles"]["p50"] == pytest.approx(51.5)
+    assert nodes["root/c/"]["contentSizeHistogramOfAllFiles"] == {}
+    assert nodes["root/c/"]["contentSizePercentilesOfAllFiles"] == {}
+    assert "latestDateModifiedOfAllFiles" not in nodes["root/c/"]
+    # deeper than `percentile_depth`
+    assert "contentSizePercentilesOfAllFiles" not in nodes["root/a/b/"]
+    assert root["latestDateModifiedOfAllFiles"] == max(
+        node["dateModified"] for node in data["@graph"] if node["type"] == "File"
+    )
+
+
+def test_columnar_without_sizes(tmp_path: Path):
+    """test function for the columnar engine on a structure-only scan"""
+    data: Dict = get_metadata_of_files_in_list_format(
+        _make_tree(tmp_path), options=ScanOptions(fields=[])
+    )
+    expected: Dict = update_statistical_info_to_metadata_list(copy.deepcopy(data))
+    assert update_statistical_info_with_columns(data) == expected
+
+
+def test_columnar_stats():
+    """test function for ColumnarStats and size_buckets"""
+    assert size_buckets(np.array([0, 1, 2, 3, 4, 1023, 1024])).tolist() == [0, 1, 2, 2, 3, 10, 11]
+    stats = ColumnarStats({"@graph": []})
+    assert stats.root == -1
+    with pytest.warns(UserWarning):
+        update_statistical_info_with_columns({"@graph": []})
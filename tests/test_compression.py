@@ -0,0 +1,74 @@
+"""test_compression.py
+
+test functions for compression.py
+"""
+
+import json
+from pathlib import Path
+from typing import Dict
+import pytest
+from directory_structure_py.compression import (
+    infer_compression,
+    strip_compression_extension,
+    add_compression_extension,
+    detect_compression,
+    open_output,
+    open_input
+)
+from directory_structure_py.conversion import (
+    list2tree_from_file,
+    convert_meta_list_json_to_tsv_from_file
+)
+from directory_structure_py.get_metadata import get_metadata_of_files_in_list_format
+from directory_structure_py.main import save_dict_to_json, save_nested_list_to_tsv
+from directory_structure_py.reader import iter_graph_nodes
+
+
+def test_infer_compression():
+    """test function for infer_compression and the extension helpers"""
+    assert infer_compression("a.json.gz") == "gzip"
+    assert infer_compression("a.json.zst") == "zstd"
+    assert infer_compression("a.json") == ""
+    assert infer_compression("a.json", "xz") == "xz"
+    with pytest.raises(ValueError):
+        infer_compression("a.json", "bz2")
+    assert strip_compression_extension("a.json.gz") == "a.json"
+    assert add_compression_extension("a.json", "gzip") == "a.json.gz"
+    assert add_compression_extension("a.json.gz", "gzip") == "a.json.gz"
+    assert add_compression_extension("a.json", "") == "a.json"
+
+
+@pytest.mark.parametrize("compression", ["", "gzip", "xz", "zstd"])
+def test_open_output_and_input(tmp_path: Path, compression: str):
+    """test function for open_output and open_input"""
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    dst: str = str(tmp_path / "data.txt")
+    text: str = "".join(f"line {ii} ü\n" for ii in range(200_000))
+    with open_output(dst, compression) as ff:
+        for ii in range(0, len(text), 1000):
+            ff.write(text[ii:ii + 1000])
+    assert detect_compression(dst) == compression
+    with open_input(dst) as ff:
+        assert ff.read() == text
+
+
+def test_save_and_read_compressed(tmp_path: Path):
+    """test function for the compressed outputs and the transparent decompression"""
+    src = tmp_path / "root"
+    (src / "a").mkdir(parents=True)
+    (src / "a" / "x.txt").write_bytes(b"x")
+    data: Dict = get_metadata_of_files_in_list_format(src)
+    dst: str = str(tmp_path / "out.json")
+    save_dict_to_json(data, dst, "gzip")
+    assert not Path(dst).exists()
+    with open_input(dst + ".gz") as ff:
+        assert json.load(ff) == data
+    assert [node["@id"] for node in iter_graph_nodes(dst + ".gz")] == [
+        node["@id"] for node in data["@graph"]
+    ]
+    assert list(list2tree_from_file(dst + ".gz")["@graph"].keys()) == ["root/"]
+    assert convert_meta_list_json_to_tsv_from_file(dst + ".gz")[0][0] == "@id"
+    save_nested_list_to_tsv([["a", "b"], ["1", "2"]], str(tmp_path / "out.tsv.xz"))
+    with open_input(str(tmp_path / "out.tsv.xz")) as ff:
+        assert ff.read() == "a\tb\n1\t2\n"
@@ -3,6 +3,8 @@
 test functions for conversion.py
 """
 
+import copy
+import io
 import json
 import os
 from pathlib import Path
@@ -16,6 +18,8 @@ from directory_structure_py.conversion import (
     convert_meta_list_json_to_tsv_from_file,
     list2tree,
     list2tree_from_file,
+    write_list_as_tree,
+    write_tree_from_file,
     convert_meta_list_json_to_rocrate
 )
 
@@ -90,6 +94,59 @@ def test_list2tree_from_file():
     assert dst == expected
 
 
+@pytest.mark.parametrize("structure_only", [False, True])
+@pytest.mark.parametrize("compact", [False, True])
+def test_write_list_as_tree(structure_only: bool, compact: bool):
+    """test function for write_list_as_tree"""
+    src_path: str = os.path.join(
+        os.path.dirname(__file__), f"../output/sample/{DEFAULT_OUTPUT_NAME}"
+    )
+    src: Dict = {}
+    with open(src_path, "r", encoding="utf-8") as ff:
+        src = json.loads(ff.read())
+    # an empty directory and a directory without `hasPart`
+    src["@graph"][0]["hasPart"].append({"@id": "sample/empty/"})
+    src["@graph"].append({"@id": "sample/empty/", "type": "Directory",
+                          "parent": {"@id": "sample/"}, "hasPart": [], "numberOfFiles": 0})
+    src["@graph"][0]["hasPart"].append({"@id": "sample/nopart/"})
+    src["@graph"].append({"@id": "sample/nopart/", "type": "Directory",
+                          "parent": {"@id": "sample/"}})
+    original: Dict = copy.deepcopy(src)
+    expected: str = json.dumps(
+        list2tree(copy.deepcopy(src), structure_only),
+        indent=None if compact else 4, separators=(",", ":") if compact else None,
+        ensure_ascii=False
+    )
+    ff = io.StringIO()
+    write_list_as_tree(src, ff, structure_only, compact)
+    assert ff.getvalue() == expected
+    assert src == original
+
+
+@pytest.mark.parametrize("structure_only", [False, True])
+def test_write_tree_from_file(tmp_path: Path, structure_only: bool):
+    """test function for write_tree_from_file"""
+    src_path: str = os.path.join(
+        os.path.dirname(__file__), f"../output/sample/{DEFAULT_OUTPUT_NAME}"
+    )
+    src: Dict = {}
+    with open(src_path, "r", encoding="utf-8") as ff:
+        src = json.loads(ff.read())
+    expected = io.StringIO()
+    write_list_as_tree(src, expected, structure_only)
+    dst = io.StringIO()
+    write_tree_from_file(src_path, dst, structure_only)
+    assert dst.getvalue() == expected.getvalue()
+
+    # a child listed before its parent
+    src["@graph"].append(src["@graph"].pop(0))
+    shuffled: str = str(tmp_path / "shuffled.json")
+    with open(shuffled, "w", encoding="utf-8") as ff:
+        json.dump(src, ff)
+    with pytest.raises(ValueError):
+        write_tree_from_file(shuffled, io.StringIO(), structure_only)
+
+
 def test_convert_meta_list_json_to_rocrate():
     """test function for convert_meta_list_json_to_rocrate
     """
@@ -0,0 +1,75 @@
+"""test_diff.py
+
+test functions for diff.py
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict
+from directory_structure_py.constants import DEFAULT_OUTPUT_NAME
+from directory_structure_py.diff import diff_metadata, diff_metadata_files
+from directory_structure_py.get_metadata import (
+    get_metadata_of_files_in_list_format,
+    update_statistical_info_to_metadata_list
+)
+
+
+def _scan(src: Path) -> Dict:
+    return update_statistical_info_to_metadata_list(
+        get_metadata_of_files_in_list_format(src)
+    )
+
+
+def test_diff_metadata_same():
+    """test function for diff_metadata with the same snapshots"""
+    src_path: str = os.path.join(
+        os.path.dirname(__file__), f"../output/sample/{DEFAULT_OUTPUT_NAME}"
+    )
+    dst: Dict = diff_metadata_files(src_path, src_path)
+    for key in ["added", "removed", "modified", "moved", "sizeDeltas"]:
+        assert dst[key] == []
+
+
+def test_diff_metadata(tmp_path: Path):
+    """test function for diff_metadata"""
+    src = tmp_path / "root"
+    (src / "a").mkdir(parents=True)
+    (src / "b").mkdir()
+    (src / "keep.txt").write_text("keep")
+    (src / "a" / "move.txt").write_text("move me")
+    (src / "a" / "edit.txt").write_text("before")
+    (src / "remove.txt").write_text("remove")
+    old: Dict = _scan(src)
+
+    os.rename(src / "a" / "move.txt", src / "b" / "moved.txt")
+    (src / "a" / "edit.txt").write_text("after!!")
+    os.remove(src / "remove.txt")
+    (src / "b" / "new.txt").write_text("new")
+    new: Dict = _scan(src)
+
+    dst: Dict = diff_metadata(old["@graph"], new["@graph"])
+    assert dst["added"] == ["root/b/new.txt"]
+    assert dst["removed"] == ["root/remove.txt"]
+    assert dst["moved"] == [{"from": "root/a/move.txt", "to": "root/b/moved.txt"}]
+    modified: Dict = {m["@id"]: m["changes"] for m in dst["modified"]}
+    assert modified["root/a/edit.txt"]["contentSize"] == [6, 7]
+    assert "sha256" in modified["root/a/edit.txt"]
+    deltas: Dict = {d["@id"]: d["delta"] for d in dst["sizeDeltas"]}
+    assert deltas == {"root/": -6 + 1 + 3, "root/a/": -7 + 1, "root/b/": 7 + 3}
+
+
+def test_diff_metadata_files_jsonl(tmp_path: Path):
+    """test function for diff_metadata_files with JSON Lines"""
+    src_path: str = os.path.join(
+        os.path.dirname(__file__), f"../output/sample/{DEFAULT_OUTPUT_NAME}"
+    )
+    with open(src_path, "r", encoding="utf-8") as ff:
+        data: Dict = json.load(ff)
+    dst_path = tmp_path / "snapshot.jsonl"
+    with open(dst_path, "w", encoding="utf-8") as ff:
+        for node in data["@graph"][:-1]:
+            ff.write(json.dumps(node) + "\n")
+    dst: Dict = diff_metadata_files(dst_path, src_path)
+    assert dst["added"] == [data["@graph"][-1]["@id"]]
+    assert dst["numberOfRemoved"] == 0
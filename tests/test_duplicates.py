@@ -0,0 +1,128 @@
+"""test_duplicates.py
+
+test functions for duplicates.py
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, List
+import pytest
+from directory_structure_py import duplicates
+from directory_structure_py.duplicates import (
+    calculate_partial_hash,
+    find_duplicates
+)
+from directory_structure_py.get_metadata import (
+    calculate_sha256,
+    get_metadata_of_files_in_list_format
+)
+from directory_structure_py.scan_options import ScanOptions
+from directory_structure_py.throttle import ReadThrottle
+
+
+def test_calculate_partial_hash(tmp_path: Path):
+    """test function for calculate_partial_hash"""
+    small = tmp_path / "small.bin"
+    small.write_bytes(b"abc")
+    assert calculate_partial_hash(small, 3) == calculate_sha256(small)
+    large_1 = tmp_path / "large_1.bin"
+    large_1.write_bytes(b"a" * 10 + b"b" * 100 + b"c" * 10)
+    large_2 = tmp_path / "large_2.bin"
+    large_2.write_bytes(b"a" * 10 + b"x" * 100 + b"c" * 10)
+    assert calculate_partial_hash(large_1, 120, 10) == calculate_partial_hash(large_2, 120, 10)
+
+
+def test_find_duplicates(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """test function for find_duplicates"""
+    src = tmp_path / "root"
+    (src / "a").mkdir(parents=True)
+    (src / "dup_1.bin").write_bytes(b"h" * 10 + b"same" + b"t" * 10)
+    (src / "a" / "dup_2.bin").write_bytes(b"h" * 10 + b"same" + b"t" * 10)
+    (src / "a" / "dup_3.bin").write_bytes(b"h" * 10 + b"diff" + b"t" * 10)
+    (src / "other.bin").write_bytes(b"o" * 24)
+    (src / "empty_1.bin").write_bytes(b"")
+    (src / "a" / "empty_2.bin").write_bytes(b"")
+    data: Dict = get_metadata_of_files_in_list_format(src)
+    for node in data["@graph"]:
+        node.pop("sha256", None)
+
+    hashed: List[str] = []
+
+    def _recording_sha256(path: Path, throttle=None) -> str:
+        hashed.append(Path(path).relative_to(src).as_posix())
+        return calculate_sha256(path, throttle)
+
+    monkeypatch.setattr(duplicates, "calculate_sha256", _recording_sha256)
+    dst: List[Dict] = find_duplicates(data, src, partial_hash_size=4)
+    assert len(dst) == 1
+    assert sorted(p_["@id"] for p_ in dst[0]["hasPart"]) == [
+        "root/a/dup_2.bin", "root/dup_1.bin"
+    ]
+    assert dst[0]["sha256"] == calculate_sha256(src / "dup_1.bin")
+    assert dst[0]["wastedSize"] == 24
+    # only the files colliding on the partial hash value are fully hashed,
+    # and the nodes are left as they are.
+    assert sorted(hashed) == ["a/dup_2.bin", "a/dup_3.bin", "dup_1.bin"]
+    assert not any(n.get("sha256") for n in data["@graph"])
+
+    dst = find_duplicates(data, src, min_size=0)
+    assert [g["numberOfFiles"] for g in dst] == [2, 2]
+
+
+def test_find_duplicates_w_known_hashes_and_hardlinks(tmp_path: Path):
+    """test function for find_duplicates with files which cannot be opened and hard links"""
+    src = tmp_path / "root"
+    src.mkdir()
+    (src / "file.bin").write_bytes(b"content")
+    (src / "other.bin").write_bytes(b"another")
+    try:
+        os.link(src / "other.bin", src / "link.bin")
+    except OSError:
+        pytest.skip("hard links are not supported.")
+    data: Dict = get_metadata_of_files_in_list_format(src)
+    sha256: str = calculate_sha256(src / "file.bin")
+    # e.g., a member of an archive, which has no path of its own.
+    data["@graph"].append({
+        "@id": "root/bundle.zip/file.bin", "type": "File", "contentSize": 7, "sha256": sha256
+    })
+    dst: List[Dict] = find_duplicates(data, src)
+    assert [sorted(p_["@id"] for p_ in g["hasPart"]) for g in dst] == [
+        ["root/bundle.zip/file.bin", "root/file.bin"],
+    ]
+    assert dst[0]["wastedSize"] == 7
+
+    data = get_metadata_of_files_in_list_format(src, options=ScanOptions(hardlinks="once"))
+    assert not find_duplicates(data, src)
+
+
+class _RecordingThrottle(ReadThrottle):
+    """a ReadThrottle counting the files opened and the bytes read"""
+
+    def __init__(self):
+        super().__init__()
+        self.opens: int = 0
+        self.bytes_read: int = 0
+
+    def open_file(self) -> None:
+        self.opens += 1
+
+    def read(self, size: int, elapsed: float) -> None:
+        self.bytes_read += size
+
+
+def test_find_duplicates_w_throttle(tmp_path: Path):
+    """test function for find_duplicates within the limits of a ReadThrottle"""
+    src = tmp_path / "root"
+    src.mkdir()
+    for name in ["dup_1.bin", "dup_2.bin"]:
+        (src / name).write_bytes(b"h" * 10 + b"same" + b"t" * 10)
+    data: Dict = get_metadata_of_files_in_list_format(src, options=ScanOptions(fields=[
+        "contentSize"
+    ]))
+    read_throttle = _RecordingThrottle()
+    dst: List[Dict] = find_duplicates(data, src, partial_hash_size=4, throttle=read_throttle)
+    assert dst[0]["numberOfFiles"] == 2
+    # a partial and a full hash per file: 2 opens, and 2 reads + the content.
+    assert read_throttle.opens == 4
+    assert read_throttle.bytes_read == 2 * (4 + 4 + 24)
+
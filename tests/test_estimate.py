@@ -0,0 +1,66 @@
+"""test_estimate.py
+
+test functions for estimate.py
+"""
+
+from pathlib import Path
+from typing import Dict
+import pytest
+from directory_structure_py.estimate import estimate_metadata
+from directory_structure_py.get_metadata import (
+    get_metadata_of_files_in_list_format,
+    update_statistical_info_to_metadata_list
+)
+
+
+def _make_tree(src: Path) -> Path:
+    for ii in range(4):
+        (src / f"dir_{ii}" / "sub").mkdir(parents=True)
+        for jj in range(50):
+            (src / f"dir_{ii}" / f"f_{jj}.txt").write_bytes(b"x" * (jj * 10 + ii))
+            (src / f"dir_{ii}" / "sub" / f"g_{jj}.csv").write_bytes(b"y" * (jj + 1))
+    (src / "top.json").write_bytes(b"{}")
+    return src
+
+
+def test_estimate_metadata_exact(tmp_path: Path):
+    """test function for estimate_metadata with all the files sampled"""
+    src: Path = _make_tree(tmp_path / "root")
+    expected: Dict = update_statistical_info_to_metadata_list(
+        get_metadata_of_files_in_list_format(src)
+    )
+    expected_nodes: Dict = {node["@id"]: node for node in expected["@graph"]}
+    dst: Dict = estimate_metadata(src, 1.0)
+    assert sorted(node["@id"] for node in dst["@graph"]) == [
+        "root/", *[f"root/dir_{ii}/" for ii in range(4)]
+    ]
+    for node in dst["@graph"]:
+        expected_node: Dict = expected_nodes[node["@id"]]
+        for key in [
+            "contentSizeOfAllFiles", "numberOfAllContents", "numberOfAllFiles",
+            "numberOfAllFilesPerExtension", "numberOfAllFilesPerMIMEType",
+            "numberOfContents", "numberOfFiles"
+        ]:
+            assert node[key] == expected_node[key], key
+        assert node["contentSizeOfAllFilesConfidenceInterval"] == [
+            node["contentSizeOfAllFiles"]] * 2
+    assert sorted(p["@id"] for p in dst["@graph"][0]["hasPart"]) == [
+        f"root/dir_{ii}/" for ii in range(4)
+    ]
+
+
+def test_estimate_metadata_sampled(tmp_path: Path):
+    """test function for estimate_metadata with a sample of the files"""
+    src: Path = _make_tree(tmp_path / "root")
+    expected: Dict = update_statistical_info_to_metadata_list(
+        get_metadata_of_files_in_list_format(src)
+    )
+    dst: Dict = estimate_metadata(src, 0.5, max_depth=0, confidence=0.999, seed=0)
+    assert len(dst["@graph"]) == 1
+    root: Dict = dst["@graph"][0]
+    assert root["numberOfAllFiles"] == expected["@graph"][0]["numberOfAllFiles"]
+    assert 0 < root["numberOfSampledFiles"] < root["numberOfAllFiles"]
+    low, high = root["contentSizeOfAllFilesConfidenceInterval"]
+    assert low <= expected["@graph"][0]["contentSizeOfAllFiles"] <= high
+    with pytest.raises(ValueError):
+        estimate_metadata(src, 0.0)
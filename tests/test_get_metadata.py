@@ -3,13 +3,17 @@
 test functions for get_metadata.py
 """
 
+import datetime
 import json
 import os
 from pathlib import Path
 from typing import Dict
 import pytest
-from directory_structure_py.constants import DEFAULT_OUTPUT_NAME
+from directory_structure_py.constants import DEFAULT_OUTPUT_NAME, DATETIME_FMT
+from directory_structure_py import get_metadata
+from directory_structure_py.scan_options import ScanOptions
 from directory_structure_py.get_metadata import (
+    format_timestamp,
     generate_id,
     get_metadata_of_single_file,
     generate_blank_metadata,
@@ -203,3 +207,107 @@ def test_update_statistical_info_to_metadata_list():
                 assert v is not None
             else:
                 assert v == meta_[k]
+
+
+def test_get_metadata_of_single_file_w_fields(tmp_path: Path):
+    """test function for get_metadata_of_single_file with fields"""
+    src_path: Path = tmp_path / "data.csv"
+    src_path.write_bytes(b"a,b\n")
+    dst: Dict = get_metadata_of_single_file(src_path, tmp_path, fields=["contentSize"])
+    assert dst["contentSize"] == 4
+    for key in ["mimetype", "sha256", "dateCreated", "dateModified"]:
+        assert key not in dst
+    dst = get_metadata_of_single_file(src_path, tmp_path, fields=[])
+    assert dst["extension"] == ".csv" and "contentSize" not in dst
+
+
+def _make_linked_tree(src: Path) -> Path:
+    (src / "a").mkdir(parents=True)
+    (src / "b").mkdir()
+    (src / "a" / "data.bin").write_bytes(b"x" * 100)
+    try:
+        os.link(src / "a" / "data.bin", src / "b" / "data.bin")
+        os.symlink("../a", src / "a" / "loop")
+        os.symlink("a/data.bin", src / "top.bin")
+    except (OSError, NotImplementedError):
+        pytest.skip("links are not supported")
+    return src
+
+
+@pytest.mark.parametrize("hardlinks", ["all", "once"])
+def test_get_metadata_of_files_in_list_format_w_links(tmp_path: Path, hardlinks: str):
+    """test function for get_metadata_of_files_in_list_format with links"""
+    src: Path = _make_linked_tree(tmp_path / "root")
+    dst: Dict = update_statistical_info_to_metadata_list(get_metadata_of_files_in_list_format(
+        src, options=ScanOptions(hardlinks=hardlinks)
+    ))
+    nodes: Dict[str, Dict] = {node["@id"]: node for node in dst["@graph"]}
+    assert nodes["root/a/loop"]["type"] == "Unknown"
+    assert nodes["root/a/loop"]["linkTarget"] == "../a"
+    assert nodes["root/top.bin"]["type"] == "Unknown"
+    assert nodes["root/a/data.bin"]["numberOfLinks"] == 2
+    assert nodes["root/a/data.bin"]["sha256"] == nodes["root/b/data.bin"]["sha256"]
+    assert nodes["root/"]["contentSizeOfAllFiles"] == (200 if hardlinks == "all" else 100)
+    assert ("sameFileAs" in nodes["root/a/data.bin"]) == (hardlinks == "once")
+    # the entry points without options classify the links the same way.
+    default: Dict = get_metadata_of_files_in_list_format(src)
+    assert default["@graph"][0]["numberOfFiles"] == 0
+    assert get_metadata_of_single_directory(src)["numberOfFiles"] == 0
+
+    dst = update_statistical_info_to_metadata_list(get_metadata_of_files_in_list_format(
+        src, options=ScanOptions(follow_symlinks=True, hardlinks=hardlinks)
+    ))
+    nodes = {node["@id"]: node for node in dst["@graph"]}
+    assert nodes["root/a/loop"]["type"] == "Unknown"
+    assert nodes["root/top.bin"]["type"] == "File"
+    assert nodes["root/"]["contentSizeOfAllFiles"] == (300 if hardlinks == "all" else 100)
+    with pytest.raises(ValueError):
+        ScanOptions(hardlinks="none")
+
+
+def _make_large_tree(src: Path) -> Path:
+    (src / "sub").mkdir(parents=True)
+    for ii in range(30):
+        (src / f"file_{ii:02d}{['.txt', '.csv', ''][ii % 3]}").write_bytes(b"x" * ii)
+    (src / "sub" / "data.json").write_text("{}")
+    return src
+
+
+def _without_dates(data: Dict) -> str:
+    for node in data["@graph"]:
+        node.pop("dateCreated", None)
+    return json.dumps(data)
+
+
+def test_get_metadata_of_files_in_list_format_w_large_directory(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """test function for get_metadata_of_files_in_list_format with large_directory_threshold"""
+    src: Path = _make_large_tree(tmp_path / "root")
+    expected: str = _without_dates(update_statistical_info_to_metadata_list(
+        get_metadata_of_files_in_list_format(src, options=ScanOptions(exclude=["*.csv"]))
+    ))
+    monkeypatch.setattr(get_metadata, "LARGE_DIRECTORY_BATCH", 7)
+    dst: Dict = update_statistical_info_to_metadata_list(get_metadata_of_files_in_list_format(
+        src, options=ScanOptions(exclude=["*.csv"], large_directory_threshold=5)
+    ))
+    assert _without_dates(dst) == expected
+
+    dst = get_metadata_of_files_in_list_format(src, options=ScanOptions(
+        large_directory_threshold=5, large_directory_has_part="directories"
+    ))
+    nodes: Dict[str, Dict] = {node["@id"]: node for node in dst["@graph"]}
+    assert nodes["root/"]["hasPart"] == [{"@id": "root/sub/"}]
+    assert nodes["root/"]["numberOfContents"] == 31
+    assert nodes["root/file_00.txt"]["parent"] == {"@id": "root/"}
+    assert nodes["root/sub/"]["hasPart"] == [{"@id": "root/sub/data.json"}]
+    with pytest.raises(ValueError):
+        ScanOptions(large_directory_has_part="none")
+
+
+def test_format_timestamp():
+    """test function for format_timestamp"""
+    for timestamp in [0.0, 1_700_000_000.75, 1_700_000_001]:
+        assert format_timestamp(timestamp) == datetime.datetime.fromtimestamp(
+            timestamp
+        ).strftime(DATETIME_FMT)
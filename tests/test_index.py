@@ -0,0 +1,58 @@
+"""test_index.py
+
+test functions for index.py
+"""
+
+import json
+import os
+from typing import Dict
+import pytest
+from directory_structure_py.constants import DEFAULT_OUTPUT_NAME
+from directory_structure_py.index import MetadataIndex
+
+
+def _load_sample() -> Dict:
+    src_path: str = os.path.join(
+        os.path.dirname(__file__), f"../output/sample/{DEFAULT_OUTPUT_NAME}"
+    )
+    with open(src_path, "r", encoding="utf-8") as ff:
+        return json.loads(ff.read())
+
+
+def test_metadata_index_get():
+    """test function for MetadataIndex.get"""
+    src: Dict = _load_sample()
+    index = MetadataIndex(src)
+    assert len(index) == len(src["@graph"])
+    assert index.root_id == "sample/"
+    for node in src["@graph"]:
+        assert index.get(node["@id"]) == node
+    assert index.get("no/such/id") is None
+
+
+def test_metadata_index_children():
+    """test function for MetadataIndex.children"""
+    index = MetadataIndex(_load_sample())
+    dst = [node["@id"] for node in index.children("sample/data/")]
+    assert sorted(dst) == [
+        "sample/data/data_001.csv", "sample/data/data_002.csv"
+    ]
+    with pytest.raises(KeyError):
+        index.children("no/such/id")
+
+
+def test_metadata_index_to_list():
+    """test function for MetadataIndex.to_list"""
+    src: Dict = _load_sample()
+    index = MetadataIndex(src)
+    assert index.to_list() == src
+    assert [node["@id"] for node in index.subtree("sample/hogehoge/")][0] == "sample/hogehoge/"
+
+
+def test_metadata_index_statistics():
+    """test function for MetadataIndex.statistics"""
+    src: Dict = _load_sample()
+    index = MetadataIndex(src)
+    dst: Dict = index.statistics("sample/")
+    assert dst["numberOfAllFiles"] == src["@graph"][0]["numberOfAllFiles"]
+    assert "hasPart" not in dst
@@ -0,0 +1,75 @@
+"""test_locality.py
+
+test functions for locality.py
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, List
+import pytest
+from directory_structure_py import get_metadata
+from directory_structure_py.get_metadata import get_metadata_of_files_in_list_format
+from directory_structure_py.locality import physical_offset, sort_for_reading
+from directory_structure_py.scan_options import ScanOptions
+
+
+def _make_files(src: Path) -> List[Path]:
+    src.mkdir()
+    paths: List[Path] = []
+    for ii in range(8):
+        paths.append(src / f"file_{ii}.bin")
+        paths[-1].write_bytes(os.urandom(4096 * (ii + 1)))
+    return paths
+
+
+@pytest.mark.parametrize("order", ["listing", "inode", "extent"])
+def test_sort_for_reading(tmp_path: Path, order: str):
+    """test function for sort_for_reading"""
+    paths: List[Path] = _make_files(tmp_path / "root")
+    dst: List[Path] = sort_for_reading(paths[::-1], order)
+    assert sorted(dst) == sorted(paths)
+    if order == "listing":
+        assert dst == paths[::-1]
+    if order == "inode":
+        assert [os.stat(p_).st_ino for p_ in dst] == sorted(os.stat(p_).st_ino for p_ in paths)
+    offset: int | None = physical_offset(paths[0])
+    assert offset is None or offset >= 0
+    # the inode numbers of the listing are used without stat'ing the files.
+    missing: List[Path] = [tmp_path / "missing_1", tmp_path / "missing_2"]
+    if order == "inode":
+        assert sort_for_reading(missing, order, {missing[0]: 2, missing[1]: 1}) == missing[::-1]
+
+
+@pytest.mark.parametrize("order", ["inode", "extent"])
+def test_get_metadata_of_files_in_list_format_w_read_order(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, order: str
+):
+    """test function for get_metadata_of_files_in_list_format with read_order"""
+    src: Path = tmp_path / "root"
+    paths: List[Path] = _make_files(src)
+    expected: Dict = get_metadata_of_files_in_list_format(src)
+    original = get_metadata.calculate_sha256
+    hashed: List[Path] = []
+
+    def _recording_sha256(path, throttle=None):
+        hashed.append(Path(path))
+        return original(path, throttle)
+
+    inodes: Dict[Path, int] = {}
+
+    def _recording_sort(paths_, order_, inodes_=None):
+        inodes.update(inodes_ or {})
+        return sort_for_reading(paths_, order_, inodes_)
+
+    monkeypatch.setattr(get_metadata, "calculate_sha256", _recording_sha256)
+    monkeypatch.setattr(get_metadata, "sort_for_reading", _recording_sort)
+    dst: Dict = get_metadata_of_files_in_list_format(
+        src, options=ScanOptions(read_order=order)
+    )
+    assert dst["@graph"] == expected["@graph"]
+    listing: List[Path] = [
+        src / part["@id"].rsplit("/", 1)[-1] for part in expected["@graph"][0]["hasPart"]
+    ]
+    assert sorted(listing) == sorted(paths)
+    assert hashed == sort_for_reading(listing, order)
+    assert inodes == {p_: os.stat(p_).st_ino for p_ in paths}
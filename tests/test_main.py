@@ -0,0 +1,101 @@
+"""test_main.py
+
+test functions for main.py
+"""
+
+import json
+from logging import INFO, LogRecord
+from logging.handlers import QueueHandler
+import os
+import subprocess
+import sys
+from typing import Dict, List
+from directory_structure_py.main import main, set_logger, stop_logger, LOG_CONF_PATH
+
+# upper bound of the cumulative import time of `directory_structure_py.main`
+IMPORT_TIME_BUDGET_US: int = 500_000
+HEAVY_MODULES: List[str] = ["rocrate", "jinja2"]
+
+
+def _import_times(module: str) -> Dict[str, int]:
+    """Returns the cumulative import time in microseconds of each module
+    imported by `python -X importtime -c "import <module>"`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+        cwd=os.path.join(os.path.dirname(__file__), "..")
+    )
+    dst: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        dst[name.strip()] = int(cumulative)
+    return dst
+
+
+def test_main_import_skips_heavy_modules():
+    """test that importing main does not load rocrate or jinja2"""
+    times: Dict[str, int] = _import_times("directory_structure_py.main")
+    assert "directory_structure_py.main" in times
+    for name in times:
+        assert name.split(".")[0] not in HEAVY_MODULES
+
+
+def test_main_import_time_budget():
+    """test that importing main stays within the startup budget"""
+    times: Dict[str, int] = _import_times("directory_structure_py.main")
+    assert times["directory_structure_py.main"] < IMPORT_TIME_BUDGET_US
+
+
+def test_main_metrics_out(tmp_path):
+    """test function for main with metrics_out"""
+    src_path: str = os.path.join(os.path.dirname(__file__), "../sample")
+    dst_path: str = str(tmp_path / "out" / "metadata.json")
+    metrics_path: str = str(tmp_path / "stats.json")
+    main(
+        src_path, dst_path, False, to_tsv=True, in_tree=True,
+        log_output_path=str(tmp_path / "log" / "test.log"),
+        metrics_out=metrics_path
+    )
+    assert os.path.isfile(dst_path)
+    with open(metrics_path, "r", encoding="utf-8") as ff:
+        report: Dict = json.load(ff)
+    assert list(report["stages"].keys()) == ["scan", "rollUp", "writeJson", "tsv", "tree"]
+    assert report["counters"]["files"] > 0
+
+
+def test_set_logger(tmp_path):
+    """test function for set_logger"""
+    log_path: str = str(tmp_path / "test.log")
+    logger = set_logger(LOG_CONF_PATH, log_path)
+    assert len(logger.handlers) == 1 and isinstance(logger.handlers[0], QueueHandler)
+    handler = logger.handlers[0]
+    assert set_logger(LOG_CONF_PATH, log_path) is logger
+    assert logger.handlers == [handler]
+    logger.debug("a debug record.")
+    logger.info("an info record.")
+    # the records are formatted by the handlers of the listener, not by the caller.
+    record: LogRecord = handler.prepare(logger.makeRecord(
+        "main", INFO, __file__, 0, "a record %d.", (1,), None
+    ))
+    assert (record.msg, record.args) == ("a record 1.", None)
+    try:
+        raise ValueError("an error")
+    except ValueError:
+        logger.exception("an exception %s.", "record")
+    # the DEBUG records are written only on demand.
+    set_logger(LOG_CONF_PATH, str(tmp_path / "other.log"), debug=True)
+    assert logger.handlers != [handler]
+    logger.debug("another debug record.")
+    stop_logger()
+    with open(log_path, "r", encoding="utf-8") as ff:
+        text: str = ff.read()
+    assert "a debug record." not in text
+    assert "an info record." in text
+    assert "[ERROR]: an exception record." in text
+    assert "ValueError: an error" in text
+    with open(tmp_path / "other.log", "r", encoding="utf-8") as ff:
+        assert "another debug record." in ff.read()
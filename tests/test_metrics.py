@@ -0,0 +1,58 @@
+"""test_metrics.py
+
+test functions for metrics.py
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+import time
+from typing import Dict, List
+import pytest
+from directory_structure_py.get_metadata import get_metadata_of_files_in_list_format
+from directory_structure_py.metrics import ScanMetrics, SLOW_ENTRY_LOGS_PER_SECOND
+
+
+def test_scan_metrics_report(tmp_path: Path):
+    """test function for ScanMetrics.report"""
+    src_path: str = os.path.join(os.path.dirname(__file__), "../sample")
+    metrics = ScanMetrics()
+    stages = []
+    metrics.stage_callbacks.append(stages.append)
+    with metrics.stage("scan"):
+        data: Dict = get_metadata_of_files_in_list_format(src_path, metrics=metrics)
+    with metrics.stage("rollUp"):
+        pass
+    dst: Dict = metrics.report()
+    assert stages == ["scan", "rollUp"]
+    assert list(dst["stages"].keys()) == ["scan", "rollUp"]
+    n_files: int = len([n for n in data["@graph"] if n["type"] == "File"])
+    assert dst["counters"]["files"] == n_files
+    assert dst["counters"]["directories"] == len(data["@graph"]) - n_files
+    assert dst["counters"]["bytesHashed"] == sum(
+        n["contentSize"] for n in data["@graph"] if n["type"] == "File"
+    )
+    assert dst["counters"]["syscalls"] > 0
+    assert set(dst["timers"].keys()) == {"stat", "hash", "walk"}
+    metrics.save(str(tmp_path / "stats.json"))
+    with open(tmp_path / "stats.json", "r", encoding="utf-8") as ff:
+        assert json.load(ff)["counters"]["files"] == n_files
+
+
+def test_scan_metrics_slow_entries(monkeypatch: pytest.MonkeyPatch):
+    """test function for ScanMetrics.timer with slow_entry_threshold"""
+    logger = logging.getLogger("test_slow_entries")
+    logger.setLevel(logging.DEBUG)
+    records: List[logging.LogRecord] = []
+    monkeypatch.setattr(logger, "handle", records.append)
+    metrics = ScanMetrics(logger=logger, slow_entry_threshold=1e-9)
+    for ii in range(SLOW_ENTRY_LOGS_PER_SECOND * 3):
+        with metrics.timer("hash", f"file_{ii}"):
+            time.sleep(1e-6)
+    with metrics.timer("hash"):
+        time.sleep(1e-6)
+    assert metrics.counters["slowEntries"] == SLOW_ENTRY_LOGS_PER_SECOND * 3
+    assert SLOW_ENTRY_LOGS_PER_SECOND <= len(records) < SLOW_ENTRY_LOGS_PER_SECOND * 3
+    assert all(r_.levelno == logging.DEBUG for r_ in records)
+    assert "slowEntries" not in ScanMetrics(logger=logger).counters
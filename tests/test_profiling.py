@@ -0,0 +1,34 @@
+"""test_profiling.py
+
+test functions for profiling.py
+"""
+
+import pstats
+from pathlib import Path
+import pytest
+from directory_structure_py.metrics import ScanMetrics
+from directory_structure_py.profiling import PipelineProfiler
+
+
+def test_pipeline_profiler(tmp_path: Path):
+    """test function for PipelineProfiler"""
+    profiler = PipelineProfiler("both", str(tmp_path / "log" / "run"))
+    metrics = ScanMetrics()
+    metrics.stage_callbacks.append(profiler.on_stage_end)
+    profiler.start()
+    with metrics.stage("allocate"):
+        buff = [bytes(1024) for _ in range(1000)]
+    with metrics.stage("release"):
+        del buff
+    dst = profiler.stop()
+    assert dst == [str(tmp_path / "log" / "run.prof"), str(tmp_path / "log" / "run_memory.txt")]
+    assert pstats.Stats(dst[0]).total_calls > 0
+    report: str = (tmp_path / "log" / "run_memory.txt").read_text(encoding="utf-8")
+    assert "[allocate]" in report and "[release]" in report
+    assert "test_profiling.py" in report
+
+
+def test_pipeline_profiler_invalid_mode(tmp_path: Path):
+    """test function for PipelineProfiler with an invalid mode"""
+    with pytest.raises(ValueError):
+        PipelineProfiler("disk", str(tmp_path / "run"))
@@ -0,0 +1,73 @@
+"""test_reader.py
+
+test functions for reader.py
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict
+import pytest
+from directory_structure_py import reader
+from directory_structure_py.reader import iter_graph_nodes, select_reader_backend
+
+DOCUMENT: Dict[str, Any] = {
+    "root_path": {"nested": [1, {"z": None}]},
+    "@graph": [
+        {"@id": "root/", "type": "Directory", "size": 12345678901234567890},
+        {"@id": "root/ü \"x\"\n", "type": "File", "ratio": 2.5e+30, "flag": True},
+    ],
+    "dateCreated": "2024-01-01T00:00:00",
+}
+
+
+@pytest.mark.parametrize("backend", ["json", "ijson"])
+@pytest.mark.parametrize("indent", [None, 4])
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024])
+def test_iter_graph_nodes(
+    tmp_path: Path, monkeypatch, backend: str, indent: int | None, chunk_size: int
+):
+    """test function for iter_graph_nodes with values split across the reads"""
+    if backend == "ijson":
+        pytest.importorskip("ijson")
+    monkeypatch.setattr(reader, "READ_CHUNK_SIZE", chunk_size)
+    src = tmp_path / "data.json"
+    src.write_text(json.dumps(DOCUMENT, indent=indent, ensure_ascii=False), encoding="utf-8")
+    header: Dict[str, Any] = {}
+    assert list(iter_graph_nodes(src, header, backend)) == DOCUMENT["@graph"]
+    assert header == {
+        "root_path": DOCUMENT["root_path"], "dateCreated": DOCUMENT["dateCreated"]
+    }
+
+
+def test_iter_graph_nodes_w_large_integers(tmp_path: Path):
+    """test function for iter_graph_nodes with an integer above 64 bits after some nodes"""
+    pytest.importorskip("ijson")
+    graph = [{"@id": f"root/{i}", "contentSize": i} for i in range(5)]
+    graph.append({"@id": "root/large", "contentSize": 2 ** 70})
+    src = tmp_path / "data.json"
+    src.write_text(json.dumps({"@graph": graph, "dateCreated": "x"}), encoding="utf-8")
+    header: Dict[str, Any] = {}
+    assert list(iter_graph_nodes(src, header, "ijson")) == graph
+    assert header == {"dateCreated": "x"}
+
+
+@pytest.mark.parametrize("text", [
+    '{"@graph": [{"a": 1} {"b": 2}]}',
+    '{"@graph": [{"a": tru}]}',
+    '{"@graph": [{"a": 1}',
+    '{"@graph": [{"a": "x',
+])
+def test_iter_graph_nodes_invalid(tmp_path: Path, text: str):
+    """test function for iter_graph_nodes with invalid JSON"""
+    src = tmp_path / "data.json"
+    src.write_text(text, encoding="utf-8")
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_graph_nodes(src, backend="json"))
+
+
+def test_select_reader_backend():
+    """test function for select_reader_backend"""
+    assert select_reader_backend("json") == "json"
+    assert select_reader_backend() in ["ijson", "json"]
+    with pytest.raises(ValueError):
+        select_reader_backend("yajl")
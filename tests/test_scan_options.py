@@ -0,0 +1,98 @@
+"""test_scan_options.py
+
+test functions for scan_options.py
+"""
+
+from pathlib import Path
+from typing import Dict, List
+import pytest
+from directory_structure_py.scan_options import (
+    ScanOptions,
+    parse_ignore_file
+)
+from directory_structure_py.get_metadata import (
+    get_metadata_of_files_in_list_format,
+    update_statistical_info_to_metadata_list
+)
+
+
+def test_parse_ignore_file(tmp_path: Path):
+    """test function for parse_ignore_file"""
+    ignore_file = tmp_path / ".gitignore"
+    ignore_file.write_text(
+        "# comment\n\n*.log\n!keep.log\nbuild/\n/top.txt\ndocs/**/*.tmp\n",
+        encoding="utf-8"
+    )
+    rules = parse_ignore_file(str(ignore_file), "sub")
+    assert len(rules) == 5
+    assert rules[0].matches("sub/a/b.log", False)
+    assert not rules[0].matches("other/b.log", False)
+    assert rules[1].negate and rules[1].matches("sub/x/keep.log", False)
+    assert rules[2].matches("sub/x/build", True)
+    assert not rules[2].matches("sub/x/build", False)
+    assert rules[3].matches("sub/top.txt", False)
+    assert not rules[3].matches("sub/x/top.txt", False)
+    assert rules[4].matches("sub/docs/a/b/c.tmp", False)
+    assert rules[4].matches("sub/docs/c.tmp", False)
+
+
+def test_scan_options_is_included(tmp_path: Path):
+    """test function for ScanOptions.is_included"""
+    options = ScanOptions(max_depth=2, include=["*.py"], exclude=["__pycache__"])
+    assert options.is_included("a/b.py", False, 2)
+    assert not options.is_included("a/b/c.py", False, 3)
+    assert not options.is_included("a/b.txt", False, 2)
+    assert options.is_included("a", True, 1)
+    assert not options.is_included("a/__pycache__", True, 2)
+    ignore_file = tmp_path / ".gitignore"
+    ignore_file.write_text("*.py\n!main.py\n", encoding="utf-8")
+    rules = parse_ignore_file(str(ignore_file))
+    assert not options.is_included("a/b.py", False, 2, rules)
+    assert options.is_included("a/main.py", False, 2, rules)
+
+
+def test_pruned_scan(tmp_path: Path):
+    """test function for get_metadata_of_files_in_list_format with ScanOptions"""
+    src = tmp_path / "root"
+    (src / "a" / "b").mkdir(parents=True)
+    (src / "node_modules").mkdir()
+    (src / "node_modules" / "x.js").write_bytes(b"x" * 100)
+    (src / "top.txt").write_bytes(b"t" * 3)
+    (src / "debug.log").write_bytes(b"l" * 50)
+    (src / "a" / "a.txt").write_bytes(b"a" * 5)
+    (src / "a" / "b" / "deep.txt").write_bytes(b"d" * 7)
+    (src / "a" / ".gitignore").write_text("*.txt\n", encoding="utf-8")
+    (src / ".gitignore").write_text("*.log\n", encoding="utf-8")
+
+    options = ScanOptions(max_depth=2, exclude=["node_modules", ".gitignore"],
+                          ignore_file=".gitignore")
+    data: Dict = update_statistical_info_to_metadata_list(
+        get_metadata_of_files_in_list_format(src, options=options)
+    )
+    ids: List[str] = [v["@id"] for v in data["@graph"]]
+    assert sorted(ids) == ["root/", "root/a/", "root/a/b/", "root/top.txt"]
+    root = data["@graph"][0]
+    assert sorted(v["@id"] for v in root["hasPart"]) == ["root/a/", "root/top.txt"]
+    assert root["contentSizeOfAllFiles"] == 3
+    assert root["numberOfAllFiles"] == 1
+    assert root["numberOfAllContents"] == 3
+    dir_b = [v for v in data["@graph"] if v["@id"] == "root/a/b/"][0]
+    assert dir_b["numberOfContents"] == 0
+
+
+def test_structure_only_scan(tmp_path: Path):
+    """test function for get_metadata_of_files_in_list_format with empty fields"""
+    src = tmp_path / "root"
+    (src / "a").mkdir(parents=True)
+    (src / "a" / "x.txt").write_bytes(b"x" * 5)
+    (src / "y.txt").write_bytes(b"y" * 3)
+    data: Dict = update_statistical_info_to_metadata_list(
+        get_metadata_of_files_in_list_format(src, options=ScanOptions(fields=[]))
+    )
+    root = data["@graph"][0]
+    assert root["numberOfAllFiles"] == 2
+    assert root["numberOfAllFilesPerExtension"] == {".txt": 2}
+    assert "contentSizeOfAllFiles" not in root and "mimetypesOfAllFiles" not in root
+    assert all("sha256" not in node for node in data["@graph"])
+    with pytest.raises(ValueError):
+        ScanOptions(fields=["size"])
@@ -0,0 +1,63 @@
+"""test_serialization.py
+
+test functions for serialization.py
+"""
+
+import io
+import json
+import pytest
+from directory_structure_py.serialization import (
+    JSON_BACKENDS,
+    select_json_backend,
+    dumps_json,
+    dump_json
+)
+
+DATA = {
+    "@graph": [
+        {"@id": "root/", "numberOfFilesPerMIMEType": {None: 1, "text/plain": 2}},
+        {"@id": "root/ü.txt", "contentSize": 3},
+    ]
+}
+
+
+def test_select_json_backend():
+    """test function for select_json_backend"""
+    assert select_json_backend("json") == "json"
+    assert select_json_backend("auto") in JSON_BACKENDS
+    assert select_json_backend("auto") != "orjson"
+    with pytest.raises(ValueError):
+        select_json_backend("ujson")
+    with pytest.raises(ValueError):
+        select_json_backend("orjson", compact=False)
+
+
+@pytest.mark.parametrize("backend", JSON_BACKENDS)
+@pytest.mark.parametrize("compact", [False, True])
+def test_dumps_json(backend: str, compact: bool):
+    """test function for dumps_json"""
+    if backend != "json":
+        pytest.importorskip(backend)
+    if backend == "orjson" and not compact:
+        pytest.skip("orjson only supports the compact output")
+    dst: bytes = dumps_json(DATA, compact=compact, backend=backend)
+    assert json.loads(dst) == json.loads(json.dumps(DATA))
+    assert (b"\n" not in dst) == compact
+    assert "ü".encode("utf-8") in dst
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_dump_json(compact: bool):
+    """test function for dump_json"""
+    buff = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+    dump_json(DATA, buff, compact=compact)
+    buff.flush()
+    expected: str = json.dumps(
+        DATA, indent=None if compact else 4,
+        separators=(",", ":") if compact else None,
+        ensure_ascii=False
+    )
+    if select_json_backend("auto", compact) == "json":
+        assert buff.buffer.getvalue().decode("utf-8") == expected
+    else:
+        assert json.loads(buff.buffer.getvalue()) == json.loads(expected)
@@ -0,0 +1,80 @@
+"""test_server.py
+
+test functions for server.py
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict
+from urllib.error import HTTPError
+from urllib.request import urlopen, Request
+import pytest
+from directory_structure_py.server import ScanService, create_server
+
+
+@pytest.fixture(name="base_url")
+def fixture_base_url():
+    """serves the sample directory on an ephemeral port"""
+    src_path: str = os.path.join(os.path.dirname(__file__), "../sample")
+    service = ScanService({"sample": src_path})
+    server = create_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _get(url: str):
+    with urlopen(url, timeout=10) as res:
+        return json.loads(res.read().decode("utf-8"))
+
+
+def test_scan_service_query():
+    """test function for ScanService.query"""
+    src_path: str = os.path.join(os.path.dirname(__file__), "../sample")
+    service = ScanService({"sample": src_path})
+    root: Dict = service.query("sample", "node")
+    assert root["@id"] == "sample/"
+    stats: Dict = service.query("sample", "statistics", "sample/data/")
+    assert stats["numberOfAllFiles"] == 2
+    with pytest.raises(KeyError):
+        service.query("sample", "node", "no/such/id")
+    with pytest.raises(ValueError):
+        service.query("sample", "unknown")
+
+
+def test_server_queries(base_url):
+    """test function for the HTTP endpoints"""
+    summary: Dict = _get(f"{base_url}/")
+    assert list(summary.keys()) == ["sample"]
+    root: Dict = _get(f"{base_url}/sample/node")
+    assert root["@id"] == "sample/"
+    children = _get(f"{base_url}/sample/children?id=sample/data/")
+    assert sorted(c["@id"] for c in children) == [
+        "sample/data/data_001.csv", "sample/data/data_002.csv"
+    ]
+    subtree = _get(f"{base_url}/sample/subtree?id=sample/hogehoge/")
+    assert subtree[0]["@id"] == "sample/hogehoge/"
+    stats: Dict = _get(f"{base_url}/sample/statistics")
+    assert stats["numberOfAllFiles"] == root["numberOfAllFiles"]
+
+
+def test_server_errors_and_refresh(base_url):
+    """test function for the error responses and the refresh endpoint"""
+    for path in ["/unknown/node", "/sample/unknown", "/sample/node?id=no/such/id"]:
+        with pytest.raises(HTTPError) as exc:
+            _get(f"{base_url}{path}")
+        assert exc.value.code == 404
+    date_created: str = _get(f"{base_url}/")["sample"]["dateCreated"]
+    with urlopen(Request(f"{base_url}/sample/refresh", method="POST"), timeout=10) as res:
+        assert res.status == 202
+        assert json.loads(res.read().decode("utf-8"))["refreshing"]
+    deadline: float = time.monotonic() + 10
+    while _get(f"{base_url}/")["sample"]["refreshing"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    summary: Dict = _get(f"{base_url}/")["sample"]
+    assert not summary["refreshing"] and summary["numberOfNodes"] > 0
+    assert summary["dateCreated"] >= date_created
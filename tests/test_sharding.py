@@ -0,0 +1,105 @@
+"""test_sharding.py
+
+test functions for sharding.py
+"""
+
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+from typing import Dict, Any, List
+import zipfile
+import pytest
+from directory_structure_py.get_metadata import (
+    get_metadata_of_files_in_list_format, update_statistical_info_to_metadata_list
+)
+from directory_structure_py.main import save_dict_to_json
+from directory_structure_py.scan_options import ScanOptions
+from directory_structure_py.sharding import plan_shards, scan_shard, merge_shards
+
+
+def _make_tree(src: Path) -> Path:
+    for name in ["a", "b", "c", "d"]:
+        (src / name / "sub" / "deep").mkdir(parents=True)
+        (src / name / "file.txt").write_bytes(name.encode() * 3)
+        (src / name / "sub" / "file.bin").write_bytes(name.encode() * 5)
+        (src / name / "sub" / "deep" / "file.log").write_bytes(name.encode() * 7)
+        (src / name / "sub" / "deep" / "skip.tmp").write_bytes(b"tmp")
+    (src / "empty").mkdir()
+    (src / "top.txt").write_bytes(b"top")
+    with zipfile.ZipFile(src / "a" / "bundle.zip", "w") as archive:
+        archive.writestr("docs/index.md", b"index")
+        archive.writestr("data.csv", b"a,b")
+    return src
+
+
+def _round_trip(data: Dict[str, Any]) -> Dict[str, Any]:
+    data = json.loads(json.dumps(data))
+    data.pop("dateCreated")
+    return data
+
+
+@pytest.mark.parametrize("number_of_shards", [1, 2, 3, 16])
+@pytest.mark.parametrize(
+    "options", [None, ScanOptions(exclude=["*.tmp"]), ScanOptions(archives=True)]
+)
+def test_merge_shards(tmp_path: Path, number_of_shards: int, options: ScanOptions | None):
+    """test function for plan_shards, scan_shard and merge_shards"""
+    src: Path = _make_tree(tmp_path / "root")
+    expected: Dict[str, Any] = update_statistical_info_to_metadata_list(
+        get_metadata_of_files_in_list_format(src, options=options)
+    )
+    manifest: Dict[str, Any] = plan_shards(src, number_of_shards, options)
+    assert len(manifest["shards"]) == number_of_shards
+    assert sum(
+        shard["numberOfEntries"] for shard in manifest["shards"]
+    ) == manifest["numberOfEntries"]
+    paths: List[str] = []
+    for shard in range(number_of_shards):
+        paths.append(str(tmp_path / f"shard{shard}.json"))
+        save_dict_to_json(scan_shard(src, manifest, shard), paths[-1])
+    merged: Dict[str, Any] = merge_shards(manifest, paths[::-1])
+    assert _round_trip(merged) == _round_trip(expected)
+
+
+def test_sharding_errors(tmp_path: Path):
+    """test function for the errors of plan_shards and merge_shards"""
+    src: Path = _make_tree(tmp_path / "root")
+    with pytest.raises(ValueError):
+        plan_shards(src / "top.txt", 2)
+    with pytest.raises(ValueError):
+        plan_shards(src, 0)
+    manifest: Dict[str, Any] = plan_shards(src, 2)
+    with pytest.raises(IndexError):
+        scan_shard(src, manifest, 2)
+    save_dict_to_json(scan_shard(src, manifest, 0), str(tmp_path / "shard0.json"))
+    with pytest.raises(ValueError):
+        merge_shards(manifest, [str(tmp_path / "shard0.json")])
+
+
+def test_sharding_command(tmp_path: Path):
+    """test function for the plan, scan --shard and merge commands"""
+    src: Path = _make_tree(tmp_path / "root")
+    manifest: str = str(tmp_path / "manifest.json")
+    dst: str = str(tmp_path / "merged.json")
+    log: List[str] = ["--log_output_path", str(tmp_path / "log" / "test.log")]
+    cwd: str = os.path.join(os.path.dirname(__file__), "..")
+    command: List[str] = [sys.executable, "-m", "directory_structure_py"]
+    subprocess.run(
+        command + ["plan", str(src), "--shards", "2", "--dst", manifest], check=True, cwd=cwd
+    )
+    for shard in range(2):
+        subprocess.run(
+            command + ["scan", str(src), "--shard", str(shard), "--manifest", manifest] + log,
+            check=True, cwd=cwd
+        )
+    subprocess.run(command + ["merge", manifest] + [
+        str(tmp_path / f"manifest_shard{shard}.json") for shard in range(2)
+    ] + ["--dst", dst], check=True, cwd=cwd)
+    with open(dst, "r", encoding="utf-8") as ff:
+        merged: Dict[str, Any] = json.load(ff)
+    expected: Dict[str, Any] = update_statistical_info_to_metadata_list(
+        get_metadata_of_files_in_list_format(src)
+    )
+    assert _round_trip(merged) == _round_trip(expected)
@@ -0,0 +1,81 @@
+"""test_snapshot.py
+
+test functions for snapshot.py
+"""
+
+import copy
+from pathlib import Path
+from typing import Dict
+import pytest
+from directory_structure_py.conversion import list2tree
+from directory_structure_py.get_metadata import (
+    get_metadata_of_files_in_list_format,
+    update_statistical_info_to_metadata_list
+)
+from directory_structure_py.snapshot import write_snapshot, SnapshotReader
+
+
+def _make_metadata(tmp_path: Path) -> Dict:
+    src = tmp_path / "root"
+    (src / "a" / "b").mkdir(parents=True)
+    (src / "x.txt").write_bytes(b"x")
+    (src / "a" / "y.json").write_bytes(b"{}")
+    (src / "a" / "b" / "zü.txt").write_bytes(b"zzz")
+    return update_statistical_info_to_metadata_list(
+        get_metadata_of_files_in_list_format(src)
+    )
+
+
+def test_snapshot_round_trip(tmp_path: Path):
+    """test function for write_snapshot and SnapshotReader.to_list/to_tree"""
+    data: Dict = _make_metadata(tmp_path)
+    dst: str = str(tmp_path / "out.snap")
+    write_snapshot(data, dst)
+    with SnapshotReader(dst) as reader:
+        assert len(reader) == len(data["@graph"])
+        assert reader.root_id == "root/"
+        assert reader.to_list() == data
+        assert reader.to_tree() == list2tree(copy.deepcopy(data))
+        assert reader.to_tree(True) == list2tree(copy.deepcopy(data), True)
+
+
+def test_snapshot_random_access(tmp_path: Path):
+    """test function for SnapshotReader.get, children and subtree_stats"""
+    data: Dict = _make_metadata(tmp_path)
+    dst: str = str(tmp_path / "out.snap")
+    write_snapshot(data, dst)
+    nodes: Dict = {node["@id"]: node for node in data["@graph"]}
+    with SnapshotReader(dst) as reader:
+        assert reader.get("root/a/b/zü.txt") == nodes["root/a/b/zü.txt"]
+        assert reader.get("root/missing") is None
+        assert "root/a/" in reader
+        assert "root/missing" not in reader
+        assert [node["@id"] for node in reader.children("root/a/")] == [
+            part["@id"] for part in nodes["root/a/"]["hasPart"]
+        ]
+        assert {node["@id"] for node in reader.iter_subtree("root/a/")} == {
+            "root/a/", "root/a/y.json", "root/a/b/", "root/a/b/zü.txt"
+        }
+        stats: Dict = reader.subtree_stats("root/a/")
+        assert stats["contentSizeOfAllFiles"] == 5
+        assert stats["numberOfFilesPerExtension"] == nodes["root/a/"]["numberOfFilesPerExtension"]
+        assert reader.subtree_stats("root/a/", full=False) == {
+            "contentSizeOfAllFiles": 5,
+            "numberOfAllFiles": nodes["root/a/"]["numberOfAllFiles"],
+            "numberOfAllContents": nodes["root/a/"]["numberOfAllContents"],
+        }
+        with pytest.raises(KeyError):
+            reader.children("root/missing")
+
+
+def test_snapshot_invalid(tmp_path: Path):
+    """test function for SnapshotReader with a file which is not a snapshot"""
+    dst = tmp_path / "out.snap"
+    dst.write_bytes(b"{" * 64)
+    with pytest.raises(ValueError):
+        SnapshotReader(str(dst))
+    write_snapshot({"root_path": "./", "@graph": [], "dateCreated": ""}, str(dst))
+    with SnapshotReader(str(dst)) as reader:
+        assert len(reader) == 0
+        assert reader.get("root/") is None
+        assert reader.root_id == ""
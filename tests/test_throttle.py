@@ -0,0 +1,92 @@
+"""test_throttle.py
+
+test functions for throttle.py
+"""
+
+from pathlib import Path
+from typing import List
+import pytest
+from directory_structure_py import throttle
+from directory_structure_py.get_metadata import calculate_sha256, HASH_CHUNK_SIZE
+from directory_structure_py.scan_options import ScanOptions
+from directory_structure_py.throttle import TokenBucket, ReadThrottle, MIN_RATE_FACTOR
+
+
+class _Clock:
+    """a fake clock advanced by the sleeps"""
+
+    def __init__(self):
+        self.now: float = 0.0
+        self.sleeps: List[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture(name="clock")
+def fixture_clock(monkeypatch: pytest.MonkeyPatch) -> _Clock:
+    """replaces the clock of throttle.py"""
+    clock = _Clock()
+    monkeypatch.setattr(throttle.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(throttle.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_token_bucket(clock: _Clock):
+    """test function for TokenBucket"""
+    bucket = TokenBucket(100.0)
+    assert bucket.acquire(100) == 0.0
+    assert bucket.acquire(50) == pytest.approx(0.5)
+    # a request larger than the capacity leaves a debt
+    assert bucket.acquire(300) == pytest.approx(3.0)
+    clock.now += 10.0
+    assert bucket.acquire(100) == 0.0
+    assert clock.now == pytest.approx(13.5)
+
+
+def test_read_throttle(clock: _Clock, tmp_path: Path):
+    """test function for ReadThrottle with calculate_sha256"""
+    src_path: Path = tmp_path / "data.bin"
+    src_path.write_bytes(b"x" * (3 * HASH_CHUNK_SIZE))
+    read_throttle = ReadThrottle(max_read_mbps=HASH_CHUNK_SIZE / 1e6, max_iops=1.0)
+    for _ in range(2):
+        assert calculate_sha256(src_path, read_throttle) == calculate_sha256(src_path)
+    # 6 chunks at 1 chunk per second, 1 of which is in the bucket at the start
+    assert read_throttle.waited == pytest.approx(5.0)
+    assert clock.now == pytest.approx(5.0)
+    with pytest.raises(ValueError):
+        ReadThrottle(adaptive=True)
+    with pytest.raises(ValueError):
+        ScanOptions(max_iops=-1)
+    assert ScanOptions().read_throttle() is None
+
+
+def test_read_throttle_adaptive(clock: _Clock):
+    """test function for ReadThrottle in the adaptive mode"""
+    read_throttle = ReadThrottle(max_read_mbps=1.0, adaptive=True)
+    for _ in range(20):
+        read_throttle.read(1000, 0.001)
+    assert read_throttle.rate_factor == 1.0
+    read_throttle.read(1000, 0.1)
+    assert read_throttle.rate_factor == 0.5
+    for _ in range(20):
+        read_throttle.read(1000, 1.0)
+    assert read_throttle.rate_factor == MIN_RATE_FACTOR
+    for _ in range(40):
+        read_throttle.read(1000, 0.001)
+    assert read_throttle.rate_factor == 1.0
+    # the reads stayed within the burst of the bucket
+    assert not clock.sleeps
+
+    # the short reads, e.g., the ends of the files, are not taken as slow ones.
+    read_throttle = ReadThrottle(max_read_mbps=1e6, adaptive=True)
+    for _ in range(20):
+        for size in [HASH_CHUNK_SIZE, 1000, 10, HASH_CHUNK_SIZE // 2]:
+            read_throttle.read(size, 0.001)
+            assert read_throttle.rate_factor == 1.0
+    read_throttle.read(2 * HASH_CHUNK_SIZE, 0.002)
+    assert read_throttle.rate_factor == 1.0
@@ -0,0 +1,86 @@
+"""test_watcher.py
+
+test functions for watcher.py
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Any
+import pytest
+from directory_structure_py.get_metadata import (
+    get_metadata_of_files_in_list_format,
+    update_statistical_info_to_metadata_list
+)
+from directory_structure_py.index import MetadataIndex
+from directory_structure_py.watcher import IndexUpdater, PollingObserver
+
+IGNORED_KEYS = ["dateCreated", "dateModified"]
+LIST_KEYS = [
+    "hasPart", "extension", "mimetype", "extensionsOfAllFiles", "mimetypesOfAllFiles"
+]
+
+
+def _scan(src: Path) -> Dict[str, Any]:
+    data = get_metadata_of_files_in_list_format(src)
+    return update_statistical_info_to_metadata_list(data)
+
+
+def _normalize(data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """maps @id to nodes ignoring dates and the order of list properties"""
+    dst: Dict[str, Dict[str, Any]] = {}
+    for node in data["@graph"]:
+        node_ = {k: v for k, v in node.items() if k not in IGNORED_KEYS}
+        for key in LIST_KEYS:
+            if isinstance(node_.get(key), list):
+                node_[key] = sorted(node_[key], key=str)
+        dst[node_["@id"]] = node_
+    return dst
+
+
+@pytest.fixture(name="src")
+def fixture_src(tmp_path: Path) -> Path:
+    """creates a small directory tree"""
+    src = tmp_path / "root"
+    (src / "a" / "b").mkdir(parents=True)
+    (src / "c").mkdir()
+    (src / "x.txt").write_text("x" * 10)
+    (src / "a" / "y.csv").write_text("y" * 20)
+    (src / "a" / "b" / "z.csv").write_text("z" * 30)
+    return src
+
+
+def test_index_updater(src: Path):
+    """test function for IndexUpdater"""
+    index = MetadataIndex(_scan(src))
+    updater = IndexUpdater(index, src)
+
+    (src / "c" / "new.json").write_text("{}")
+    updater.on_created(src / "c" / "new.json")
+    (src / "d" / "e").mkdir(parents=True)
+    (src / "d" / "e" / "w.csv").write_text("w" * 5)
+    updater.on_created(src / "d")
+    (src / "a" / "y.csv").write_text("y" * 200)
+    updater.on_modified(src / "a" / "y.csv")
+    os.remove(src / "x.txt")
+    updater.on_deleted(src / "x.txt")
+    os.rename(src / "a" / "b", src / "c" / "bb")
+    updater.on_moved(src / "a" / "b", src / "c" / "bb")
+    os.rename(src / "a" / "y.csv", src / "a" / "y.txt")
+    updater.on_moved(src / "a" / "y.csv", src / "a" / "y.txt")
+
+    assert _normalize(index.to_list()) == _normalize(_scan(src))
+
+
+def test_polling_observer(src: Path):
+    """test function for PollingObserver.poll"""
+    index = MetadataIndex(_scan(src))
+    observer = PollingObserver(IndexUpdater(index, src))
+
+    (src / "a" / "b" / "new.txt").write_text("new")
+    os.rename(src / "c", src / "a" / "cc")
+    (src / "x.txt").write_text("x" * 100)
+    os.remove(src / "a" / "y.csv")
+    observer.poll()
+
+    assert _normalize(index.to_list()) == _normalize(_scan(src))
+    assert index.get("root/")["numberOfAllFiles"] == 3